@@ -1,7 +1,27 @@
 # app/api_client.py
 
+import asyncio
+import copy
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, NamedTuple
+
 import httpx
-from .config import EODHD_API_KEY
+from .cache import MISS, cache_key_for_url, response_cache, ttl_for_url
+from .config import (
+    EODHD_API_KEY,
+    EODHD_HTTP2,
+    EODHD_HTTP_KEEPALIVE_EXPIRY,
+    EODHD_HTTP_MAX_CONNECTIONS,
+    EODHD_HTTP_MAX_KEEPALIVE,
+    EODHD_SINGLEFLIGHT,
+)
+from . import metrics
+from .ratelimit import endpoint_family, rate_limiter
+from .retry import BREAKER_STATUS, RETRY_EXCEPTIONS, RETRY_STATUS, parse_retry_after, retry_policy
+
+logger = logging.getLogger("eodhd-mcp.api_client")
 
 #from fastmcp.server.dependencies import get_http_request
 
@@ -56,6 +76,133 @@ def _resolve_eodhd_token_from_request() -> str | None:
 
 
 
+# --- Shared HTTP client (process-wide connection pool) ---
+
+_client: httpx.AsyncClient | None = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = EODHD_HTTP2
+    if http2 and not _http2_available():
+        logger.warning("EODHD_HTTP2 is enabled but 'h2' is not installed; falling back to HTTP/1.1 "
+                       "(install with: pip install 'httpx[http2]')")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=EODHD_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=EODHD_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=EODHD_HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(limits=limits, http2=http2)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared AsyncClient, creating it lazily if the server lifespan
+    has not opened one (e.g. when tools are called outside FastMCP).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    return get_http_client()
+
+
+async def close_http_client() -> None:
+    global _client
+    client, _client = _client, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+_shutdown_hooks: list = []
+
+
+def on_shutdown(hook) -> None:
+    """Register an async callable run by http_client_lifespan at shutdown (e.g. realtime hub close)."""
+    if hook not in _shutdown_hooks:
+        _shutdown_hooks.append(hook)
+
+
+@asynccontextmanager
+async def http_client_lifespan(server=None):
+    """
+    FastMCP lifespan: open the shared client at startup, close it at shutdown.
+    Usage: FastMCP("eodhd-datasets", lifespan=http_client_lifespan)
+    """
+    await open_http_client()
+    logger.info(
+        "Opened upstream HTTP pool (max_connections=%d, keepalive=%d, http2=%s)",
+        EODHD_HTTP_MAX_CONNECTIONS,
+        EODHD_HTTP_MAX_KEEPALIVE,
+        EODHD_HTTP2 and _http2_available(),
+    )
+    try:
+        yield {}
+    finally:
+        for hook in list(_shutdown_hooks):
+            try:
+                await hook()
+            except Exception as e:
+                logger.warning("Shutdown hook %r failed: %s", hook, e)
+        await close_http_client()
+
+
+# --- Single-flight: identical concurrent GETs share one upstream call ---
+
+_inflight: dict[str, asyncio.Task] = {}
+_coalesced = 0
+
+
+def singleflight_stats() -> dict:
+    return {"enabled": EODHD_SINGLEFLIGHT, "in_flight": len(_inflight), "coalesced": _coalesced}
+
+
+async def _coalesce(key: str, fetch) -> dict | None:
+    """
+    Run fetch() once per key among concurrent callers. The upstream call runs in its
+    own task, so a cancelled caller does not cancel it for the others; followers get
+    a private copy of the result.
+    """
+    global _coalesced
+    task = _inflight.get(key)
+    leader = task is None
+    if leader:
+        task = asyncio.ensure_future(fetch())
+        _inflight[key] = task
+        task.add_done_callback(lambda _t, k=key: _inflight.pop(k, None))
+    else:
+        _coalesced += 1
+
+    result = await asyncio.shield(task)
+    return result if leader else copy.deepcopy(result)
+
+
+RESPONSE_TYPES = {"json", "text", "bytes", "auto", "lines"}
+
+
+def _request_key(url: str, response_type: str) -> str:
+    """Cache / single-flight key; raw-body requests never share entries with parsed ones."""
+    key = cache_key_for_url(url)
+    return key if response_type == "json" else f"{key}#{response_type}"
+
+
+def resolve_api_token(api_token: str | None = None) -> str:
+    """Token a request will use: per-call override, then the MCP request's, then env."""
+    return api_token or _resolve_eodhd_token_from_request() or EODHD_API_KEY or ""
+
+
 def _ensure_api_token(url: str) -> str:
     """
     Inject api_token into URL query string if missing.
@@ -77,14 +224,48 @@ async def make_request(
     json_body: dict | None = None,
     headers: dict | None = None,
     timeout: float = 30.0,
+    use_cache: bool = True,
+    response_type: str = "json",
+    on_line: Callable[[str], Any] | None = None,
 ) -> dict | None:
     """
     Generic HTTP request helper for EODHD APIs.
 
     - Auto-injects api_token into URL if absent.
     - Supports GET (default) and POST with JSON payload.
-    - Returns parsed JSON dict on success, or {"error": "..."} on failure.
+    - Reuses the shared pooled client (keep-alive across calls).
+    - Serves GETs from the response cache when the endpoint has a TTL (see app.cache);
+      pass use_cache=False to force an upstream call.
+    - Coalesces identical concurrent GETs (same normalized URL and token) into one
+      upstream call.
+    - Every upstream call first takes its EODHD call cost from the token's rate-limit
+      bucket (see app.ratelimit), queueing in order when the budget is spent; cache hits
+      and coalesced followers cost nothing.
+    - Timeouts, connection errors, 408/429 and 5xx are retried (GET/PUT/DELETE) with
+      jittered exponential backoff, honoring Retry-After; a per-host circuit breaker
+      fails fast while the upstream keeps failing (see app.retry).
+    - response_type: "json" (default) parses the body; "text" / "bytes" return it raw
+      without a JSON parse (e.g. fmt=csv); "auto" parses only when the response
+      Content-Type is JSON; "lines" streams the body and calls on_line(line) for each
+      line as it arrives (never buffered, cached or coalesced) and returns
+      {"lines": n, "bytes": n}. A stream that fails after its first line is not retried.
+    - Returns parsed JSON (or raw text/bytes) on success, or {"error": "..."} on failure.
+    - Time spent here counts as the calling tool's "upstream" phase (see app.metrics).
     """
+    with metrics.upstream_span():
+        return await _make_request(url, method, json_body, headers, timeout, use_cache, response_type, on_line)
+
+
+async def _make_request(
+    url: str,
+    method: str,
+    json_body: dict | None,
+    headers: dict | None,
+    timeout: float,
+    use_cache: bool,
+    response_type: str,
+    on_line: Callable[[str], Any] | None,
+) -> dict | None:
     url = _ensure_api_token(url)
 
     m = (method or "GET").upper()
@@ -100,46 +281,235 @@ async def make_request(
         if "content-type" not in (k.lower() for k in req_headers.keys()):
             req_headers["Content-Type"] = "application/json"
 
-    async with httpx.AsyncClient() as client:
+    if response_type not in RESPONSE_TYPES:
+        return {"error": f"Unsupported response_type: {response_type}"}
+    if response_type == "lines":
+        if on_line is None:
+            return {"error": "response_type='lines' requires an on_line callback."}
+        return await _send_with_retries(url, m, json_body, req_headers, timeout, response_type, on_line)
+
+    cache_key = None
+    ttl = 0
+    if use_cache and m == "GET" and response_cache.enabled and response_type != "bytes":
+        ttl = ttl_for_url(url)
+        if ttl > 0:
+            cache_key = _request_key(url, response_type)
+            cached = await response_cache.get(cache_key)
+            if cached is not MISS:
+                return cached
+
+    async def _fetch() -> dict | None:
+        result = await _send_with_retries(url, m, json_body, req_headers, timeout, response_type)
+        if cache_key is not None and result is not None and not (isinstance(result, dict) and result.get("error")):
+            await response_cache.set(cache_key, result, ttl)
+        return result
+
+    if m == "GET" and EODHD_SINGLEFLIGHT and not headers:
+        return await _coalesce(cache_key or _request_key(url, response_type), _fetch)
+    return await _fetch()
+
+
+def _url_path(url: str) -> str:
+    """URL without its query string (keeps tokens out of logs)."""
+    return url.split("?", 1)[0]
+
+
+RETRY_METHODS = {"GET", "PUT", "DELETE"}  # idempotent; POST bodies are never replayed
+
+
+class _Transient(NamedTuple):
+    """Why a failed attempt may be retried."""
+    retry_after: float | None  # upstream Retry-After (seconds), if any
+    host_down: bool            # counts against the host's circuit breaker
+
+
+async def _send_with_retries(
+    url: str,
+    m: str,
+    json_body: dict | None,
+    req_headers: dict,
+    timeout: float,
+    response_type: str = "json",
+    on_line: Callable[[str], Any] | None = None,
+) -> Any:
+    """_send() under the circuit breaker and rate limiter, retrying transient failures."""
+    breaker = retry_policy.breaker(url)
+    attempt = 0
+    while True:
+        if breaker is not None and not breaker.allow():
+            return {
+                "error": f"Upstream {breaker.host} is failing; request not sent "
+                         f"(circuit open, retry in {breaker.retry_in():.0f}s).",
+                "circuit": "open",
+            }
+        # A half-open probe slot is held from here on; it is handed back on every exit that
+        # doesn't record an outcome, including cancellation while queued for a rate-limit token
+        recorded = False
         try:
-            if m == "GET":
-                response = await client.get(url, headers=req_headers, timeout=timeout)
-            elif m == "POST":
-                response = await client.post(url, json=json_body, headers=req_headers, timeout=timeout)
-            elif m == "PUT":
-                response = await client.put(url, json=json_body, headers=req_headers, timeout=timeout)
-            elif m == "DELETE":
-                response = await client.delete(url, headers=req_headers, timeout=timeout)
+            throttled = await rate_limiter.acquire(url)
+            if throttled is not None:
+                return throttled
+            if response_type == "lines":
+                result, transient = await _stream_lines(url, m, json_body, req_headers, timeout, on_line)
             else:
-                return {"error": f"Unsupported HTTP method: {m}"}
+                result, transient = await _send(url, m, json_body, req_headers, timeout, response_type)
+            if breaker is not None:
+                breaker.record(transient is None or not transient.host_down)
+                recorded = True
+        finally:
+            if breaker is not None and not recorded:
+                breaker.cancel_probe()
 
-            response.raise_for_status()
+        if transient is None or m not in RETRY_METHODS:
+            if attempt and transient is None:
+                retry_policy.recovered += 1
+            return result
 
-            # Prefer JSON; if server returns non-JSON (e.g., HTML), return a helpful error object.
-            try:
-                return response.json()
-            except Exception:
-                ct = response.headers.get("content-type", "")
-                text = response.text
-                # Keep the payload small-ish
-                if text and len(text) > 2000:
-                    text = text[:2000] + "…"
-                return {
-                    "error": "Response is not valid JSON.",
-                    "status_code": response.status_code,
-                    "content_type": ct,
-                    "text": text,
-                }
-
-        except httpx.HTTPStatusError as e:
-            # Server returned a non-2xx
-            text = e.response.text
+        wait = retry_policy.delay(attempt, transient.retry_after)
+        if wait is None:
+            if retry_policy.max_attempts > 1:
+                retry_policy.exhausted += 1
+            if isinstance(result, dict):
+                result["attempts"] = attempt + 1
+            return result
+
+        retry_policy.retries += 1
+        logger.info("Retrying %s %s in %.2fs (attempt %d): %s",
+                    m, _url_path(url), wait, attempt + 2, result.get("error") if isinstance(result, dict) else result)
+        await asyncio.sleep(wait)
+        attempt += 1
+
+
+def _http_error(response: httpx.Response) -> dict:
+    text = response.text
+    if text and len(text) > 2000:
+        text = text[:2000] + "…"
+    return {
+        "error": f"HTTP {response.status_code} for url '{_url_path(str(response.url))}'",
+        "status_code": response.status_code,
+        "text": text,
+    }
+
+
+async def _stream_lines(
+    url: str,
+    m: str,
+    json_body: dict | None,
+    req_headers: dict,
+    timeout: float,
+    on_line: Callable[[str], Any],
+) -> tuple[Any, _Transient | None]:
+    """Streamed round-trip: feed each body line to on_line without holding the body."""
+    client = get_http_client()
+    lines = 0
+    status, nbytes = "error", 0
+    started = time.perf_counter()
+    metrics.upstream_in_flight.inc()
+    try:
+        async with client.stream(m, url, json=json_body, headers=req_headers, timeout=timeout) as response:
+            status = str(response.status_code)
+            rate_limiter.observe(url, response.status_code, response.headers)
+            if response.is_error:
+                await response.aread()
+                code = response.status_code
+                transient = None
+                if code in RETRY_STATUS:
+                    transient = _Transient(parse_retry_after(response.headers.get("retry-after")), code in BREAKER_STATUS)
+                return _http_error(response), transient
+            async for line in response.aiter_lines():
+                on_line(line)
+                lines += 1
+            nbytes = response.num_bytes_downloaded
+            return {"lines": lines, "bytes": nbytes}, None
+    except RETRY_EXCEPTIONS as e:
+        # Retrying after lines were delivered would replay them into on_line.
+        return {"error": str(e) or type(e).__name__, "lines": lines}, (_Transient(None, True) if not lines else None)
+    except Exception as e:
+        return {"error": str(e), "lines": lines}, None
+    finally:
+        metrics.upstream_in_flight.dec()
+        metrics.observe_upstream(endpoint_family(url), status, nbytes, time.perf_counter() - started)
+
+
+async def _send(
+    url: str,
+    m: str,
+    json_body: dict | None,
+    req_headers: dict,
+    timeout: float,
+    response_type: str = "json",
+) -> tuple[Any, _Transient | None]:
+    """
+    Single upstream round-trip on the shared client; errors become {"error": ...} dicts.
+    Returns (result, transient) where transient is set when the failure may be retried.
+    """
+    client = get_http_client()
+    response = None
+    started = time.perf_counter()
+    metrics.upstream_in_flight.inc()
+    try:
+        if m == "GET":
+            response = await client.get(url, headers=req_headers, timeout=timeout)
+        elif m == "POST":
+            response = await client.post(url, json=json_body, headers=req_headers, timeout=timeout)
+        elif m == "PUT":
+            response = await client.put(url, json=json_body, headers=req_headers, timeout=timeout)
+        elif m == "DELETE":
+            response = await client.delete(url, headers=req_headers, timeout=timeout)
+        else:
+            return {"error": f"Unsupported HTTP method: {m}"}, None
+
+        rate_limiter.observe(url, response.status_code, response.headers)
+        response.raise_for_status()
+
+        ct = response.headers.get("content-type", "")
+        if response_type == "text" or (response_type == "auto" and "json" not in ct.lower()):
+            return response.text, None
+        if response_type == "bytes":
+            return response.content, None
+
+        # Prefer JSON; if server returns non-JSON (e.g., HTML), return a helpful error object.
+        parse_started = time.perf_counter()
+        try:
+            return response.json(), None
+        except Exception:
+            text = response.text
+            # Keep the payload small-ish
             if text and len(text) > 2000:
                 text = text[:2000] + "…"
             return {
-                "error": str(e),
-                "status_code": e.response.status_code,
+                "error": "Response is not valid JSON.",
+                "status_code": response.status_code,
+                "content_type": ct,
                 "text": text,
-            }
-        except Exception as e:
-            return {"error": str(e)}
+            }, None
+        finally:
+            metrics.add_phase("parse", time.perf_counter() - parse_started)
+
+    except httpx.HTTPStatusError as e:
+        # Server returned a non-2xx
+        status = e.response.status_code
+        text = e.response.text
+        if text and len(text) > 2000:
+            text = text[:2000] + "…"
+        transient = None
+        if status in RETRY_STATUS:
+            transient = _Transient(parse_retry_after(e.response.headers.get("retry-after")), status in BREAKER_STATUS)
+        return {
+            "error": str(e),
+            "status_code": status,
+            "text": text,
+        }, transient
+    except RETRY_EXCEPTIONS as e:
+        # Timeout / connection reset / protocol error: the host did not answer properly
+        return {"error": str(e) or type(e).__name__}, _Transient(None, True)
+    except Exception as e:
+        return {"error": str(e)}, None
+    finally:
+        metrics.upstream_in_flight.dec()
+        metrics.observe_upstream(
+            endpoint_family(url),
+            str(response.status_code) if response is not None else "error",
+            len(response.content) if response is not None else 0,
+            time.perf_counter() - started,
+        )
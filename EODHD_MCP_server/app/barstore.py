@@ -0,0 +1,393 @@
+# app/barstore.py
+
+import asyncio
+import calendar
+import datetime as dt
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .api_client import make_request, resolve_api_token
+from .cache import token_partition
+from .concurrency import gather_bounded
+from .config import (
+    EODHD_API_BASE,
+    EODHD_BAR_STORE_EOD_MAX_AGE_DAYS,
+    EODHD_BAR_STORE_GRACE_DAYS,
+    EODHD_BAR_STORE_PATH,
+)
+
+logger = logging.getLogger("eodhd-mcp.barstore")
+
+DAY = 86400
+
+# Bars are keyed by unix seconds (daily bars: midnight UTC of their date). Coverage
+# ranges are inclusive; two ranges one unit apart are contiguous.
+_UNIT = {"d": DAY}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    part TEXT NOT NULL, ticker TEXT NOT NULL, interval TEXT NOT NULL, ts INTEGER NOT NULL, row TEXT NOT NULL,
+    PRIMARY KEY (part, ticker, interval, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    part TEXT NOT NULL, ticker TEXT NOT NULL, interval TEXT NOT NULL, lo INTEGER NOT NULL, hi INTEGER NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    PRIMARY KEY (part, ticker, interval, lo)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sync (
+    part TEXT NOT NULL, ticker TEXT NOT NULL, state TEXT NOT NULL, updated_at INTEGER NOT NULL,
+    PRIMARY KEY (part, ticker)
+) WITHOUT ROWID;
+"""
+
+Key = Tuple[str, str, str]  # (token partition, TICKER, interval)
+Fetch = Callable[[int, int], Awaitable[Any]]
+
+
+def date_ts(value: str) -> int:
+    return calendar.timegm(dt.date.fromisoformat(value[:10]).timetuple())
+
+
+def ts_date(ts: int) -> str:
+    return dt.datetime.fromtimestamp(ts, dt.timezone.utc).date().isoformat()
+
+
+def _today_ts() -> int:
+    now = int(time.time())
+    return now - now % DAY
+
+
+def missing_ranges(covered: List[Tuple[int, int]], lo: int, hi: int, unit: int = 1) -> List[Tuple[int, int]]:
+    """Sub-ranges of [lo, hi] not inside any covered (lo, hi) range (covered sorted by lo)."""
+    gaps: List[Tuple[int, int]] = []
+    cursor = lo
+    for c_lo, c_hi in covered:
+        if c_hi < cursor:
+            continue
+        if c_lo > hi:
+            break
+        if c_lo > cursor:
+            gaps.append((cursor, min(hi, c_lo - unit)))
+        cursor = max(cursor, c_hi + unit)
+        if cursor > hi:
+            break
+    if cursor <= hi:
+        gaps.append((cursor, hi))
+    return gaps
+
+
+def split_range(lo: int, hi: int, span: Optional[int]) -> List[Tuple[int, int]]:
+    if not span or hi - lo <= span:
+        return [(lo, hi)]
+    out, start = [], lo
+    while start <= hi:
+        out.append((start, min(start + span, hi)))
+        start += span + 1
+    return out
+
+
+class BarStore:
+    """
+    Persistent per-(ticker, interval) bar store in SQLite, per token partition.
+
+    Only settled bars are stored: those older than grace_days before today UTC. The
+    rest of a window is always fetched live, since the latest days can still be missing
+    upstream (yesterday's bars land some hours after midnight UTC) and an empty answer
+    for them must not be recorded as covered. A coverage table records which ranges
+    were fetched, so empty stretches (holidays, halts) are not re-requested.
+    Daily coverage older than max_age_days is refetched, since adjusted_close moves
+    with later dividends and splits; intraday bars are unadjusted and kept.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_age_days: float = 7, grace_days: float = 2) -> None:
+        self.path = os.path.expanduser(path) if path else None
+        self.max_age = max_age_days * DAY if max_age_days > 0 else 0
+        self.grace = int(max(grace_days, 0) * DAY)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._locks: Dict[Key, asyncio.Lock] = {}
+        self.hits = 0          # answered entirely from disk
+        self.partial = 0       # some ranges fetched
+        self.misses = 0        # nothing stored yet for the window
+        self.bars_local = 0
+        self.bars_fetched = 0
+        self.requests = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    # --- sqlite (runs in a worker thread via asyncio.to_thread; never call on the event loop) ---
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _coverage(self, key: Key) -> List[Tuple[int, int]]:
+        with self._db_lock:
+            db = self._db()
+            if self.max_age and key[2] == "d":
+                # Stale ranges are dropped rather than skipped, so a later merge can't revive them
+                db.execute("DELETE FROM coverage WHERE part=? AND ticker=? AND interval=? AND fetched_at<?",
+                           (*key, int(time.time() - self.max_age)))
+            cur = db.execute("SELECT lo, hi FROM coverage WHERE part=? AND ticker=? AND interval=? ORDER BY lo", key)
+            return cur.fetchall()
+
+    def _read(self, key: Key, lo: int, hi: int) -> List[Any]:
+        with self._db_lock:
+            cur = self._db().execute(
+                "SELECT row FROM bars WHERE part=? AND ticker=? AND interval=? AND ts BETWEEN ? AND ? ORDER BY ts",
+                (*key, lo, hi),
+            )
+            return [json.loads(r) for (r,) in cur.fetchall()]
+
+    def _write(self, key: Key, rows: List[Tuple[int, str]], ranges: List[Tuple[int, int]], unit: int) -> None:
+        now = int(time.time())
+        with self._db_lock:
+            db = self._db()
+            db.execute("BEGIN")
+            try:
+                for lo, hi in ranges:
+                    # A refetched range replaces what was stored for it
+                    db.execute("DELETE FROM bars WHERE part=? AND ticker=? AND interval=? AND ts BETWEEN ? AND ?",
+                               (*key, lo, hi))
+                db.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?)",
+                               [(*key, ts, row) for ts, row in rows])
+                for lo, hi in ranges:
+                    # Merge with overlapping / adjacent coverage; the merged range keeps the
+                    # oldest fetch time so max_age still applies to its older part
+                    found = db.execute(
+                        "SELECT lo, hi, fetched_at FROM coverage"
+                        " WHERE part=? AND ticker=? AND interval=? AND lo<=? AND hi>=?",
+                        (*key, hi + unit, lo - unit),
+                    ).fetchall()
+                    fetched_at = now
+                    if found:
+                        lo = min([lo] + [f[0] for f in found])
+                        hi = max([hi] + [f[1] for f in found])
+                        fetched_at = min([now] + [f[2] for f in found])
+                        db.executemany("DELETE FROM coverage WHERE part=? AND ticker=? AND interval=? AND lo=?",
+                                       [(*key, f[0]) for f in found])
+                    db.execute("INSERT INTO coverage VALUES (?, ?, ?, ?, ?, ?)", (*key, lo, hi, fetched_at))
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+
+    def _delete(self, part: str, ticker: str, interval: Optional[str]) -> int:
+        where, args = "part=? AND ticker=?", [part, ticker]
+        if interval:
+            where += " AND interval=?"
+            args.append(interval)
+        with self._db_lock:
+            db = self._db()
+            n = db.execute(f"DELETE FROM bars WHERE {where}", args).rowcount
+            db.execute(f"DELETE FROM coverage WHERE {where}", args)
+            if interval in (None, "d"):
+                db.execute("DELETE FROM sync WHERE part=? AND ticker=?", (part, ticker))
+        return n
+
+    def _load_sync(self, part: str, ticker: str) -> Optional[Tuple[dict, int]]:
+        with self._db_lock:
+            row = self._db().execute("SELECT state, updated_at FROM sync WHERE part=? AND ticker=?",
+                                     (part, ticker)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def _save_sync(self, part: str, ticker: str, state: dict) -> None:
+        blob = json.dumps(state, separators=(",", ":"))
+        with self._db_lock:
+            self._db().execute("INSERT OR REPLACE INTO sync VALUES (?, ?, ?, ?)", (part, ticker, blob, int(time.time())))
+
+    def _counts(self) -> Tuple[int, int, int, int]:
+        with self._db_lock:
+            db = self._db()
+            series = db.execute("SELECT COUNT(*) FROM (SELECT DISTINCT part, ticker, interval FROM coverage)").fetchone()[0]
+            ranges = db.execute("SELECT COUNT(*) FROM coverage").fetchone()[0]
+            synced = db.execute("SELECT COUNT(*) FROM sync").fetchone()[0]
+        size = sum(os.path.getsize(p) for p in (self.path, self.path + "-wal") if os.path.exists(p))
+        return series, ranges, synced, size
+
+    # --- range queries ---
+
+    async def get_range(
+        self,
+        api_token: Optional[str],
+        ticker: str,
+        interval: str,
+        lo: int,
+        hi: int,
+        fetch: Fetch,
+        ts_of: Callable[[Any], Optional[int]],
+        max_span: Optional[int] = None,
+        concurrency: int = 4,
+    ) -> Any:
+        """
+        Bars of [lo, hi] (unix seconds, inclusive), ascending. Stored ranges are read from
+        disk; missing settled ranges and the recent tail are fetched with fetch(lo, hi), split
+        into spans of at most max_span seconds. Returns the list or an {"error": ...} dict.
+        """
+        unit = _UNIT.get(interval, 1)
+        closed_hi = min(hi, _today_ts() - self.grace - unit)
+        key: Key = (token_partition(resolve_api_token(api_token)), ticker.strip().upper(), interval)
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            gaps: List[Tuple[int, int]] = []
+            stored_ok = lo <= closed_hi
+            if stored_ok:
+                try:
+                    covered = await asyncio.to_thread(self._coverage, key)
+                except (sqlite3.Error, OSError) as e:
+                    logger.warning("Bar store unavailable at %s, fetching directly: %s", self.path, e)
+                    covered, stored_ok = [], False
+                gaps = missing_ranges(covered, lo, closed_hi, unit)
+            tail = (max(lo, closed_hi + unit), hi) if hi > closed_hi else None
+
+            spans = [s for g in gaps for s in split_range(*g, max_span)]
+            if tail is not None:
+                spans += split_range(*tail, max_span)
+            parts = await gather_bounded([fetch(a, b) for a, b in spans], concurrency)
+            self.requests += len(spans)
+            for (a, b), part in zip(spans, parts):
+                if part is None:
+                    return {"error": "No response from API.", "range": {"from": a, "to": b}}
+                if isinstance(part, dict) and part.get("error"):
+                    return {**part, "range": {"from": a, "to": b}}
+                if not isinstance(part, list):
+                    return {"error": "Unexpected response format from API.", "range": {"from": a, "to": b}}
+
+            fetched: Dict[int, Any] = {}
+            for part in parts:
+                for row in part:
+                    ts = ts_of(row)
+                    if ts is not None and lo <= ts <= hi:
+                        fetched[ts] = row
+            self.bars_fetched += len(fetched)
+
+            if stored_ok and gaps:
+                rows = [(ts, json.dumps(row, separators=(",", ":"))) for ts, row in fetched.items() if ts <= closed_hi]
+                try:
+                    await asyncio.to_thread(self._write, key, rows, gaps, unit)
+                except (sqlite3.Error, OSError) as e:
+                    logger.warning("Bar store write failed for %s %s: %s", key[1], interval, e)
+
+            reused = stored_ok and gaps != [(lo, closed_hi)]
+            if reused:
+                try:
+                    local = await asyncio.to_thread(self._read, key, lo, closed_hi)
+                except (sqlite3.Error, OSError) as e:
+                    return {"error": f"Bar store read failed: {e}"}
+                self.bars_local += len(local)
+            else:
+                local = [fetched[ts] for ts in sorted(fetched) if ts <= closed_hi]
+
+            if not spans:
+                self.hits += 1
+            elif reused:
+                self.partial += 1
+            else:
+                self.misses += 1
+            return local + [fetched[ts] for ts in sorted(fetched) if ts > closed_hi]
+
+    async def invalidate(self, ticker: str, api_token: Optional[str] = None, interval: Optional[str] = None) -> int:
+        """Drop a ticker's stored bars (all intervals unless given); returns bars removed."""
+        if not self.enabled:
+            return 0
+        part = token_partition(resolve_api_token(api_token))
+        return await asyncio.to_thread(self._delete, part, ticker.strip().upper(), interval)
+
+    async def load_sync(self, part: str, ticker: str) -> Optional[Tuple[dict, int]]:
+        """Stored history_sync state for (partition, TICKER) and its unix save time, or None."""
+        return await asyncio.to_thread(self._load_sync, part, ticker)
+
+    async def save_sync(self, part: str, ticker: str, state: dict) -> None:
+        await asyncio.to_thread(self._save_sync, part, ticker, state)
+
+    async def stats(self) -> dict:
+        out: Dict[str, Any] = {"enabled": self.enabled, "path": self.path}
+        if not self.enabled:
+            return out
+        try:
+            series, ranges, synced, size = await asyncio.to_thread(self._counts)
+        except (OSError, sqlite3.Error) as e:
+            out["error"] = str(e)
+            return out
+        out.update({
+            "eod_max_age_days": self.max_age / DAY if self.max_age else None,
+            "grace_days": self.grace / DAY,
+            "series": series,
+            "ranges": ranges,
+            "synced_series": synced,
+            "file_bytes": size,
+            "hits": self.hits,
+            "partial": self.partial,
+            "misses": self.misses,
+            "bars_local": self.bars_local,
+            "bars_fetched": self.bars_fetched,
+            "upstream_requests": self.requests,
+        })
+        return out
+
+
+bar_store = BarStore(
+    path=EODHD_BAR_STORE_PATH,
+    max_age_days=EODHD_BAR_STORE_EOD_MAX_AGE_DAYS,
+    grace_days=EODHD_BAR_STORE_GRACE_DAYS,
+)
+
+
+# --- Endpoint adapters ---
+
+def _eod_ts(row: Any) -> Optional[int]:
+    try:
+        return date_ts(row["date"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _intraday_ts(row: Any) -> Optional[int]:
+    ts = row.get("timestamp") if isinstance(row, dict) else None
+    return int(ts) if isinstance(ts, (int, float)) else None
+
+
+async def eod_bars(ticker: str, start_date: str, end_date: Optional[str], api_token: Optional[str]) -> Any:
+    """Daily bars (period=d, ascending) for start_date..end_date (default: today)."""
+    async def fetch(lo: int, hi: int):
+        url = f"{EODHD_API_BASE}/eod/{ticker}?period=d&order=a&fmt=json&from={ts_date(lo)}&to={ts_date(hi)}"
+        if api_token:
+            url += f"&api_token={api_token}"
+        return await make_request(url)
+
+    hi = date_ts(end_date) if end_date else _today_ts()
+    return await bar_store.get_range(api_token, ticker, "d", date_ts(start_date), hi, fetch, _eod_ts)
+
+
+async def intraday_bars(
+    ticker: str,
+    interval: str,
+    from_ts: int,
+    to_ts: int,
+    api_token: Optional[str],
+    max_days: int,
+    concurrency: int = 4,
+) -> Any:
+    """Intraday bars for [from_ts, to_ts]; uncovered ranges are fetched in windows of max_days."""
+    async def fetch(lo: int, hi: int):
+        url = f"{EODHD_API_BASE}/intraday/{ticker}?fmt=json&interval={interval}&from={lo}&to={hi}"
+        if api_token:
+            url += f"&api_token={api_token}"
+        return await make_request(url)
+
+    return await bar_store.get_range(api_token, ticker, interval, from_ts, to_ts, fetch, _intraday_ts,
+                                     max_span=max_days * DAY, concurrency=concurrency)
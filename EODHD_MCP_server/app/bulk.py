@@ -0,0 +1,167 @@
+# app/bulk.py
+
+import asyncio
+import csv
+import datetime as dt
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .api_client import _ensure_api_token, make_request
+from .cache import TTL_CLOSED_HISTORY, TTL_OPEN_HISTORY, token_partition
+from .config import EODHD_API_BASE, EODHD_BULK_MAX_EXCHANGES
+
+# Bulk last-day rows are: Code, Ex, Date, Open, High, Low, Close, Adjusted_close, Volume
+# (plus Prev_close / Change / Change_p with filter=extended). Columns are taken from the
+# CSV header, so extra upstream fields are kept as-is.
+
+
+def _num(value: str) -> Any:
+    if value == "" or value == "NA":
+        return None
+    try:
+        return int(value) if value.lstrip("-").isdigit() else float(value)
+    except ValueError:
+        return value
+
+
+class _CsvIndexer:
+    """on_line handler: parse the streamed CSV one line at a time into CODE -> row tuple."""
+
+    def __init__(self) -> None:
+        self.columns: List[str] = []
+        self.rows: Dict[str, Tuple[Any, ...]] = {}
+        self._code = 0
+        self._keep: List[int] = []
+
+    def __call__(self, line: str) -> None:
+        if not line:
+            return
+        fields = next(csv.reader((line,)))
+        if not self.columns:
+            names = [f.strip().lower() for f in fields]
+            self._code = names.index("code") if "code" in names else 0
+            # 'ex' repeats the exchange on every row; 'date' stays a string
+            self._keep = [i for i, n in enumerate(names) if i != self._code and n != "ex"]
+            self.columns = [names[i] for i in self._keep]
+            return
+        if len(fields) <= self._code:
+            return
+        self.rows[fields[self._code].upper()] = tuple(
+            (fields[i] if self.columns[j] == "date" else _num(fields[i])) if i < len(fields) else None
+            for j, i in enumerate(self._keep)
+        )
+
+
+class ExchangeSnapshot:
+    """One exchange's last-day bars, indexed by ticker code."""
+
+    __slots__ = ("exchange", "date", "columns", "rows", "fetched_at", "expires_at", "bytes")
+
+    def __init__(self, exchange: str, date: Optional[str], columns: List[str],
+                 rows: Dict[str, Tuple[Any, ...]], ttl: float, nbytes: int) -> None:
+        self.exchange = exchange
+        self.date = date
+        self.columns = columns
+        self.rows = rows
+        self.fetched_at = time.time()
+        self.expires_at = self.fetched_at + ttl
+        self.bytes = nbytes
+
+    def get(self, code: str) -> Optional[Dict[str, Any]]:
+        row = self.rows.get(code.upper())
+        if row is None:
+            return None
+        return {"code": code.upper(), "exchange": self.exchange, **dict(zip(self.columns, row))}
+
+
+def _ttl(date: Optional[str]) -> float:
+    if date and date < dt.datetime.now(dt.timezone.utc).date().isoformat():
+        return TTL_CLOSED_HISTORY
+    return TTL_OPEN_HISTORY
+
+
+class BulkEodIndex:
+    """
+    In-memory (exchange, date) -> ExchangeSnapshot index, per token partition, LRU-bounded.
+    Concurrent requests for the same snapshot share one upstream stream.
+    """
+
+    def __init__(self, max_exchanges: int = 4) -> None:
+        self.max_exchanges = max(1, max_exchanges)
+        self._snapshots: "OrderedDict[tuple, ExchangeSnapshot]" = OrderedDict()
+        self._locks: Dict[tuple, asyncio.Lock] = {}
+        self.fetches = 0
+        self.hits = 0
+
+    async def get(
+        self,
+        exchange: str,
+        date: Optional[str] = None,
+        api_token: Optional[str] = None,
+        refresh: bool = False,
+    ) -> Tuple[Optional[ExchangeSnapshot], Optional[str], Optional[dict]]:
+        """Return (snapshot, source 'memory'|'upstream', error dict)."""
+        url = f"{EODHD_API_BASE}/eod-bulk-last-day/{exchange}?fmt=csv"
+        if date:
+            url += f"&date={date}"
+        if api_token:
+            url += f"&api_token={api_token}"
+        url = _ensure_api_token(url)
+        token = url.split("api_token=", 1)[1].split("&", 1)[0] if "api_token=" in url else ""
+        key = (token_partition(token), exchange, date or "")
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            snap = self._snapshots.get(key)
+            if snap is not None and not refresh and snap.expires_at > time.time():
+                self._snapshots.move_to_end(key)
+                self.hits += 1
+                return snap, "memory", None
+
+            indexer = _CsvIndexer()
+            result = await make_request(url, response_type="lines", on_line=indexer, timeout=120.0)
+            if isinstance(result, dict) and result.get("error"):
+                return None, None, result
+            if not indexer.columns:
+                return None, None, {"error": "Empty bulk response from API."}
+
+            self.fetches += 1
+            snap = ExchangeSnapshot(exchange, date, indexer.columns, indexer.rows, _ttl(date), result.get("bytes", 0))
+            self._snapshots[key] = snap
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self.max_exchanges:
+                old, _ = self._snapshots.popitem(last=False)
+                self._locks.pop(old, None)
+            return snap, "upstream", None
+
+    def lookup(self, snap: ExchangeSnapshot, symbols: Iterable[str]) -> Tuple[Dict[str, Any], List[str]]:
+        """Rows for the requested symbols (keyed as given, upper-cased) and the ones not found."""
+        found: Dict[str, Any] = {}
+        missing: List[str] = []
+        suffix = "." + snap.exchange.upper()
+        for sym in symbols:
+            s = sym.strip().upper()
+            if not s:
+                continue
+            code = s[: -len(suffix)] if s.endswith(suffix) else s
+            row = snap.get(code)
+            if row is None:
+                missing.append(s)
+            else:
+                found[s] = row
+        return found, missing
+
+    def stats(self) -> dict:
+        return {
+            "fetches": self.fetches,
+            "hits": self.hits,
+            "snapshots": [
+                {"exchange": s.exchange, "date": s.date, "rows": len(s.rows), "bytes": s.bytes,
+                 "expires_in": max(0, int(s.expires_at - time.time()))}
+                for s in self._snapshots.values()
+            ],
+        }
+
+
+bulk_eod_index = BulkEodIndex(max_exchanges=EODHD_BULK_MAX_EXCHANGES)
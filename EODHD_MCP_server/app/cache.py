@@ -0,0 +1,266 @@
+# app/cache.py
+
+import asyncio
+import datetime as dt
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .config import (
+    EODHD_CACHE_DIR,
+    EODHD_CACHE_ENABLED,
+    EODHD_CACHE_MAX_BYTES,
+    EODHD_CACHE_MAX_ENTRIES,
+)
+
+logger = logging.getLogger("eodhd-mcp.cache")
+
+MISS = object()
+
+# --- TTL policy per endpoint family (seconds) ---
+
+TTL_CLOSED_HISTORY = 365 * 86400   # bars for dates that are already closed do not change
+TTL_OPEN_HISTORY = 15 * 60         # history windows that include today
+TTL_REALTIME = 60
+TTL_INTRADAY_OPEN = 60
+TTL_FUNDAMENTALS = 6 * 3600
+TTL_REFERENCE = 24 * 3600          # exchanges list, exchange tickers, exchange details
+TTL_MACRO = 12 * 3600
+
+
+def _today_utc() -> dt.date:
+    return dt.datetime.now(dt.timezone.utc).date()
+
+
+def _param_date(value: Optional[str]) -> Optional[dt.date]:
+    """Parse a 'to' query value given as YYYY-MM-DD or unix seconds."""
+    if not value:
+        return None
+    if value.isdigit():
+        try:
+            return dt.datetime.fromtimestamp(int(value), tz=dt.timezone.utc).date()
+        except (OverflowError, OSError, ValueError):
+            return None
+    try:
+        return dt.date.fromisoformat(value[:10])
+    except ValueError:
+        return None
+
+
+def ttl_for_url(url: str) -> int:
+    """
+    Decide how long a GET response for this URL may be cached (0 = do not cache).
+    """
+    parts = urlsplit(url)
+    path = parts.path
+    params = dict(parse_qsl(parts.query, keep_blank_values=True))
+
+    if "/eod/" in path or "/intraday/" in path:
+        to = _param_date(params.get("to"))
+        if to is not None and to < _today_utc():
+            return TTL_CLOSED_HISTORY
+        return TTL_OPEN_HISTORY if "/eod/" in path else TTL_INTRADAY_OPEN
+    if "/real-time/" in path or "/us-quote-delayed" in path:
+        return TTL_REALTIME
+    if "/fundamentals/" in path:
+        return TTL_FUNDAMENTALS
+    if "/exchanges-list" in path or "/exchange-symbol-list/" in path or "/exchange-details/" in path:
+        return TTL_REFERENCE
+    if "/macro-indicator/" in path:
+        return TTL_MACRO
+    return 0
+
+
+def token_partition(token: str) -> str:
+    """Short, stable hash of an API token (raw tokens never appear in keys or stats)."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_key_for_url(url: str) -> str:
+    """
+    Normalized URL (sorted query, api_token removed), partitioned by a hash of the token
+    so different accounts never share entries and raw tokens never reach the disk tier.
+    """
+    parts = urlsplit(url)
+    pairs = parse_qsl(parts.query, keep_blank_values=True)
+    token = ""
+    kept = []
+    for k, v in pairs:
+        if k == "api_token":
+            token = v
+        else:
+            kept.append((k, v))
+    kept.sort()
+    normalized = urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(kept), ""))
+    return f"{token_partition(token)}:{normalized}"
+
+
+class ResponseCache:
+    """
+    Two-tier response cache: bounded in-memory LRU plus an optional on-disk tier.
+
+    Values are stored as JSON text, so every hit returns a fresh object that tools
+    may mutate freely without corrupting the cached copy.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        enabled: bool = True,
+    ) -> None:
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir or None
+        self._mem: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.stores = 0
+        self.evictions = 0
+
+        if self.disk_dir:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+            except OSError as e:
+                logger.warning("Disabling disk cache tier at %s: %s", self.disk_dir, e)
+                self.disk_dir = None
+
+    # --- memory tier ---
+
+    def _mem_get(self, key: str, now: float) -> Optional[str]:
+        entry = self._mem.get(key)
+        if entry is None:
+            return None
+        expires_at, text = entry
+        if expires_at <= now:
+            self._mem_pop(key)
+            return None
+        self._mem.move_to_end(key)
+        return text
+
+    def _mem_pop(self, key: str) -> None:
+        entry = self._mem.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def _mem_put(self, key: str, expires_at: float, text: str) -> None:
+        if len(text) > self.max_bytes:
+            return
+        self._mem_pop(key)
+        self._mem[key] = (expires_at, text)
+        self._bytes += len(text)
+        while self._mem and (len(self._mem) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, old) = self._mem.popitem(last=False)
+            self._bytes -= len(old)
+            self.evictions += 1
+
+    # --- disk tier ---
+
+    def _disk_path(self, key: str) -> str:
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, name[:2], name + ".json")
+
+    def _disk_read(self, key: str, now: float) -> Optional[tuple[float, str]]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                header = f.readline()
+                body = f.read()
+            expires_at = float(header)
+        except (OSError, ValueError):
+            return None
+        if expires_at <= now:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return expires_at, body
+
+    def _disk_write(self, key: str, expires_at: float, text: str) -> None:
+        path = self._disk_path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(f"{expires_at}\n")
+                f.write(text)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.debug("Disk cache write failed for %s: %s", path, e)
+
+    # --- public API ---
+
+    async def get(self, key: str) -> Any:
+        """Return the cached value for key, or MISS."""
+        now = time.time()
+        text = self._mem_get(key, now)
+        if text is not None:
+            self.hits += 1
+            self.memory_hits += 1
+            return json.loads(text)
+
+        if self.disk_dir:
+            found = await asyncio.to_thread(self._disk_read, key, now)
+            if found is not None:
+                expires_at, text = found
+                self._mem_put(key, expires_at, text)
+                self.hits += 1
+                self.disk_hits += 1
+                return json.loads(text)
+
+        self.misses += 1
+        return MISS
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        try:
+            text = json.dumps(value, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return
+        expires_at = time.time() + ttl
+        self._mem_put(key, expires_at, text)
+        self.stores += 1
+        if self.disk_dir:
+            await asyncio.to_thread(self._disk_write, key, expires_at, text)
+
+    def clear(self) -> None:
+        self._mem.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": len(self._mem),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "disk_dir": self.disk_dir,
+        }
+
+
+response_cache = ResponseCache(
+    max_entries=EODHD_CACHE_MAX_ENTRIES,
+    max_bytes=EODHD_CACHE_MAX_BYTES,
+    disk_dir=EODHD_CACHE_DIR,
+    enabled=EODHD_CACHE_ENABLED,
+)
@@ -0,0 +1,23 @@
+# app/concurrency.py
+
+import asyncio
+from typing import Any, Awaitable, Iterable, List, Sequence
+
+
+async def gather_bounded(coros: Iterable[Awaitable[Any]], limit: int) -> List[Any]:
+    """
+    Await coroutines with at most `limit` in flight; results keep input order.
+    """
+    sem = asyncio.Semaphore(max(1, limit))
+
+    async def _run(coro):
+        async with sem:
+            return await coro
+
+    return await asyncio.gather(*(_run(c) for c in coros))
+
+
+def chunked(items: Sequence[Any], size: int) -> List[Sequence[Any]]:
+    """Split items into consecutive groups of at most `size`."""
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
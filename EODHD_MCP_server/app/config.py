@@ -2,5 +2,73 @@ import os
 from dotenv import load_dotenv
 
 load_dotenv()
-EODHD_API_BASE = "https://eodhd.com/api"
+EODHD_API_BASE = os.environ.get("EODHD_API_BASE", "https://eodhd.com/api").rstrip("/")  # point at test/mock_upstream.py for offline runs
 EODHD_API_KEY = os.environ.get("EODHD_API_KEY", "demo")
+
+# Register tools from the prebuilt schema manifest and import each module on first call
+EODHD_LAZY_TOOLS = os.environ.get("EODHD_LAZY_TOOLS", "0").strip().lower() in {"1", "true", "yes", "on"}
+
+# Shared upstream HTTP client (connection pool, keep-alive, optional HTTP/2)
+EODHD_HTTP_MAX_CONNECTIONS = int(os.environ.get("EODHD_HTTP_MAX_CONNECTIONS", "100"))
+EODHD_HTTP_MAX_KEEPALIVE = int(os.environ.get("EODHD_HTTP_MAX_KEEPALIVE", "20"))
+EODHD_HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("EODHD_HTTP_KEEPALIVE_EXPIRY", "30"))
+EODHD_HTTP2 = os.environ.get("EODHD_HTTP2", "0").strip().lower() in {"1", "true", "yes", "on"}
+
+# Response cache (in-memory LRU + optional disk tier)
+EODHD_CACHE_ENABLED = os.environ.get("EODHD_CACHE_ENABLED", "1").strip().lower() in {"1", "true", "yes", "on"}
+EODHD_CACHE_MAX_ENTRIES = int(os.environ.get("EODHD_CACHE_MAX_ENTRIES", "1024"))
+EODHD_CACHE_MAX_BYTES = int(os.environ.get("EODHD_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+EODHD_CACHE_DIR = os.environ.get("EODHD_CACHE_DIR", "").strip() or None
+
+# Coalesce identical concurrent GETs into one upstream call
+EODHD_SINGLEFLIGHT = os.environ.get("EODHD_SINGLEFLIGHT", "1").strip().lower() in {"1", "true", "yes", "on"}
+
+# Per-token rate limiting of upstream calls (weighted by each endpoint's EODHD call cost)
+EODHD_RATE_LIMIT_ENABLED = os.environ.get("EODHD_RATE_LIMIT_ENABLED", "1").strip().lower() in {"1", "true", "yes", "on"}
+EODHD_RATE_LIMIT_PER_MINUTE = float(os.environ.get("EODHD_RATE_LIMIT_PER_MINUTE", "1000"))  # API calls per minute
+EODHD_RATE_LIMIT_BURST = float(os.environ.get("EODHD_RATE_LIMIT_BURST", "0") or 0)           # bucket size (0 = one minute's worth)
+EODHD_RATE_LIMIT_MAX_WAIT = float(os.environ.get("EODHD_RATE_LIMIT_MAX_WAIT", "120"))      # longest a request may queue (seconds)
+EODHD_DAILY_LIMIT = int(os.environ.get("EODHD_DAILY_LIMIT", "100000"))                     # plan's API calls per day (reporting only)
+
+# Retries for transient upstream failures (timeouts, resets, 408/429/5xx) and per-host circuit breaker
+EODHD_RETRY_MAX_ATTEMPTS = int(os.environ.get("EODHD_RETRY_MAX_ATTEMPTS", "3"))              # total attempts (1 = no retries)
+EODHD_RETRY_BASE_DELAY = float(os.environ.get("EODHD_RETRY_BASE_DELAY", "0.5"))              # backoff base (seconds, doubled per retry, full jitter)
+EODHD_RETRY_MAX_DELAY = float(os.environ.get("EODHD_RETRY_MAX_DELAY", "30"))                 # backoff cap; longer Retry-After = give up
+EODHD_BREAKER_FAILURES = int(os.environ.get("EODHD_BREAKER_FAILURES", "5"))                  # consecutive failures that open a host (0 = off)
+EODHD_BREAKER_RESET_SECONDS = float(os.environ.get("EODHD_BREAKER_RESET_SECONDS", "30"))     # open time before a probe is let through
+
+# Bulk last-day EOD snapshots (whole exchange) kept in memory
+EODHD_BULK_MAX_EXCHANGES = int(os.environ.get("EODHD_BULK_MAX_EXCHANGES", "4"))  # indexed (exchange, date) snapshots kept
+
+# Per-underlying options chains indexed in memory (rebuilt once per US trading day)
+EODHD_OPTIONS_CHAIN_MAX = int(os.environ.get("EODHD_OPTIONS_CHAIN_MAX", "16"))  # underlyings kept
+
+# Persistent on-disk bar store for EOD / intraday history (SQLite file; "" disables)
+EODHD_BAR_STORE_PATH = os.environ.get("EODHD_BAR_STORE_PATH", "").strip() or None
+EODHD_BAR_STORE_EOD_MAX_AGE_DAYS = float(os.environ.get("EODHD_BAR_STORE_EOD_MAX_AGE_DAYS", "7"))  # refetch daily ranges older than this (0 = keep)
+EODHD_BAR_STORE_GRACE_DAYS = float(os.environ.get("EODHD_BAR_STORE_GRACE_DAYS", "2"))  # most recent days always fetched live, never stored
+
+# get_historical_stock_prices sync=True: last synced series per ticker (bar store file when enabled, else memory)
+EODHD_SYNC_TTL_DAYS = float(os.environ.get("EODHD_SYNC_TTL_DAYS", "30"))  # a series not synced for this long starts over
+EODHD_SYNC_MAX_SERIES = int(os.environ.get("EODHD_SYNC_MAX_SERIES", "256"))  # in-memory series kept (LRU) without a bar store
+
+# get_historical_stock_prices_batch: default concurrent per-ticker fetches
+EODHD_BATCH_CONCURRENCY = int(os.environ.get("EODHD_BATCH_CONCURRENCY", "8"))
+
+# Tool output serialization: "pretty" (json.dumps indent=2) or "compact"; compact output uses orjson when installed ("auto")
+EODHD_OUTPUT_MODE = os.environ.get("EODHD_OUTPUT_MODE", "pretty").strip().lower()
+EODHD_JSON_BACKEND = os.environ.get("EODHD_JSON_BACKEND", "auto").strip().lower()
+
+# Prometheus-style metrics route next to the MCP route on the HTTP/SSE transports ("" disables instrumentation)
+EODHD_METRICS_PATH = os.environ.get("EODHD_METRICS_PATH", "/metrics").strip()
+
+# Realtime WebSocket hub (one shared connection per feed endpoint and token)
+EODHD_WS_BASE = os.environ.get("EODHD_WS_BASE", "wss://ws.eodhistoricaldata.com/ws").rstrip("/")
+EODHD_WS_BUFFER_SIZE = int(os.environ.get("EODHD_WS_BUFFER_SIZE", "1000"))      # messages kept per symbol
+EODHD_WS_IDLE_SECONDS = float(os.environ.get("EODHD_WS_IDLE_SECONDS", "60"))    # keep an unused feed open this long
+EODHD_WS_RECONNECT_MAX = float(os.environ.get("EODHD_WS_RECONNECT_MAX", "30"))  # reconnect backoff ceiling (seconds)
+EODHD_WS_MAX_QUEUE = int(os.environ.get("EODHD_WS_MAX_QUEUE", "1024"))          # websockets receive queue (frames)
+EODHD_WS_MAX_MESSAGE_BYTES = int(os.environ.get("EODHD_WS_MAX_MESSAGE_BYTES", "65536"))  # larger frames are rejected
+EODHD_WS_MAX_SYMBOLS = int(os.environ.get("EODHD_WS_MAX_SYMBOLS", "500"))       # live symbols per feed connection
+EODHD_WS_LEASE_SECONDS = float(os.environ.get("EODHD_WS_LEASE_SECONDS", "300")) # snapshot subscriptions expire after this idle time
+EODHD_WS_CAPTURE_MAX_MESSAGES = int(os.environ.get("EODHD_WS_CAPTURE_MAX_MESSAGES", "50000"))  # raw messages one capture returns
@@ -0,0 +1,101 @@
+# app/formatting.py
+
+import json
+import logging
+import time
+from typing import Any, Optional
+
+from .config import EODHD_JSON_BACKEND, EODHD_OUTPUT_MODE
+from .metrics import add_phase
+
+logger = logging.getLogger("eodhd-mcp.formatting")
+
+OUTPUT_MODES = {"pretty", "compact"}
+
+# Optional fast JSON backend
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_use_orjson = orjson is not None and EODHD_JSON_BACKEND in {"auto", "orjson"}
+if EODHD_JSON_BACKEND == "orjson" and orjson is None:
+    logger.warning("EODHD_JSON_BACKEND=orjson but 'orjson' is not installed; using the stdlib json module")
+
+
+def resolve_output_mode(output: Optional[str] = None) -> str:
+    """Per-call 'output' wins; otherwise the server-wide EODHD_OUTPUT_MODE (pretty|compact)."""
+    if isinstance(output, str) and output.strip().lower() in OUTPUT_MODES:
+        return output.strip().lower()
+    return EODHD_OUTPUT_MODE if EODHD_OUTPUT_MODE in OUTPUT_MODES else "pretty"
+
+
+def to_json(data: Any, output: Optional[str] = None) -> str:
+    """
+    Serialize a tool result. 'pretty' is exactly the historical json.dumps(indent=2)
+    output; 'compact' drops all optional whitespace and may use orjson, which writes
+    non-ASCII characters unescaped and NaN/Infinity as null.
+    """
+    started = time.perf_counter()
+    try:
+        return _dumps(data, resolve_output_mode(output) == "compact")
+    finally:
+        add_phase("serialize", time.perf_counter() - started)
+
+
+def _dumps(data: Any, compact: bool) -> str:
+    if not compact:
+        return json.dumps(data, indent=2)
+    if _use_orjson:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib handles them
+    return json.dumps(data, separators=(",", ":"))
+
+
+def error_json(msg: Any) -> str:
+    return to_json({"error": msg})
+
+
+def csv_json(text: Any, output: Optional[str] = None) -> str:
+    """Wrap a raw CSV body (make_request(..., response_type="text")) as {"csv": "..."}."""
+    if isinstance(text, bytes):
+        text = text.decode("utf-8", errors="replace")
+    return to_json({"csv": text}, output)
+
+
+# --- Time-series layouts ---
+
+LAYOUTS = {"rows", "columnar"}
+
+
+def to_columnar(rows: Any) -> Any:
+    """
+    Convert a list of per-bar dicts into struct-of-arrays ({"date": [...], "open": [...], ...})
+    in a single pass. Columns appear in first-seen order; a key missing from a row is None.
+    Also accepts the {"0": {...}, "1": {...}} shape some endpoints use. Anything else
+    (scalars, CSV text, error dicts) is returned unchanged.
+    """
+    if isinstance(rows, dict):
+        values = list(rows.values())
+        if not values or not all(isinstance(v, dict) for v in values):
+            return rows
+        rows = values
+    if not isinstance(rows, list):
+        return rows
+
+    columns: dict = {}
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            return rows
+        for k, v in row.items():
+            col = columns.get(k)
+            if col is None:
+                col = columns[k] = [None] * i
+            col.append(v)
+        if len(row) != len(columns):
+            for col in columns.values():
+                if len(col) == i:
+                    col.append(None)
+    return columns
@@ -0,0 +1,209 @@
+# app/history_sync.py
+
+import asyncio
+import datetime as dt
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .api_client import make_request, resolve_api_token
+from .barstore import BarStore, bar_store
+from .cache import token_partition
+from .config import EODHD_API_BASE, EODHD_SYNC_MAX_SERIES, EODHD_SYNC_TTL_DAYS
+
+logger = logging.getLogger("eodhd-mcp.sync")
+
+
+def _today() -> str:
+    return dt.datetime.now(dt.timezone.utc).date().isoformat()
+
+
+def _next_day(date: str) -> str:
+    return (dt.date.fromisoformat(date) + dt.timedelta(days=1)).isoformat()
+
+
+class HistorySync:
+    """
+    "Since last sync" daily history per (token, ticker).
+
+    The first call fetches from start_date; later calls fetch only from the high-water
+    mark (the last closed bar held) and merge. The high-water bar itself is refetched
+    as an overlap check, and the ticker's dividends and splits since then are looked up;
+    either one showing an adjustment (adjusted_close rescales every earlier bar) forces
+    a full refetch, and the ticker's daily bars in the bar store are dropped.
+
+    The held series lives in the bar store's SQLite file when it is enabled (so it
+    survives restarts), otherwise in process memory as an LRU of max_series series;
+    never in the response cache. A series that is not found is fetched in full and
+    the result says so (sync.full_refetch).
+    """
+
+    def __init__(self, ttl_days: float = 30, max_series: int = 256, store: BarStore = bar_store) -> None:
+        self.ttl = ttl_days * 86400
+        self.max_series = max(1, max_series)
+        self.store = store
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[dict, float]]" = OrderedDict()
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self.full = 0
+        self.incremental = 0
+        self.local = 0
+        self.adjustments = 0
+        self.evictions = 0
+
+    async def _load(self, key: Tuple[str, str]) -> Optional[dict]:
+        found: Optional[Tuple[dict, float]] = None
+        if self.store.enabled:
+            try:
+                found = await self.store.load_sync(*key)
+            except (sqlite3.Error, OSError, ValueError) as e:
+                logger.warning("Sync state for %s unreadable from the bar store: %s", key[1], e)
+        if found is None:
+            found = self._memory.get(key)
+            if found is not None:
+                self._memory.move_to_end(key)
+        if found is None or time.time() - found[1] > self.ttl:
+            return None
+        state = found[0]
+        if not isinstance(state, dict) or not isinstance(state.get("rows"), list):
+            return None
+        return state
+
+    async def _save(self, key: Tuple[str, str], state: dict) -> None:
+        if self.store.enabled:
+            try:
+                await self.store.save_sync(*key, state)
+                self._memory.pop(key, None)
+                return
+            except (sqlite3.Error, OSError) as e:
+                logger.warning("Sync state for %s kept in memory, bar store write failed: %s", key[1], e)
+        self._memory[key] = (state, time.time())
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_series:
+            old, _ = self._memory.popitem(last=False)
+            self.evictions += 1
+            lock = self._locks.get(old)
+            if lock is not None and not lock.locked():
+                del self._locks[old]
+
+    async def _eod(self, ticker: str, from_date: str, api_token: Optional[str], use_cache: bool = True) -> Any:
+        url = f"{EODHD_API_BASE}/eod/{ticker}?period=d&order=a&fmt=json&from={from_date}"
+        if api_token:
+            url += f"&api_token={api_token}"
+        data = await make_request(url, use_cache=use_cache)
+        if data is None:
+            return {"error": "No response from API."}
+        if isinstance(data, dict) and data.get("error"):
+            return data
+        if not isinstance(data, list):
+            return {"error": "Unexpected response format from API."}
+        return data
+
+    async def _events(self, ticker: str, after: str, today: str, api_token: Optional[str]) -> Optional[List[str]]:
+        """Dividends and splits dated in (after, today]; None when either lookup fails."""
+        suffix = f"?from={_next_day(after)}&to={today}&fmt=json"
+        if api_token:
+            suffix += f"&api_token={api_token}"
+        divs, splits = await asyncio.gather(
+            make_request(f"{EODHD_API_BASE}/div/{ticker}{suffix}"),
+            make_request(f"{EODHD_API_BASE}/splits/{ticker}{suffix}"),
+        )
+        if not isinstance(divs, list) or not isinstance(splits, list):
+            return None
+        found = [f"dividend {d.get('date')}" for d in divs if isinstance(d, dict) and after < str(d.get("date")) <= today]
+        found += [f"split {s.get('date')} {s.get('split', '')}".rstrip()
+                  for s in splits if isinstance(s, dict) and after < str(s.get("date")) <= today]
+        return found
+
+    async def series(self, ticker: str, start_date: str, end_date: Optional[str], api_token: Optional[str]) -> dict:
+        """
+        Daily bars start_date..end_date (ascending), refreshed since the last sync, as
+        {"data": [...], "sync": {"mode", "full_refetch", "reason"}}; or {"error": ...}.
+        mode is "full", "incremental" or "local" (nothing fetched); reason says why a
+        full refetch happened.
+        """
+        key = (token_partition(resolve_api_token(api_token)), ticker.strip().upper())
+        today = _today()
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            state = await self._load(key)
+            start = min(start_date, state["start"]) if state else start_date
+            rows: Optional[List[Any]] = None
+            mode = "full"
+            adjusted = False
+
+            if state is None:
+                reason = "no synced series held"
+            elif state["start"] > start_date:
+                reason = f"start_date before the synced series ({state['start']})"
+            else:
+                reason = "synced series has no closed bars"
+            held = state["rows"] if state and state["start"] <= start_date else []
+            settled = [r for r in held if str(r.get("date")) < today]
+            if settled:
+                hwm = settled[-1]["date"]
+                if end_date and end_date <= hwm:
+                    self.local += 1
+                    rows, mode, reason = held, "local", None
+                else:
+                    # Adjustments for ex-dates up to the day of the last full fetch (or clean check)
+                    # are already in the held rows; later ones rescale them
+                    since = state.get("events_seen") or hwm
+                    if since < today:
+                        delta, events = await asyncio.gather(
+                            self._eod(ticker, hwm, api_token), self._events(ticker, since, today, api_token)
+                        )
+                    else:
+                        delta, events = await self._eod(ticker, hwm, api_token), []
+                    if isinstance(delta, dict):
+                        return delta
+
+                    if events is None:
+                        reason = "dividend/split lookup failed"
+                    elif events:
+                        reason = ", ".join(events)
+                    else:
+                        new = delta[0] if delta and delta[0].get("date") == hwm else None
+                        changed = new is None or any(new.get(f) != settled[-1].get(f) for f in ("close", "adjusted_close"))
+                        reason = f"bar {hwm} changed" if changed else None
+
+                    if reason:
+                        logger.info("Full refetch of %s history: %s", key[1], reason)
+                        self.adjustments += 1
+                        adjusted = True
+                        await self.store.invalidate(ticker, api_token, "d")
+                    else:
+                        self.incremental += 1
+                        mode = "incremental"
+                        rows = [r for r in held if str(r.get("date")) < hwm] + delta
+                        state["rows"] = rows
+                        state["events_seen"] = max(since, today)
+                        await self._save(key, state)
+
+            if rows is None:
+                # After an adjustment, skip a cached pre-adjustment response for the same URL
+                data = await self._eod(ticker, start, api_token, use_cache=not adjusted)
+                if isinstance(data, dict):
+                    return data
+                self.full += 1
+                rows = data
+                await self._save(key, {"start": start, "rows": rows, "events_seen": today})
+
+        data = [r for r in rows if start_date <= str(r.get("date")) and (not end_date or str(r.get("date")) <= end_date)]
+        return {"data": data, "sync": {"mode": mode, "full_refetch": mode == "full", "reason": reason}}
+
+    def stats(self) -> dict:
+        return {
+            "full_fetches": self.full,
+            "incremental": self.incremental,
+            "local": self.local,
+            "adjustments": self.adjustments,
+            "held_in": "bar_store" if self.store.enabled else "memory",
+            "series_in_memory": len(self._memory),
+            "max_series_in_memory": self.max_series,
+            "evictions": self.evictions,
+        }
+
+
+history_sync = HistorySync(ttl_days=EODHD_SYNC_TTL_DAYS, max_series=EODHD_SYNC_MAX_SERIES)
@@ -0,0 +1,521 @@
+# app/indicators.py
+"""
+Local technical-indicator engine over EOD bars (vectorized NumPy).
+
+Mirrors the functions of the /technical endpoint so many indicators and periods can be
+computed from one EOD fetch instead of one paid round-trip per indicator. Output field
+names follow the API ('sma', 'macd'/'signal'/'divergence', 'uband'/'mband'/'lband', ...).
+
+Conventions (TA-Lib compatible):
+  - EMA is seeded with the SMA of its first 'period' values, alpha = 2 / (period + 1).
+  - RSI / ATR / DMI / ADX use Wilder smoothing (alpha = 1 / period), seeded with a mean.
+  - Standard deviations (stddev, bbands) are population deviations; bbands use 2 sigma.
+  - Values that are not yet defined (warm-up) are NaN.
+"""
+
+import math
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Union
+
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:  # pragma: no cover
+    np = None
+
+DEFAULT_PERIOD = 50
+PERIOD_MIN, PERIOD_MAX = 2, 100_000
+TRADING_DAYS = 252
+
+# function -> (ordered (param, default) pairs, output fields)
+FUNCTIONS: Dict[str, tuple] = {
+    "sma":        ((("period", DEFAULT_PERIOD),), ("sma",)),
+    "ema":        ((("period", DEFAULT_PERIOD),), ("ema",)),
+    "wma":        ((("period", DEFAULT_PERIOD),), ("wma",)),
+    "volatility": ((("period", DEFAULT_PERIOD),), ("volatility",)),
+    "rsi":        ((("period", DEFAULT_PERIOD),), ("rsi",)),
+    "stddev":     ((("period", DEFAULT_PERIOD),), ("stddev",)),
+    "slope":      ((("period", DEFAULT_PERIOD),), ("slope",)),
+    "avgvol":     ((("period", DEFAULT_PERIOD),), ("avgvol",)),
+    "avgvolccy":  ((("period", DEFAULT_PERIOD),), ("avgvolccy",)),
+    "atr":        ((("period", DEFAULT_PERIOD),), ("atr",)),
+    "cci":        ((("period", DEFAULT_PERIOD),), ("cci",)),
+    "dmi":        ((("period", DEFAULT_PERIOD),), ("plus_di", "minus_di", "dx")),
+    "adx":        ((("period", DEFAULT_PERIOD),), ("adx",)),
+    "bbands":     ((("period", DEFAULT_PERIOD),), ("uband", "mband", "lband")),
+    "macd":       ((("fast_period", 12), ("slow_period", 26), ("signal_period", 9)),
+                   ("macd", "signal", "divergence")),
+    "stochastic": ((("fast_kperiod", 14), ("slow_kperiod", 3), ("slow_dperiod", 3)),
+                   ("k_values", "d_values")),
+    "stochrsi":   ((("period", 14), ("fast_kperiod", 14), ("fast_dperiod", 14)),
+                   ("fast_k_values", "fast_d_values")),
+    "sar":        ((("acceleration", 0.02), ("maximum", 0.20)), ("sar",)),
+    "beta":       ((("period", DEFAULT_PERIOD), ("code2", "GSPC.INDX")), ("beta",)),
+}
+
+FUNC_ALIASES = {"dx": "dmi"}
+
+FLOAT_PARAMS = {"acceleration", "maximum"}
+STR_PARAMS = {"code2"}
+
+
+class IndicatorSpec(NamedTuple):
+    function: str
+    params: Dict[str, Any]
+    label: str
+
+    @property
+    def fields(self) -> tuple:
+        return FUNCTIONS[self.function][1]
+
+    def columns(self) -> List[str]:
+        """Output column names: the label for single-output functions, label_field otherwise."""
+        if len(self.fields) == 1:
+            return [self.label]
+        return [f"{self.label}_{f}" for f in self.fields]
+
+
+def _fmt_param(v: Any) -> str:
+    return f"{v:g}" if isinstance(v, float) else str(v)
+
+
+def parse_specs(indicators: Union[str, Sequence[Union[str, Dict[str, Any]]]]) -> List[IndicatorSpec]:
+    """
+    Parse indicator specs. Accepts:
+      - "sma:50,ema:20,rsi:14,macd:12:26:9,bbands:20" (positional params per FUNCTIONS order)
+      - ["sma:50", {"function": "macd", "fast_period": 8}, {"function": "rsi", "label": "rsi_fast", "period": 7}]
+    Raises ValueError with a user-facing message on bad input. Duplicates are dropped.
+    """
+    if isinstance(indicators, str):
+        items: List[Any] = [p for p in (s.strip() for s in indicators.split(",")) if p]
+    elif isinstance(indicators, (list, tuple)):
+        items = list(indicators)
+    else:
+        raise ValueError("'indicators' must be a string like 'sma:50,rsi:14' or a list of specs.")
+    if not items:
+        raise ValueError("'indicators' must contain at least one indicator.")
+
+    specs: List[IndicatorSpec] = []
+    seen: set = set()
+    for item in items:
+        if isinstance(item, str):
+            name, *positional = [p.strip() for p in item.split(":")]
+            raw: Dict[str, Any] = {}
+            label = None
+        elif isinstance(item, dict):
+            raw = dict(item)
+            name = str(raw.pop("function", "") or "")
+            label = raw.pop("label", None)
+            positional = []
+        else:
+            raise ValueError(f"Unsupported indicator spec: {item!r}")
+
+        fn = FUNC_ALIASES.get(name.lower(), name.lower())
+        if fn not in FUNCTIONS:
+            raise ValueError(f"Unsupported function '{name}'. Allowed: {sorted(FUNCTIONS)}")
+        defaults = FUNCTIONS[fn][0]
+        if len(positional) > len(defaults):
+            raise ValueError(f"Too many parameters for '{fn}': expected at most {len(defaults)}.")
+
+        unknown = set(raw) - {k for k, _ in defaults}
+        if unknown:
+            raise ValueError(f"Unknown parameter(s) for '{fn}': {sorted(unknown)}")
+
+        params: Dict[str, Any] = {}
+        for i, (key, default) in enumerate(defaults):
+            val = positional[i] if i < len(positional) and positional[i] != "" else raw.get(key, default)
+            if val is None:
+                val = default
+            params[key] = _coerce_param(fn, key, val)
+
+        if label is None:
+            label = "_".join([fn] + [_fmt_param(params[k]) for k, _ in defaults])
+        key = (fn, tuple(params.items()))
+        if key in seen:
+            continue
+        seen.add(key)
+        specs.append(IndicatorSpec(fn, params, str(label)))
+    return specs
+
+
+def _coerce_param(fn: str, key: str, val: Any) -> Any:
+    if key in STR_PARAMS:
+        if not isinstance(val, str) or not val.strip():
+            raise ValueError(f"Parameter '{key}' for '{fn}' must be a ticker string.")
+        return val.strip()
+    if key in FLOAT_PARAMS:
+        try:
+            f = float(val)
+        except (TypeError, ValueError):
+            raise ValueError(f"Parameter '{key}' for '{fn}' must be a number.")
+        if not (0 < f <= 1):
+            raise ValueError(f"Parameter '{key}' for '{fn}' must be in (0, 1].")
+        return f
+    try:
+        i = int(val)
+    except (TypeError, ValueError):
+        raise ValueError(f"Parameter '{key}' for '{fn}' must be an integer.")
+    low = 1 if key in {"slow_kperiod", "slow_dperiod", "fast_dperiod", "signal_period"} else PERIOD_MIN
+    if not (low <= i <= PERIOD_MAX):
+        raise ValueError(f"Parameter '{key}' for '{fn}' out of range [{low}, {PERIOD_MAX}].")
+    return i
+
+
+def lookback(spec: IndicatorSpec) -> int:
+    """Bars of history needed before the first requested date for values to settle."""
+    p = spec.params
+    fn = spec.function
+    if fn in {"ema", "rsi", "atr", "dmi"}:
+        return 4 * p["period"]
+    if fn == "adx":
+        return 6 * p["period"]
+    if fn == "macd":
+        return 4 * p["slow_period"] + p["signal_period"]
+    if fn == "stochastic":
+        return p["fast_kperiod"] + p["slow_kperiod"] + p["slow_dperiod"]
+    if fn == "stochrsi":
+        return 4 * p["period"] + p["fast_kperiod"] + p["fast_dperiod"]
+    if fn == "sar":
+        return 60
+    return p["period"] + 1
+
+
+def benchmarks(specs: Sequence[IndicatorSpec]) -> List[str]:
+    """Second tickers needed by 'beta' specs."""
+    return sorted({s.params["code2"] for s in specs if s.function == "beta"})
+
+
+# --- array helpers ---
+
+def _nan(n: int) -> "np.ndarray":
+    return np.full(n, np.nan)
+
+
+def _place(n: int, values: "np.ndarray", offset: int) -> "np.ndarray":
+    out = _nan(n)
+    if len(values):
+        out[offset:offset + len(values)] = values
+    return out
+
+
+def _valid_tail(x: "np.ndarray") -> int:
+    """Index of the first non-NaN value (len(x) if none)."""
+    idx = np.flatnonzero(~np.isnan(x))
+    return int(idx[0]) if len(idx) else len(x)
+
+
+def _on_valid(x: "np.ndarray", fn, *args) -> "np.ndarray":
+    """Apply fn to the non-NaN tail of x (indicators of indicators) and re-align."""
+    start = _valid_tail(x)
+    return _place(len(x), fn(x[start:], *args), start)
+
+
+def sma(x: "np.ndarray", n: int) -> "np.ndarray":
+    out = _nan(len(x))
+    if len(x) >= n:
+        c = np.cumsum(np.insert(x, 0, 0.0))
+        out[n - 1:] = (c[n:] - c[:-n]) / n
+    return out
+
+
+def _ewm(x: "np.ndarray", alpha: float, n: int) -> "np.ndarray":
+    """Recursive smoothing seeded with the mean of the first n values."""
+    if len(x) < n:
+        return _nan(len(x))
+    xs = x.tolist()
+    prev = sum(xs[:n]) / n
+    vals = [prev]
+    b = 1.0 - alpha
+    for v in xs[n:]:
+        prev = alpha * v + b * prev
+        vals.append(prev)
+    return _place(len(x), np.asarray(vals), n - 1)
+
+
+def ema(x: "np.ndarray", n: int) -> "np.ndarray":
+    return _ewm(x, 2.0 / (n + 1), n)
+
+
+def wilder(x: "np.ndarray", n: int) -> "np.ndarray":
+    return _ewm(x, 1.0 / n, n)
+
+
+def wma(x: "np.ndarray", n: int) -> "np.ndarray":
+    if len(x) < n:
+        return _nan(len(x))
+    w = np.arange(1, n + 1, dtype=float)
+    return _place(len(x), sliding_window_view(x, n) @ w / w.sum(), n - 1)
+
+
+def rolling_std(x: "np.ndarray", n: int, ddof: int = 0) -> "np.ndarray":
+    if len(x) < n:
+        return _nan(len(x))
+    return _place(len(x), sliding_window_view(x, n).std(axis=1, ddof=ddof), n - 1)
+
+
+def slope(x: "np.ndarray", n: int) -> "np.ndarray":
+    """Least-squares slope per bar over a rolling window."""
+    if len(x) < n:
+        return _nan(len(x))
+    t = np.arange(n, dtype=float) - (n - 1) / 2.0
+    return _place(len(x), sliding_window_view(x, n) @ t / (t @ t), n - 1)
+
+
+def volatility(close: "np.ndarray", n: int) -> "np.ndarray":
+    """Annualized (252d) sample deviation of daily log returns, in percent."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.diff(np.log(close))
+    vol = rolling_std(r, n, ddof=1) * math.sqrt(TRADING_DAYS) * 100.0
+    return np.concatenate(([np.nan], vol))
+
+
+def rsi(close: "np.ndarray", n: int) -> "np.ndarray":
+    d = np.diff(close)
+    avg_gain = wilder(np.clip(d, 0, None), n)
+    avg_loss = wilder(np.clip(-d, 0, None), n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    out = np.where((avg_loss == 0) & ~np.isnan(avg_gain), 100.0, out)
+    return np.concatenate(([np.nan], out))
+
+
+def true_range(high: "np.ndarray", low: "np.ndarray", close: "np.ndarray") -> "np.ndarray":
+    """TR from the second bar on (needs the previous close)."""
+    prev = close[:-1]
+    return np.maximum.reduce([high[1:] - low[1:], np.abs(high[1:] - prev), np.abs(low[1:] - prev)])
+
+
+def atr(high, low, close, n: int) -> "np.ndarray":
+    return np.concatenate(([np.nan], wilder(true_range(high, low, close), n)))
+
+
+def cci(high, low, close, n: int) -> "np.ndarray":
+    tp = (high + low + close) / 3.0
+    if len(tp) < n:
+        return _nan(len(tp))
+    win = sliding_window_view(tp, n)
+    mean = win.mean(axis=1)
+    md = np.abs(win - mean[:, None]).mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vals = np.where(md == 0, 0.0, (tp[n - 1:] - mean) / (0.015 * md))
+    return _place(len(tp), vals, n - 1)
+
+
+def _stoch_k(x: "np.ndarray", hi: "np.ndarray", lo: "np.ndarray", n: int) -> "np.ndarray":
+    if len(x) < n:
+        return _nan(len(x))
+    hh = sliding_window_view(hi, n).max(axis=1)
+    ll = sliding_window_view(lo, n).min(axis=1)
+    rng = hh - ll
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = np.where(rng == 0, 0.0, 100.0 * (x[n - 1:] - ll) / rng)
+    return _place(len(x), k, n - 1)
+
+
+def stochastic(high, low, close, fast_k: int, slow_k: int, slow_d: int):
+    k_fast = _stoch_k(close, high, low, fast_k)
+    k = _on_valid(k_fast, sma, slow_k)
+    d = _on_valid(k, sma, slow_d)
+    return k, d
+
+
+def stochrsi(close, n: int, fast_k: int, fast_d: int):
+    r = rsi(close, n)
+    start = _valid_tail(r)
+    tail = r[start:]
+    k = _place(len(r), _stoch_k(tail, tail, tail, fast_k), start)
+    d = _on_valid(k, sma, fast_d)
+    return k, d
+
+
+def dmi(high, low, close, n: int):
+    up = high[1:] - high[:-1]
+    down = low[:-1] - low[1:]
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+    tr = wilder(true_range(high, low, close), n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = 100.0 * wilder(plus_dm, n) / tr
+        minus_di = 100.0 * wilder(minus_dm, n) / tr
+        total = plus_di + minus_di
+        dx = np.where(total == 0, 0.0, 100.0 * np.abs(plus_di - minus_di) / total)
+    dx = np.where(np.isnan(plus_di), np.nan, dx)
+    lead = [np.nan]
+    return (np.concatenate((lead, plus_di)), np.concatenate((lead, minus_di)), np.concatenate((lead, dx)))
+
+
+def adx(high, low, close, n: int) -> "np.ndarray":
+    _, _, dx = dmi(high, low, close, n)
+    return _on_valid(dx, wilder, n)
+
+
+def sar(high, low, acceleration: float, maximum: float) -> "np.ndarray":
+    """Parabolic SAR (Wilder); the trend direction is taken from the first two bars."""
+    n = len(high)
+    out = _nan(n)
+    if n < 2:
+        return out
+    hs, ls = high.tolist(), low.tolist()
+    up = hs[1] >= hs[0]
+    ep = hs[1] if up else ls[1]
+    s = ls[0] if up else hs[0]
+    af = acceleration
+    vals = [s]
+    for i in range(2, n):
+        s = s + af * (ep - s)
+        if up:
+            s = min(s, ls[i - 1], ls[i - 2])
+            if ls[i] < s:
+                up, s, ep, af = False, ep, ls[i], acceleration
+            elif hs[i] > ep:
+                ep, af = hs[i], min(af + acceleration, maximum)
+        else:
+            s = max(s, hs[i - 1], hs[i - 2])
+            if hs[i] > s:
+                up, s, ep, af = True, ep, hs[i], acceleration
+            elif ls[i] < ep:
+                ep, af = ls[i], min(af + acceleration, maximum)
+        vals.append(s)
+    out[1:] = vals
+    return out
+
+
+def beta(close: "np.ndarray", bench: "np.ndarray", n: int) -> "np.ndarray":
+    """Rolling beta of simple returns against a benchmark aligned to the same dates."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r1 = close[1:] / close[:-1] - 1.0
+        r2 = bench[1:] / bench[:-1] - 1.0
+    if len(r1) < n:
+        return _nan(len(close))
+    w1 = sliding_window_view(r1, n)
+    w2 = sliding_window_view(r2, n)
+    m2 = w2.mean(axis=1)
+    cov = (w1 * w2).mean(axis=1) - w1.mean(axis=1) * m2
+    var = (w2 * w2).mean(axis=1) - m2 * m2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vals = cov / var
+    return _place(len(close), vals, n)
+
+
+# --- bars -> columns ---
+
+def _column(bars: Sequence[Dict[str, Any]], key: str) -> "np.ndarray":
+    return np.array([b.get(key) if b.get(key) is not None else np.nan for b in bars], dtype=float)
+
+
+def bars_to_arrays(bars: Sequence[Dict[str, Any]], adjusted: bool = True) -> Dict[str, Any]:
+    """
+    EOD bars (ascending) -> {"date": [...], "open"/"high"/"low"/"close"/"volume": arrays}.
+    With adjusted=True, OHLC are scaled by adjusted_close / close, matching the API default
+    (split- and dividend-adjusted).
+    """
+    out: Dict[str, Any] = {"date": [b.get("date") for b in bars]}
+    for key in ("open", "high", "low", "close", "volume"):
+        out[key] = _column(bars, key)
+    if adjusted and bars and "adjusted_close" in bars[0]:
+        adj = _column(bars, "adjusted_close")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            factor = np.where(out["close"] != 0, adj / out["close"], 1.0)
+        factor = np.where(np.isnan(factor), 1.0, factor)
+        for key in ("open", "high", "low", "close"):
+            out[key] = out[key] * factor
+    return out
+
+
+def compute(
+    bars: Sequence[Dict[str, Any]],
+    specs: Sequence[IndicatorSpec],
+    benchmark_bars: Optional[Dict[str, Sequence[Dict[str, Any]]]] = None,
+    adjusted: bool = True,
+) -> Dict[str, Any]:
+    """
+    Compute every spec over one ticker's bars.
+    Returns {"date": [...], <column>: ndarray, ...} with columns from IndicatorSpec.columns().
+    """
+    a = bars_to_arrays(bars, adjusted=adjusted)
+    h, l, c, v = a["high"], a["low"], a["close"], a["volume"]
+    out: Dict[str, Any] = {"date": a["date"]}
+
+    for spec in specs:
+        p = spec.params
+        fn = spec.function
+        if fn == "sma":
+            res = (sma(c, p["period"]),)
+        elif fn == "ema":
+            res = (ema(c, p["period"]),)
+        elif fn == "wma":
+            res = (wma(c, p["period"]),)
+        elif fn == "volatility":
+            res = (volatility(c, p["period"]),)
+        elif fn == "rsi":
+            res = (rsi(c, p["period"]),)
+        elif fn == "stddev":
+            res = (rolling_std(c, p["period"]),)
+        elif fn == "slope":
+            res = (slope(c, p["period"]),)
+        elif fn == "avgvol":
+            res = (sma(v, p["period"]),)
+        elif fn == "avgvolccy":
+            res = (sma(c * v, p["period"]),)
+        elif fn == "atr":
+            res = (atr(h, l, c, p["period"]),)
+        elif fn == "cci":
+            res = (cci(h, l, c, p["period"]),)
+        elif fn == "dmi":
+            res = dmi(h, l, c, p["period"])
+        elif fn == "adx":
+            res = (adx(h, l, c, p["period"]),)
+        elif fn == "bbands":
+            mid = sma(c, p["period"])
+            dev = 2.0 * rolling_std(c, p["period"])
+            res = (mid + dev, mid, mid - dev)
+        elif fn == "macd":
+            line = ema(c, p["fast_period"]) - ema(c, p["slow_period"])
+            signal = _on_valid(line, ema, p["signal_period"])
+            res = (line, signal, line - signal)
+        elif fn == "stochastic":
+            res = stochastic(h, l, c, p["fast_kperiod"], p["slow_kperiod"], p["slow_dperiod"])
+        elif fn == "stochrsi":
+            res = stochrsi(c, p["period"], p["fast_kperiod"], p["fast_dperiod"])
+        elif fn == "sar":
+            res = (sar(h, l, p["acceleration"], p["maximum"]),)
+        elif fn == "beta":
+            res = (_beta_for(a, (benchmark_bars or {}).get(p["code2"]), p["period"], adjusted),)
+        else:  # pragma: no cover - parse_specs rejects unknown functions
+            continue
+
+        for col, values in zip(spec.columns(), res):
+            out[col] = values
+    return out
+
+
+def _beta_for(a: Dict[str, Any], bench_bars, n: int, adjusted: bool) -> "np.ndarray":
+    """Beta on the dates both series share, mapped back onto the ticker's dates."""
+    if not bench_bars:
+        return _nan(len(a["date"]))
+    b = bars_to_arrays(bench_bars, adjusted=adjusted)
+    bench_by_date = dict(zip(b["date"], b["close"].tolist()))
+    idx = [i for i, d in enumerate(a["date"]) if d in bench_by_date]
+    if not idx:
+        return _nan(len(a["date"]))
+    close = a["close"][idx]
+    bench = np.array([bench_by_date[a["date"][i]] for i in idx], dtype=float)
+    out = _nan(len(a["date"]))
+    out[idx] = beta(close, bench, n)
+    return out
+
+
+def to_rows(columns: Dict[str, Any], start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Column arrays -> per-date rows (ascending), trimmed to [start, end]; NaN becomes None."""
+    dates = columns["date"]
+    names = [k for k in columns if k != "date"]
+    lists = {k: columns[k].tolist() for k in names}
+    rows: List[Dict[str, Any]] = []
+    for i, d in enumerate(dates):
+        if (start and d < start) or (end and d > end):
+            continue
+        row: Dict[str, Any] = {"date": d}
+        for k in names:
+            val = lists[k][i]
+            row[k] = None if val != val or val in (math.inf, -math.inf) else val
+        rows.append(row)
+    return rows
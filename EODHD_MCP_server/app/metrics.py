@@ -0,0 +1,308 @@
+# app/metrics.py
+#
+# Prometheus-style instrumentation: per-tool call counts, latency split into phases,
+# payload sizes, upstream latency / status per endpoint family, in-flight gauges, and
+# cache / retry / rate-limit counters collected at scrape time. Text exposition format
+# 0.0.4, no client library needed.
+#
+# Tool phases (seconds, per call):
+#   validate   - call start until the first upstream request (argument validation and
+#                the tool's own checks; the whole call when nothing goes upstream)
+#   upstream   - wall time with at least one make_request() in flight (cache lookups,
+#                rate-limit queueing, retries, network), minus parse
+#   parse      - JSON decoding of upstream bodies
+#   serialize  - to_json() of the tool result
+#   process    - everything else (merging, local indicators, reshaping)
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in self.values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *labels: str, value: float) -> None:
+        self.values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DURATION_BUCKETS) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        self.series: Dict[LabelValues, list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, *labels: str, value: float) -> None:
+        s = self.series.get(labels)
+        if s is None:
+            s = self.series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                s[i] += 1
+                break
+        s[-2] += value
+        s[-1] += 1
+
+    def render(self) -> List[str]:
+        out = self.header()
+        for labels, s in self.series.items():
+            running = 0
+            for bound, n in zip(self.buckets, s):
+                running += n
+                le = _labels(self.labelnames, labels, 'le="%s"' % _fmt(bound))
+                out.append(f"{self.name}_bucket{le} {running}")
+            le = _labels(self.labelnames, labels, 'le="+Inf"')
+            out.append(f"{self.name}_bucket{le} {s[-1]}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_fmt(round(s[-2], 6))}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, labels)} {s[-1]}")
+        return out
+
+
+# --- Metric set ---
+
+tool_calls = Counter("eodhd_mcp_tool_calls_total", "Tool calls by outcome (ok, error = JSON error body, exception).",
+                     ("tool", "status"))
+tool_duration = Histogram("eodhd_mcp_tool_duration_seconds", "Tool call latency.", ("tool",))
+tool_phase = Histogram("eodhd_mcp_tool_phase_seconds", "Tool call latency by phase.", ("tool", "phase"))
+tool_response_bytes = Histogram("eodhd_mcp_tool_response_bytes", "Tool result text size.", ("tool",),
+                                buckets=BYTES_BUCKETS)
+tools_in_flight = Gauge("eodhd_mcp_tools_in_flight", "Tool calls currently running.", ("tool",))
+
+upstream_requests = Counter("eodhd_mcp_upstream_requests_total",
+                            "Upstream HTTP attempts by endpoint family and status (HTTP code or 'error').",
+                            ("endpoint", "status"))
+upstream_duration = Histogram("eodhd_mcp_upstream_duration_seconds", "Upstream HTTP attempt latency.", ("endpoint",))
+upstream_response_bytes = Histogram("eodhd_mcp_upstream_response_bytes", "Upstream response body size.",
+                                    ("endpoint",), buckets=BYTES_BUCKETS)
+upstream_in_flight = Gauge("eodhd_mcp_upstream_in_flight", "Upstream HTTP attempts currently in flight.")
+
+METRICS: List[_Metric] = [tool_calls, tool_duration, tool_phase, tool_response_bytes, tools_in_flight,
+                          upstream_requests, upstream_duration, upstream_response_bytes, upstream_in_flight]
+
+
+# --- Per-call phase timer (contextvar; shared by tasks a tool spawns) ---
+
+class _CallTimer:
+    __slots__ = ("started", "first_upstream", "open", "opened_at", "upstream", "parse", "serialize")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.first_upstream: Optional[float] = None
+        self.open = 0
+        self.opened_at = 0.0
+        self.upstream = 0.0
+        self.parse = 0.0
+        self.serialize = 0.0
+
+    def phases(self) -> Tuple[float, Dict[str, float]]:
+        total = time.perf_counter() - self.started
+        if self.first_upstream is None:
+            validate = max(0.0, total - self.serialize)
+        else:
+            validate = self.first_upstream - self.started
+        upstream = max(0.0, self.upstream - self.parse)
+        process = max(0.0, total - validate - upstream - self.parse - self.serialize)
+        return total, {"validate": validate, "upstream": upstream, "parse": self.parse,
+                       "serialize": self.serialize, "process": process}
+
+
+_current: contextvars.ContextVar[Optional[_CallTimer]] = contextvars.ContextVar("eodhd_mcp_call", default=None)
+
+
+@contextmanager
+def upstream_span():
+    """Mark make_request() in flight for the current tool call (overlapping spans count once)."""
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    now = time.perf_counter()
+    if timer.first_upstream is None:
+        timer.first_upstream = now
+    if timer.open == 0:
+        timer.opened_at = now
+    timer.open += 1
+    try:
+        yield
+    finally:
+        timer.open -= 1
+        if timer.open == 0:
+            timer.upstream += time.perf_counter() - timer.opened_at
+
+
+def add_phase(phase: str, seconds: float) -> None:
+    """Add parse / serialize time to the current tool call, if any."""
+    timer = _current.get()
+    if timer is not None:
+        setattr(timer, phase, getattr(timer, phase) + seconds)
+
+
+def observe_upstream(endpoint: str, status: str, nbytes: int, seconds: float) -> None:
+    upstream_requests.inc(endpoint, status)
+    upstream_duration.observe(endpoint, value=seconds)
+    if nbytes:
+        upstream_response_bytes.observe(endpoint, value=nbytes)
+
+
+def _is_error_text(text: str) -> bool:
+    head = text[:32].lstrip()
+    return head.startswith("{") and head[1:].lstrip().startswith('"error"')
+
+
+def _result_text(result) -> str:
+    for block in getattr(result, "content", None) or ():
+        text = getattr(block, "text", None)
+        if isinstance(text, str):
+            return text
+    return ""
+
+
+# --- Scrape-time collectors (state owned by other modules) ---
+
+def _collected() -> Iterable[str]:
+    from .api_client import singleflight_stats
+    from .cache import response_cache
+    from .ratelimit import rate_limiter
+    from .retry import retry_policy
+
+    def family(metric: _Metric, samples: Iterable[Tuple[LabelValues, float]]) -> List[str]:
+        return metric.header() + [f"{metric.name}{_labels(metric.labelnames, k)} {_fmt(v)}" for k, v in samples]
+
+    cache = response_cache.stats()
+    yield from family(Counter("eodhd_mcp_cache_lookups_total", "Response cache lookups by result.", ("result",)),
+                      [(("hit",), cache["hits"]), (("miss",), cache["misses"])])
+    yield from family(Counter("eodhd_mcp_cache_evictions_total", "Response cache evictions."), [((), cache["evictions"])])
+    yield from family(Gauge("eodhd_mcp_cache_entries", "Entries in the in-memory response cache."), [((), cache["entries"])])
+    yield from family(Gauge("eodhd_mcp_cache_bytes", "Bytes held by the in-memory response cache."), [((), cache["bytes"])])
+
+    sf = singleflight_stats()
+    yield from family(Counter("eodhd_mcp_coalesced_requests_total", "GETs served by another caller's in-flight request."),
+                      [((), sf["coalesced"])])
+
+    retry = retry_policy.stats()
+    yield from family(Counter("eodhd_mcp_upstream_retries_total", "Upstream retries by outcome.", ("outcome",)),
+                      [(("retried",), retry["retries"]), (("recovered",), retry["recovered"]),
+                       (("exhausted",), retry["exhausted"])])
+    states = {"closed": 0, "half_open": 1, "open": 2}
+    yield from family(Gauge("eodhd_mcp_circuit_state", "Per-host circuit breaker (0 closed, 1 half-open, 2 open).",
+                            ("host",)),
+                      [((h,), states.get(b["state"], 0)) for h, b in retry["circuit_breakers"].items()])
+
+    tokens = rate_limiter.stats()["tokens"]
+    yield from family(Counter("eodhd_mcp_api_calls_total", "EODHD API calls charged, per token partition.",
+                              ("token",)),
+                      [((p,), t["calls"]) for p, t in tokens.items()])
+    yield from family(Counter("eodhd_mcp_rate_limited_total", "Requests held back by rate limiting, by kind.",
+                              ("token", "kind")),
+                      [((p, kind), t[key]) for p, t in tokens.items()
+                       for kind, key in (("queued", "queued"), ("rejected", "rejected"), ("upstream_429", "throttled_429"))])
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.extend(_collected())
+    return "\n".join(lines) + "\n"
+
+
+# --- FastMCP wiring ---
+
+try:
+    from fastmcp.server.middleware import Middleware
+except ImportError:  # older fastmcp: tool calls are not instrumented
+    Middleware = object  # type: ignore[misc,assignment]
+
+
+class MetricsMiddleware(Middleware):
+    """Times every tools/call (argument validation included) and records its outcome."""
+
+    async def on_call_tool(self, context, call_next):
+        tool = getattr(context.message, "name", "") or "unknown"
+        timer = _CallTimer()
+        token = _current.set(timer)
+        tools_in_flight.inc(tool)
+        status = "exception"
+        try:
+            result = await call_next(context)
+            text = _result_text(result)
+            status = "error" if _is_error_text(text) else "ok"
+            tool_response_bytes.observe(tool, value=len(text.encode("utf-8")))
+            return result
+        finally:
+            _current.reset(token)
+            tools_in_flight.dec(tool)
+            total, phases = timer.phases()
+            tool_calls.inc(tool, status)
+            tool_duration.observe(tool, value=total)
+            for phase, seconds in phases.items():
+                tool_phase.observe(tool, phase, value=seconds)
+
+
+def install(mcp, path: Optional[str] = "/metrics") -> None:
+    """Instrument every tool call on `mcp` and, when `path` is set, serve render() there."""
+    if Middleware is not object:
+        mcp.add_middleware(MetricsMiddleware())
+    if path:
+        from starlette.responses import Response
+
+        @mcp.custom_route(path, methods=["GET"], include_in_schema=False)
+        async def metrics_endpoint(request):
+            return Response(render(), media_type=CONTENT_TYPE)
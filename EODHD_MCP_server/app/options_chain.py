@@ -0,0 +1,233 @@
+# app/options_chain.py
+
+import asyncio
+import datetime as dt
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote_plus
+
+from .api_client import make_request, resolve_api_token
+from .cache import token_partition
+from .config import EODHD_API_BASE, EODHD_OPTIONS_CHAIN_MAX
+from .pagination import MAX_ALL_PAGES_ROWS, fetch_offset_pages
+
+try:
+    from zoneinfo import ZoneInfo
+    _US_EASTERN = ZoneInfo("America/New_York")
+except Exception:  # tzdata missing: fall back to UTC days
+    _US_EASTERN = dt.timezone.utc
+
+OPTION_TYPES = ("call", "put")
+
+
+def trading_day() -> str:
+    """Current US market date; a chain built on an earlier date is rebuilt."""
+    return dt.datetime.now(_US_EASTERN).date().isoformat()
+
+
+class _Side:
+    """One expiry and option type: strikes ascending in a typed array, rows in step."""
+
+    __slots__ = ("strikes", "rows")
+
+    def __init__(self, pairs: List[Tuple[float, dict]]) -> None:
+        pairs.sort(key=lambda p: p[0])
+        self.strikes = array("d", (p[0] for p in pairs))
+        self.rows = [p[1] for p in pairs]
+
+    def between(self, lo: Optional[float], hi: Optional[float]) -> List[dict]:
+        i = 0 if lo is None else bisect_left(self.strikes, lo)
+        j = len(self.strikes) if hi is None else bisect_right(self.strikes, hi)
+        return self.rows[i:j]
+
+    def nearest(self, target: float, n: int = 1) -> List[dict]:
+        """The n strikes closest to target (ties go to the lower strike), in strike order."""
+        strikes = self.strikes
+        right = bisect_left(strikes, target)
+        left = right - 1
+        while n > 0 and (left >= 0 or right < len(strikes)):
+            if right >= len(strikes) or (left >= 0 and target - strikes[left] <= strikes[right] - target):
+                left -= 1
+            else:
+                right += 1
+            n -= 1
+        return self.rows[left + 1:right]
+
+
+class OptionsChain:
+    """All live contracts of one underlying, indexed by expiry then type then strike."""
+
+    def __init__(
+        self, underlying: str, day: str, rows: List[dict], truncated: bool = False, as_of: Optional[str] = None,
+    ) -> None:
+        self.underlying = underlying
+        self.trading_day = day
+        self.as_of = as_of
+        self.built_at = int(dt.datetime.now(dt.timezone.utc).timestamp())
+        self.truncated = truncated
+
+        # One row per contract: keep the latest trade date when pages overlap days.
+        latest: Dict[str, dict] = {}
+        for row in rows:
+            key = row.get("contract") or f"{row.get('exp_date')}:{row.get('type')}:{row.get('strike')}"
+            prev = latest.get(key)
+            if prev is None or str(row.get("tradetime") or "") >= str(prev.get("tradetime") or ""):
+                latest[key] = row
+
+        grouped: Dict[Tuple[str, str], List[Tuple[float, dict]]] = {}
+        for row in latest.values():
+            try:
+                strike = float(row.get("strike"))
+            except (TypeError, ValueError):
+                continue
+            exp = str(row.get("exp_date") or "")[:10]
+            typ = str(row.get("type") or "").lower()
+            if exp and typ in OPTION_TYPES:
+                grouped.setdefault((exp, typ), []).append((strike, row))
+
+        self._sides: Dict[Tuple[str, str], _Side] = {k: _Side(v) for k, v in grouped.items()}
+        self.expiries: List[str] = sorted({exp for exp, _ in self._sides})
+        self.contracts = sum(len(s.rows) for s in self._sides.values())
+
+    def select_expiries(
+        self,
+        exp_from: Optional[str] = None,
+        exp_to: Optional[str] = None,
+        next_n: Optional[int] = None,
+    ) -> List[str]:
+        i = 0 if exp_from is None else bisect_left(self.expiries, exp_from)
+        j = len(self.expiries) if exp_to is None else bisect_right(self.expiries, exp_to)
+        picked = self.expiries[i:j]
+        return picked[:next_n] if next_n is not None else picked
+
+    def side(self, exp: str, typ: str) -> Optional[_Side]:
+        return self._sides.get((exp, typ))
+
+    def stats(self) -> dict:
+        return {
+            "underlying": self.underlying,
+            "trading_day": self.trading_day,
+            "as_of": self.as_of,
+            "built_at": self.built_at,
+            "expiries": len(self.expiries),
+            "contracts": self.contracts,
+            "truncated": self.truncated,
+        }
+
+
+async def _recent_sessions(underlying: str, token: Optional[str], day: str) -> List[str]:
+    """The underlying's last two daily bar dates up to day, newest first ([] when unknown)."""
+    since = (dt.date.fromisoformat(day) - dt.timedelta(days=10)).isoformat()
+    url = f"{EODHD_API_BASE}/eod/{quote_plus(underlying)}.US?period=d&order=d&fmt=json&from={since}&to={day}"
+    if token:
+        url += f"&api_token={quote_plus(token)}"
+    data = await make_request(url)
+    if not isinstance(data, list):
+        return []
+    dates = sorted({str(r.get("date"))[:10] for r in data if isinstance(r, dict) and r.get("date")}, reverse=True)
+    return [d for d in dates if d <= day][:2]
+
+
+def _attributes(row: Any) -> Optional[dict]:
+    if not isinstance(row, dict):
+        return None
+    attrs = row.get("attributes")
+    return attrs if isinstance(attrs, dict) else row
+
+
+class OptionsChainCache:
+    """
+    Per-underlying chains (per token partition), LRU-bounded, rebuilt when the
+    trading day changes. Concurrent requests for the same chain share one build.
+    """
+
+    def __init__(self, max_chains: int = 16) -> None:
+        self.max_chains = max(1, max_chains)
+        self._chains: "OrderedDict[tuple, OptionsChain]" = OrderedDict()
+        self._locks: Dict[tuple, asyncio.Lock] = {}
+        self.builds = 0
+        self.hits = 0
+
+    async def get(
+        self,
+        underlying: str,
+        api_token: Optional[str] = None,
+        refresh: bool = False,
+        concurrency: int = 4,
+    ) -> Tuple[Optional[OptionsChain], Optional[str], Optional[dict]]:
+        """Return (chain, source 'memory'|'upstream', error dict)."""
+        underlying = underlying.strip().upper()
+        token = resolve_api_token(api_token)
+        key = (token_partition(token), underlying)
+        day = trading_day()
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            chain = self._chains.get(key)
+            if chain is not None and not refresh and chain.trading_day == day:
+                self._chains.move_to_end(key)
+                self.hits += 1
+                return chain, "memory", None
+
+            # options/eod holds one row per contract and trade date, so without a tradetime
+            # filter a liquid underlying's history fills the page cap before the high strikes
+            # and later expiries are reached. Only the latest session is fetched; if its rows
+            # are not published yet, the one before; unfiltered only when both are unknown/empty.
+            sessions: List[Optional[str]] = list(await _recent_sessions(underlying, token, day))
+            for as_of in sessions + [None]:
+                fetched = await self._fetch_rows(underlying, token, day, as_of, concurrency)
+                if isinstance(fetched, dict):
+                    return None, None, fetched
+                rows, truncated = fetched
+                if rows:
+                    break
+
+            chain = OptionsChain(underlying, day, rows, truncated, as_of)
+            self.builds += 1
+            self._chains[key] = chain
+            self._chains.move_to_end(key)
+            while len(self._chains) > self.max_chains:
+                old, _ = self._chains.popitem(last=False)
+                self._locks.pop(old, None)
+            return chain, "upstream", None
+
+    async def _fetch_rows(
+        self, underlying: str, token: Optional[str], day: str, as_of: Optional[str], concurrency: int,
+    ) -> Any:
+        """Live-expiry rows (traded on or after as_of) and a truncated flag, or an error dict."""
+        # Calls and puts are paged separately so each side gets the full offset
+        # window (page[offset] <= 10000).
+        base = (
+            f"{EODHD_API_BASE}/mp/unicornbay/options/eod?1=1"
+            f"&filter[underlying_symbol]={quote_plus(underlying)}"
+            f"&filter[exp_date_from]={day}&sort=strike&fmt=json"
+        )
+        if as_of:
+            base += f"&filter[tradetime_from]={as_of}"
+        if token:
+            base += f"&api_token={quote_plus(token)}"
+        pages = await asyncio.gather(*(
+            fetch_offset_pages(f"{base}&filter[type]={typ}", 0, 1000, MAX_ALL_PAGES_ROWS, concurrency)
+            for typ in OPTION_TYPES
+        ))
+
+        rows: List[dict] = []
+        truncated = False
+        for res in pages:
+            if res.get("error"):
+                return res
+            truncated = truncated or bool(res.get("meta", {}).get("truncated")) or bool(res.get("errors"))
+            rows.extend(a for a in map(_attributes, res.get("data") or []) if a is not None)
+        return rows, truncated
+
+    def stats(self) -> dict:
+        return {
+            "builds": self.builds,
+            "hits": self.hits,
+            "chains": [c.stats() for c in self._chains.values()],
+        }
+
+
+options_chains = OptionsChainCache(max_chains=EODHD_OPTIONS_CHAIN_MAX)
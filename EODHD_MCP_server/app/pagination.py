@@ -0,0 +1,89 @@
+# app/pagination.py
+
+from typing import Any, Awaitable, Callable, List, Optional
+
+from .api_client import make_request
+from .concurrency import gather_bounded
+
+# Marketplace offset pagination (options contracts / EOD): page[offset] <= 10000, page[limit] <= 1000
+MAX_PAGE_OFFSET = 10000
+MAX_PAGE_LIMIT = 1000
+MAX_ALL_PAGES_ROWS = MAX_PAGE_OFFSET + MAX_PAGE_LIMIT
+
+
+def _page_url(base_url: str, offset: int, limit: int) -> str:
+    return f"{base_url}&page[offset]={offset}&page[limit]={limit}"
+
+
+async def fetch_offset_pages(
+    base_url: str,
+    page_offset: int = 0,
+    page_limit: int = MAX_PAGE_LIMIT,
+    max_rows: int = MAX_PAGE_OFFSET,
+    concurrency: int = 4,
+    progress: Optional[Callable[[int, int], Awaitable[Any]]] = None,
+) -> dict:
+    """
+    Fetch every page of an offset-paginated {meta, data[], links} endpoint.
+
+    The first page's meta.total decides which offsets remain; those are fetched
+    concurrently (bounded) and data[] is concatenated in offset order, so the
+    upstream sort is preserved. `base_url` carries every other query parameter
+    (filters, sort, fields[...], compact, token); the page params are appended here.
+
+    Returns the first page's envelope with the merged data[] and meta extended by
+    pages / returned / truncated (more rows exist than max_rows or the offset limit
+    allows) and, when pages failed, "errors": [{"offset", "error"}].
+    Returns {"error": ...} when the first page fails.
+    """
+    first = await make_request(_page_url(base_url, page_offset, page_limit))
+    if first is None:
+        return {"error": "No response from API."}
+    if not isinstance(first, dict) or first.get("error"):
+        return first if isinstance(first, dict) else {"error": "Unexpected response format from API."}
+
+    meta = first.get("meta") if isinstance(first.get("meta"), dict) else {}
+    data: List[Any] = list(first.get("data") or [])
+    try:
+        total = int(meta.get("total"))
+    except (TypeError, ValueError):
+        total = page_offset + len(data)
+
+    end = min(total, page_offset + max_rows)
+    offsets = [o for o in range(page_offset + page_limit, end, page_limit) if o <= MAX_PAGE_OFFSET]
+    pages_total = 1 + len(offsets)
+    done = 1
+    if progress is not None:
+        await progress(done, pages_total)
+
+    async def _page(offset: int):
+        nonlocal done
+        res = await make_request(_page_url(base_url, offset, min(page_limit, end - offset)))
+        done += 1
+        if progress is not None:
+            await progress(done, pages_total)
+        return res
+
+    errors = []
+    for offset, res in zip(offsets, await gather_bounded([_page(o) for o in offsets], concurrency)):
+        if isinstance(res, dict) and not res.get("error"):
+            data.extend(res.get("data") or [])
+        else:
+            errors.append({"offset": offset, "error": res.get("error") if isinstance(res, dict) else "No response from API."})
+
+    del data[max_rows:]
+    covered = min(end, (offsets[-1] if offsets else page_offset) + page_limit)
+    out = dict(first)
+    out["data"] = data
+    out["meta"] = {
+        **meta,
+        "offset": page_offset,
+        "pages": pages_total,
+        "returned": len(data),
+        "truncated": total > covered,
+    }
+    if isinstance(out.get("links"), dict):
+        out["links"] = {**out["links"], "next": None}
+    if errors:
+        out["errors"] = errors
+    return out
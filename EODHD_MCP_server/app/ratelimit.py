@@ -0,0 +1,292 @@
+# app/ratelimit.py
+
+import asyncio
+import datetime as dt
+import logging
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from .cache import token_partition
+from .config import (
+    EODHD_DAILY_LIMIT,
+    EODHD_RATE_LIMIT_BURST,
+    EODHD_RATE_LIMIT_ENABLED,
+    EODHD_RATE_LIMIT_MAX_WAIT,
+    EODHD_RATE_LIMIT_PER_MINUTE,
+)
+from .retry import parse_retry_after
+
+logger = logging.getLogger("eodhd-mcp.ratelimit")
+
+# --- Call cost per endpoint family (EODHD "API calls" consumed by one request) ---
+
+# First matching path prefix wins; everything else costs 1 call.
+CALL_COSTS: Tuple[Tuple[str, int], ...] = (
+    ("/eod-bulk-last-day/", 100),
+    ("/technical/", 5),
+    ("/intraday/", 5),
+    ("/news", 5),
+    ("/screener", 5),
+    ("/ticks/", 10),
+    ("/cboe/", 10),
+    ("/fundamentals/", 10),
+    ("/historical-market-cap/", 10),
+    ("/insider-transactions", 10),
+    ("/calendar/trends", 10),
+    ("/mp/", 10),  # Marketplace: 1 request = 10 API calls
+)
+
+
+def _api_path(url: str) -> str:
+    path = urlsplit(url).path
+    return path[4:] if path.startswith("/api/") else path
+
+
+def endpoint_family(url: str) -> str:
+    """Label used for per-endpoint counters: '/technical', '/mp/praams', '/calendar/earnings', ..."""
+    parts = [p for p in _api_path(url).split("/") if p]
+    if not parts:
+        return "/"
+    depth = 2 if parts[0] in {"mp", "calendar", "cboe"} and len(parts) > 1 else 1
+    return "/" + "/".join(parts[:depth])
+
+
+def call_cost(url: str) -> int:
+    """
+    EODHD API calls one request to this URL consumes. Live quotes cost one call per
+    ticker, so '/real-time/AAPL.US?s=MSFT.US,TSLA.US' costs 3.
+    """
+    path = _api_path(url)
+    for prefix, cost in CALL_COSTS:
+        if path.startswith(prefix):
+            return cost
+    if path.startswith("/real-time/") or path.startswith("/us-quote-delayed"):
+        params = dict(parse_qsl(urlsplit(url).query, keep_blank_values=True))
+        extra = [s for s in params.get("s", "").split(",") if s.strip()]
+        return len(extra) + (1 if path.startswith("/real-time/") else 0) or 1
+    return 1
+
+
+def _token_of(url: str) -> str:
+    for k, v in parse_qsl(urlsplit(url).query, keep_blank_values=True):
+        if k == "api_token":
+            return v
+    return ""
+
+
+class RateLimitWaitExceeded(Exception):
+    pass
+
+
+class TokenBucket:
+    """
+    Token bucket with a FIFO wait queue. A request that cannot be served now waits
+    behind earlier ones, so a burst of cheap calls cannot starve an expensive one.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float) -> None:
+        self.rate = max(rate_per_second, 1e-9)
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._waiters: "deque[Tuple[float, asyncio.Future]]" = deque()
+        self._pump: Optional[asyncio.Task] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, f in self._waiters if not f.done())
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    async def acquire(self, cost: float, max_wait: float) -> float:
+        """Take `cost` tokens, waiting in line if needed; returns the seconds waited."""
+        cost = min(float(cost), self.capacity)
+        self._refill()
+        if not self._waiters and self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append((cost, fut))
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.ensure_future(self._drain())
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(fut, max_wait)
+        except asyncio.TimeoutError:
+            raise RateLimitWaitExceeded(f"waited {max_wait:.0f}s for {cost:.0f} API calls") from None
+        return time.monotonic() - started
+
+    async def _drain(self) -> None:
+        while self._waiters:
+            cost, fut = self._waiters[0]
+            if fut.done():  # timed out or cancelled while queued
+                self._waiters.popleft()
+                continue
+            self._refill()
+            if self.tokens >= cost:
+                self.tokens -= cost
+                self._waiters.popleft()
+                fut.set_result(None)
+                continue
+            await asyncio.sleep((cost - self.tokens) / self.rate)
+
+    def penalize(self, seconds: float) -> None:
+        """Upstream said slow down: empty the bucket (and go negative for `seconds`)."""
+        self._refill()
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class _Usage:
+    __slots__ = ("requests", "calls", "by_endpoint", "queued", "wait_seconds", "max_wait_seconds",
+                 "rejected", "throttled", "day", "calls_today", "upstream_limit", "upstream_remaining")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.calls = 0
+        self.by_endpoint: Dict[str, int] = {}
+        self.queued = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.rejected = 0
+        self.throttled = 0
+        self.day = ""
+        self.calls_today = 0
+        self.upstream_limit: Optional[int] = None
+        self.upstream_remaining: Optional[int] = None
+
+
+def _int_header(headers, name: str) -> Optional[int]:
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Per-token rate limiter for upstream EODHD calls, weighted by call_cost(url),
+    with running quota counters (per token partition, never the raw token).
+    """
+
+    def __init__(
+        self,
+        per_minute: float = 1000,
+        burst: float = 0,
+        max_wait: float = 120,
+        daily_limit: int = 100000,
+        enabled: bool = True,
+    ) -> None:
+        self.enabled = enabled
+        self.per_minute = per_minute
+        self.burst = burst or per_minute
+        self.max_wait = max_wait
+        self.daily_limit = daily_limit
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._usage: Dict[str, _Usage] = {}
+
+    def _bucket(self, partition: str) -> TokenBucket:
+        bucket = self._buckets.get(partition)
+        if bucket is None:
+            bucket = self._buckets[partition] = TokenBucket(self.per_minute / 60.0, self.burst)
+        return bucket
+
+    def _usage_for(self, partition: str) -> _Usage:
+        usage = self._usage.get(partition)
+        if usage is None:
+            usage = self._usage[partition] = _Usage()
+        today = dt.datetime.now(dt.timezone.utc).date().isoformat()
+        if usage.day != today:
+            usage.day, usage.calls_today = today, 0
+        return usage
+
+    async def acquire(self, url: str) -> Optional[dict]:
+        """
+        Wait for this URL's call budget; returns None when the request may go out,
+        or an {"error": ...} dict when it waited longer than max_wait.
+        """
+        partition = token_partition(_token_of(url))
+        cost = call_cost(url)
+        usage = self._usage_for(partition)
+
+        if self.enabled:
+            try:
+                waited = await self._bucket(partition).acquire(cost, self.max_wait)
+            except RateLimitWaitExceeded as e:
+                usage.rejected += 1
+                return {"error": f"Rate limit: request not sent, {e} (EODHD_RATE_LIMIT_PER_MINUTE={self.per_minute:g})."}
+            if waited > 0:
+                usage.queued += 1
+                usage.wait_seconds += waited
+                usage.max_wait_seconds = max(usage.max_wait_seconds, waited)
+
+        family = endpoint_family(url)
+        usage.requests += 1
+        usage.calls += cost
+        usage.calls_today += cost
+        usage.by_endpoint[family] = usage.by_endpoint.get(family, 0) + cost
+        return None
+
+    def observe(self, url: str, status_code: int, headers) -> None:
+        """Record upstream rate-limit headers; a 429 empties the token's bucket."""
+        partition = token_partition(_token_of(url))
+        usage = self._usage_for(partition)
+        limit = _int_header(headers, "x-ratelimit-limit")
+        remaining = _int_header(headers, "x-ratelimit-remaining")
+        if limit is not None:
+            usage.upstream_limit = limit
+        if remaining is not None:
+            usage.upstream_remaining = remaining
+        if status_code == 429:
+            usage.throttled += 1
+            retry_after = parse_retry_after(headers.get("retry-after")) or 0.0
+            if self.enabled:
+                self._bucket(partition).penalize(retry_after)
+            logger.warning("Upstream 429 for %s (retry-after=%.1fs)", endpoint_family(url), retry_after)
+
+    def stats(self) -> dict:
+        tokens = {}
+        for partition, usage in self._usage.items():
+            bucket = self._buckets.get(partition)
+            tokens[partition] = {
+                "requests": usage.requests,
+                "calls": usage.calls,
+                "calls_today": usage.calls_today,
+                "daily_remaining": max(0, self.daily_limit - usage.calls_today),
+                "by_endpoint": dict(sorted(usage.by_endpoint.items(), key=lambda kv: -kv[1])),
+                "queued": usage.queued,
+                "wait_seconds": round(usage.wait_seconds, 3),
+                "max_wait_seconds": round(usage.max_wait_seconds, 3),
+                "rejected": usage.rejected,
+                "throttled_429": usage.throttled,
+                "bucket_available": round(bucket.available(), 2) if bucket else None,
+                "waiting_now": bucket.queued if bucket else 0,
+                "upstream_limit": usage.upstream_limit,
+                "upstream_remaining": usage.upstream_remaining,
+            }
+        return {
+            "enabled": self.enabled,
+            "per_minute": self.per_minute,
+            "burst": self.burst,
+            "max_wait_seconds": self.max_wait,
+            "daily_limit": self.daily_limit,
+            "tokens": tokens,
+        }
+
+
+rate_limiter = RateLimiter(
+    per_minute=EODHD_RATE_LIMIT_PER_MINUTE,
+    burst=EODHD_RATE_LIMIT_BURST,
+    max_wait=EODHD_RATE_LIMIT_MAX_WAIT,
+    daily_limit=EODHD_DAILY_LIMIT,
+    enabled=EODHD_RATE_LIMIT_ENABLED,
+)
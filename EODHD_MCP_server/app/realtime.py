@@ -0,0 +1,635 @@
+# app/realtime.py
+"""
+Server-managed realtime WebSocket hub.
+
+One long-lived connection per (feed endpoint, token); symbols are reference-counted across
+consumers, so concurrent tool calls share a subscription instead of each dialing in. Dropped
+connections are re-established with backoff and every live symbol is resubscribed. Incoming
+messages land in bounded per-symbol buffers that tools read from.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .api_client import on_shutdown
+from .config import (
+    EODHD_WS_BASE,
+    EODHD_WS_BUFFER_SIZE,
+    EODHD_WS_IDLE_SECONDS,
+    EODHD_WS_LEASE_SECONDS,
+    EODHD_WS_MAX_MESSAGE_BYTES,
+    EODHD_WS_MAX_QUEUE,
+    EODHD_WS_MAX_SYMBOLS,
+    EODHD_WS_RECONNECT_MAX,
+)
+
+try:
+    import websockets
+except Exception:  # pragma: no cover
+    websockets = None  # callers report a helpful error
+
+logger = logging.getLogger("eodhd-mcp.realtime")
+
+FEED_ENDPOINTS = {
+    "us_trades": "us",         # trades (price, conditions, etc.)
+    "us_quotes": "us-quote",   # quotes (bid/ask)
+    "forex": "forex",
+    "crypto": "crypto",
+}
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def normalize_symbols(symbols: Any) -> List[str]:
+    """'AAPL, msft' | ['AAPL', 'MSFT'] -> ['AAPL', 'MSFT'] (upper-cased, de-duplicated, ordered)."""
+    if isinstance(symbols, str):
+        items: Iterable[Any] = symbols.split(",")
+    elif isinstance(symbols, (list, tuple, set)):
+        items = symbols
+    else:
+        return []
+    out: List[str] = []
+    for s in items:
+        sym = str(s).strip().upper() if s is not None else ""
+        if sym and sym not in out:
+            out.append(sym)
+    return out
+
+
+def _num(v: Any) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def price_size(msg: dict) -> Tuple[float, float]:
+    """
+    Numeric (price, size) for any feed's message: trades carry p/v (US) or p/q (crypto);
+    forex and US quotes carry bid/ask, reduced to the mid price with no size.
+    """
+    if "p" in msg:
+        return _num(msg["p"]), _num(msg.get("v", msg.get("q")))
+    if "a" in msg and "b" in msg:
+        return (_num(msg["a"]) + _num(msg["b"])) / 2.0, math.nan
+    if "ap" in msg and "bp" in msg:
+        return (_num(msg["ap"]) + _num(msg["bp"])) / 2.0, math.nan
+    return math.nan, math.nan
+
+
+class RingBuffer:
+    """
+    Fixed-capacity, array-backed ring of the last `capacity` messages for one symbol.
+
+    Per slot: arrival sequence, receive time (ms), event time 't' (ms), price, size (typed
+    arrays, preallocated) and the raw JSON frame (parsed again only when read). Nothing
+    grows after construction, so memory is bounded by capacity x EODHD_WS_MAX_MESSAGE_BYTES.
+    'total' counts every message ever appended; readers keep marks against it.
+    """
+
+    __slots__ = ("capacity", "total", "seq", "recv_ms", "ts", "price", "size", "raw")
+
+    def __init__(self, capacity: int) -> None:
+        c = max(1, int(capacity))
+        self.capacity = c
+        self.total = 0
+        self.seq = array("q", bytes(8 * c))
+        self.recv_ms = array("q", bytes(8 * c))
+        self.ts = array("q", bytes(8 * c))
+        self.price = array("d", [math.nan]) * c
+        self.size = array("d", [math.nan]) * c
+        self.raw: List[Optional[str]] = [None] * c
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def append(self, seq: int, recv_ms: int, raw: str, msg: dict) -> None:
+        i = self.total % self.capacity
+        t = msg.get("t")
+        price, size = price_size(msg)
+        self.seq[i] = seq
+        self.recv_ms[i] = recv_ms
+        self.ts[i] = int(t) if isinstance(t, (int, float)) else recv_ms
+        self.price[i] = price
+        self.size[i] = size
+        self.raw[i] = raw
+        self.total += 1
+
+    # --- logical positions (0 = oldest retained) ---
+
+    def _slot(self, pos: int) -> int:
+        return (self.total - len(self) + pos) % self.capacity
+
+    def _entries(self, start: int, end: int) -> List[tuple]:
+        out = []
+        for pos in range(start, end):
+            i = self._slot(pos)
+            out.append((self.seq[i], self.recv_ms[i], json.loads(self.raw[i])))
+        return out
+
+    def last(self, n: int) -> List[tuple]:
+        """Up to n most recent entries (seq, recv_ms, msg), oldest first."""
+        size = len(self)
+        return self._entries(max(0, size - max(0, n)), size)
+
+    def since_ms(self, ms: int) -> List[tuple]:
+        """Entries received at or after `ms` (receive times are non-decreasing, so bisect)."""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.recv_ms[self._slot(mid)] < ms:
+                lo = mid + 1
+            else:
+                hi = mid
+        return self._entries(lo, len(self))
+
+    def since(self, mark: int) -> Tuple[List[tuple], int]:
+        """Entries appended after `mark` (a previous .total) and how many were already overwritten."""
+        n = self.total - mark
+        if n <= 0:
+            return [], 0
+        k = min(n, len(self))
+        return self._entries(len(self) - k, len(self)), n - k
+
+    def values_since(self, mark: int) -> Tuple[List[tuple], int]:
+        """Like since(), but (event_ms, price, size) straight from the typed arrays (no JSON parse)."""
+        n = self.total - mark
+        if n <= 0:
+            return [], 0
+        k = min(n, len(self))
+        out = []
+        for pos in range(len(self) - k, len(self)):
+            i = self._slot(pos)
+            out.append((self.ts[i], self.price[i], self.size[i]))
+        return out, n - k
+
+    def latest_recv_ms(self) -> Optional[int]:
+        return self.recv_ms[self._slot(len(self) - 1)] if self.total else None
+
+
+class BarAggregator:
+    """
+    Server-side summaries of a tick stream: OHLCV bars per `bar_seconds` of event time,
+    VWAP and message counts per bar and per symbol. Quote/forex feeds have no size, so
+    their bars carry volume 0 and vwap None. State is O(symbols x bars), never O(ticks).
+    """
+
+    def __init__(self, bar_seconds: float) -> None:
+        self.bar_ms = max(1, int(bar_seconds * 1000))
+        self._bars: Dict[str, Dict[int, list]] = {}
+        self._totals: Dict[str, list] = {}
+
+    @staticmethod
+    def _update(acc: Optional[list], price: float, size: float) -> list:
+        # [open, high, low, close, volume, price*volume, count]
+        if acc is None:
+            return [price, price, price, price, size, price * size, 1]
+        if price > acc[1]:
+            acc[1] = price
+        if price < acc[2]:
+            acc[2] = price
+        acc[3] = price
+        acc[4] += size
+        acc[5] += price * size
+        acc[6] += 1
+        return acc
+
+    def add(self, symbol: str, event_ms: int, price: float, size: float) -> None:
+        if price != price:  # NaN: frame without a usable price
+            return
+        if size != size:
+            size = 0.0
+        bucket = event_ms - event_ms % self.bar_ms
+        bars = self._bars.setdefault(symbol, {})
+        bars[bucket] = self._update(bars.get(bucket), price, size)
+        self._totals[symbol] = self._update(self._totals.get(symbol), price, size)
+
+    @staticmethod
+    def _fmt(acc: list) -> Dict[str, Any]:
+        o, h, l, c, v, pv, n = acc
+        return {"open": o, "high": h, "low": l, "close": c, "volume": v,
+                "vwap": pv / v if v else None, "count": n}
+
+    def bars(self, symbol: str, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Bars for symbol with start_ms <= bar start < end_ms, oldest first."""
+        out = []
+        for t in sorted(self._bars.get(symbol, {})):
+            if (start_ms is not None and t < start_ms) or (end_ms is not None and t >= end_ms):
+                continue
+            out.append({"t": t, **self._fmt(self._bars[symbol][t])})
+        return out
+
+    def closed_bucket(self, now_ms: int) -> int:
+        """Start of the bar that is still open at now_ms (every earlier bar is complete)."""
+        return now_ms - now_ms % self.bar_ms
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            s: {**self._fmt(acc), "bars": self.bars(s)}
+            for s, acc in self._totals.items()
+        }
+
+
+class FeedConnection:
+    """One WebSocket to one feed endpoint, shared by every consumer of that feed and token."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        token: str,
+        *,
+        buffer_size: int = EODHD_WS_BUFFER_SIZE,
+        ping_interval: float = 20.0,
+        ping_timeout: float = 20.0,
+        connect_timeout: float = 15.0,
+        reconnect_max: float = EODHD_WS_RECONNECT_MAX,
+    ) -> None:
+        self.endpoint = endpoint
+        self.token = token
+        self.uri = f"{EODHD_WS_BASE}/{endpoint}?api_token={token}"
+        self.buffer_size = buffer_size
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.connect_timeout = connect_timeout
+        self.reconnect_max = reconnect_max
+
+        self.refs: Dict[str, int] = {}
+        self.buffers: Dict[str, RingBuffer] = {}
+        self._ws = None
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+        self._message_event = asyncio.Event()
+        self._seq = 0
+
+        self.connects = 0
+        self.reconnects = 0
+        self.messages = 0
+        self.connected_at: Optional[int] = None
+        self.last_error: Optional[str] = None
+        self.last_status: Any = None
+
+    # --- subscriptions ---
+
+    async def add(self, symbols: List[str]) -> None:
+        new = [s for s in symbols if self.refs.get(s, 0) == 0]
+        if len(self.refs) + len(new) > EODHD_WS_MAX_SYMBOLS:
+            raise ValueError(
+                f"Feed '{self.endpoint}' would exceed {EODHD_WS_MAX_SYMBOLS} live symbols (EODHD_WS_MAX_SYMBOLS)."
+            )
+        for s in symbols:
+            self.refs[s] = self.refs.get(s, 0) + 1
+            if s not in self.buffers:
+                self.buffers[s] = RingBuffer(self.buffer_size)
+        self._ensure_running()
+        if new:
+            # When not connected yet, the run loop subscribes every live symbol on connect.
+            await self._send({"action": "subscribe", "symbols": ",".join(new)})
+
+    async def remove(self, symbols: List[str]) -> None:
+        gone = []
+        for s in symbols:
+            n = self.refs.get(s, 0) - 1
+            if n > 0:
+                self.refs[s] = n
+            elif s in self.refs:
+                del self.refs[s]
+                self.buffers.pop(s, None)
+                gone.append(s)
+        if gone:
+            await self._send({"action": "unsubscribe", "symbols": ",".join(gone)})
+
+    @property
+    def idle(self) -> bool:
+        return not self.refs
+
+    # --- waiting ---
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    async def wait_connected(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def wait_message(self, timeout: float) -> bool:
+        """Wait until any new message is dispatched on this feed (or timeout)."""
+        try:
+            await asyncio.wait_for(self._message_event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    # --- connection lifecycle ---
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=f"ws-feed-{self.endpoint}")
+
+    async def _send(self, payload: dict) -> None:
+        ws = self._ws
+        if ws is None:
+            return
+        try:
+            await ws.send(json.dumps(payload))
+        except Exception as e:
+            # The receive loop notices the broken socket and reconnects/resubscribes.
+            logger.debug("WS send on %s failed: %s", self.endpoint, e)
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while self.refs:
+            try:
+                ws = await asyncio.wait_for(
+                    websockets.connect(
+                        self.uri,
+                        ping_interval=self.ping_interval,
+                        ping_timeout=self.ping_timeout,
+                        close_timeout=5,
+                        max_queue=EODHD_WS_MAX_QUEUE,
+                        max_size=EODHD_WS_MAX_MESSAGE_BYTES,
+                    ),
+                    timeout=self.connect_timeout,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = f"connect: {e or type(e).__name__}"
+                logger.warning("WS connect to %s failed (%s); retrying in %.1fs", self.endpoint, e, backoff)
+                await asyncio.sleep(backoff * (1 + random.random() * 0.25))
+                backoff = min(backoff * 2, self.reconnect_max)
+                continue
+
+            self._ws = ws
+            self.connects += 1
+            if self.connects > 1:
+                self.reconnects += 1
+            self.connected_at = _now_ms()
+            backoff = 1.0
+            try:
+                if self.refs:
+                    await ws.send(json.dumps({"action": "subscribe", "symbols": ",".join(self.refs)}))
+                self._connected.set()
+                async for raw in ws:
+                    self._dispatch(raw)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = f"recv: {e or type(e).__name__}"
+                logger.warning("WS feed %s dropped: %s", self.endpoint, e)
+            finally:
+                self._connected.clear()
+                self._ws = None
+                try:
+                    await ws.close()
+                except Exception:
+                    pass
+
+            if self.refs:
+                await asyncio.sleep(backoff * random.random())
+
+    def _dispatch(self, raw: Any) -> None:
+        recv_ms = _now_ms()
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8", errors="replace")
+        try:
+            msg = json.loads(raw)
+        except Exception:
+            self.last_status = {"raw": raw[:500]}
+            return
+        if not isinstance(msg, dict):
+            return
+
+        sym = msg.get("s")
+        buf = self.buffers.get(str(sym).upper()) if sym is not None else None
+        if buf is None:
+            # Auth/status frames and symbols nobody holds anymore
+            if sym is None:
+                self.last_status = msg
+            return
+
+        self._seq += 1
+        self.messages += 1
+        buf.append(self._seq, recv_ms, raw, msg)
+
+        event, self._message_event = self._message_event, asyncio.Event()
+        event.set()
+
+    async def close(self) -> None:
+        self.refs.clear()
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self.buffers.clear()
+
+    # --- reads ---
+
+    def marks(self, symbols: List[str]) -> Dict[str, int]:
+        return {s: self.buffers[s].total for s in symbols if s in self.buffers}
+
+    def count_since(self, marks: Dict[str, int]) -> int:
+        return sum(self.buffers[s].total - m for s, m in marks.items() if s in self.buffers)
+
+    def read_since(self, marks: Dict[str, int]) -> Tuple[List[Any], int]:
+        """Messages across symbols since `marks`, in arrival order, plus the number overwritten."""
+        entries: List[tuple] = []
+        dropped = 0
+        for s, mark in marks.items():
+            buf = self.buffers.get(s)
+            if buf is None:
+                continue
+            items, lost = buf.since(mark)
+            entries.extend(items)
+            dropped += lost
+        entries.sort(key=lambda e: e[0])
+        return [e[2] for e in entries], dropped
+
+    def read_values_since(self, marks: Dict[str, int]) -> Tuple[Dict[str, List[tuple]], int]:
+        """Per-symbol (event_ms, price, size) since `marks`, plus the number overwritten."""
+        out: Dict[str, List[tuple]] = {}
+        dropped = 0
+        for s, mark in marks.items():
+            buf = self.buffers.get(s)
+            if buf is None:
+                continue
+            out[s], lost = buf.values_since(mark)
+            dropped += lost
+        return out, dropped
+
+    def snapshot(self, symbols: List[str], last_n: Optional[int] = None, since_ms: Optional[int] = None) -> dict:
+        """
+        Per-symbol view of the ring buffers: messages received at/after since_ms (if given),
+        capped to the last_n most recent (default 1 when neither is given). No waiting.
+        """
+        if last_n is None and since_ms is None:
+            last_n = 1
+        out: Dict[str, Any] = {}
+        for s in symbols:
+            buf = self.buffers.get(s)
+            if buf is None:
+                out[s] = {"subscribed": False, "messages": []}
+                continue
+            if since_ms is not None:
+                entries = buf.since_ms(since_ms)
+                if last_n is not None:
+                    entries = entries[-last_n:] if last_n > 0 else []
+            else:
+                entries = buf.last(last_n)
+            out[s] = {
+                "subscribed": True,
+                "buffered": len(buf),
+                "total": buf.total,
+                "last_recv_ms": buf.latest_recv_ms(),
+                "messages": [m for _, _, m in entries],
+            }
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "endpoint": self.endpoint,
+            "connected": self.connected,
+            "connected_at": self.connected_at,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "messages": self.messages,
+            "symbols": {s: {"refs": n, "buffered": len(self.buffers[s])} for s, n in self.refs.items()},
+            "last_error": self.last_error,
+        }
+
+
+class RealtimeHub:
+    """Registry of shared feed connections; closes feeds that stay unused for idle_seconds."""
+
+    def __init__(self, idle_seconds: float = EODHD_WS_IDLE_SECONDS) -> None:
+        self.idle_seconds = idle_seconds
+        self._feeds: Dict[Tuple[str, str], FeedConnection] = {}
+        self._idle_timers: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
+        self._leases: Dict[Tuple[Tuple[str, str], str], asyncio.TimerHandle] = {}
+
+    def get(self, endpoint: str, token: str) -> Optional[FeedConnection]:
+        return self._feeds.get((endpoint, token))
+
+    async def acquire(self, endpoint: str, token: str, symbols: List[str], **conn_opts: Any) -> FeedConnection:
+        """Reference the given symbols on the shared feed, opening it if needed."""
+        key = (endpoint, token)
+        timer = self._idle_timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        feed = self._feeds.get(key)
+        if feed is None:
+            feed = self._feeds[key] = FeedConnection(endpoint, token, **conn_opts)
+        try:
+            await feed.add(symbols)
+        except ValueError:
+            await self.release(feed, [])
+            raise
+        return feed
+
+    async def release(self, feed: FeedConnection, symbols: List[str]) -> None:
+        if symbols:
+            await feed.remove(symbols)
+        key = (feed.endpoint, feed.token)
+        if feed.idle and self._feeds.get(key) is feed and key not in self._idle_timers:
+            loop = asyncio.get_running_loop()
+            self._idle_timers[key] = loop.call_later(
+                self.idle_seconds, lambda: asyncio.ensure_future(self._close_if_idle(key))
+            )
+
+    async def lease(
+        self,
+        endpoint: str,
+        token: str,
+        symbols: List[str],
+        ttl: float = EODHD_WS_LEASE_SECONDS,
+        **conn_opts: Any,
+    ) -> Tuple[FeedConnection, List[str]]:
+        """
+        Keep symbols subscribed until `ttl` seconds pass without another lease call for them
+        (each call renews). Used by snapshot reads, which must not block on a capture window.
+        Returns the feed and the symbols that were not held before this call.
+        """
+        key = (endpoint, token)
+        new = [s for s in symbols if (key, s) not in self._leases]
+        # Arm (or renew) every timer before awaiting, so an expiry that is already due
+        # cannot release a symbol this call is about to keep.
+        for s in symbols:
+            self._arm_lease(key, s, ttl)
+        try:
+            if new or key not in self._feeds:
+                feed = await self.acquire(endpoint, token, new, **conn_opts)
+            else:
+                feed = self._feeds[key]
+        except BaseException:
+            for s in new:
+                timer = self._leases.pop((key, s), None)
+                if timer is not None:
+                    timer.cancel()
+            raise
+        return feed, new
+
+    def _arm_lease(self, key: Tuple[str, str], sym: str, ttl: float) -> None:
+        old = self._leases.pop((key, sym), None)
+        if old is not None:
+            old.cancel()
+        timer: Optional[asyncio.TimerHandle] = None
+
+        def _fire() -> None:
+            asyncio.ensure_future(self._expire_lease(key, sym, timer))
+
+        timer = asyncio.get_running_loop().call_later(ttl, _fire)
+        self._leases[(key, sym)] = timer
+
+    async def _expire_lease(self, key: Tuple[str, str], sym: str, timer: Optional[asyncio.TimerHandle]) -> None:
+        # A renewal between the timer firing and this task running replaced the handle
+        if self._leases.get((key, sym)) is not timer:
+            return
+        del self._leases[(key, sym)]
+        feed = self._feeds.get(key)
+        if feed is not None:
+            await self.release(feed, [sym])
+
+    async def _close_if_idle(self, key: Tuple[str, str]) -> None:
+        self._idle_timers.pop(key, None)
+        feed = self._feeds.get(key)
+        if feed is not None and feed.idle:
+            del self._feeds[key]
+            await feed.close()
+
+    def stats(self) -> dict:
+        return {
+            "feeds": [f.stats() for f in self._feeds.values()],
+            "leased_symbols": len(self._leases),
+            "limits": {
+                "buffer_size": EODHD_WS_BUFFER_SIZE,
+                "max_symbols_per_feed": EODHD_WS_MAX_SYMBOLS,
+                "max_message_bytes": EODHD_WS_MAX_MESSAGE_BYTES,
+            },
+        }
+
+    async def close(self) -> None:
+        for timer in list(self._idle_timers.values()) + list(self._leases.values()):
+            timer.cancel()
+        self._idle_timers.clear()
+        self._leases.clear()
+        feeds, self._feeds = list(self._feeds.values()), {}
+        for feed in feeds:
+            await feed.close()
+
+
+realtime_hub = RealtimeHub()
+on_shutdown(realtime_hub.close)
@@ -0,0 +1,174 @@
+# app/retry.py
+
+import datetime as dt
+import email.utils
+import logging
+import random
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from .config import (
+    EODHD_BREAKER_FAILURES,
+    EODHD_BREAKER_RESET_SECONDS,
+    EODHD_RETRY_BASE_DELAY,
+    EODHD_RETRY_MAX_ATTEMPTS,
+    EODHD_RETRY_MAX_DELAY,
+)
+
+logger = logging.getLogger("eodhd-mcp.retry")
+
+# --- What counts as transient ---
+
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+# Statuses that say the host is degraded (429 is rate limiting, not an outage).
+BREAKER_STATUS = {500, 502, 503, 504}
+RETRY_EXCEPTIONS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds (delta-seconds or HTTP-date); None when absent or unparsable."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=dt.timezone.utc)
+    return max(0.0, (when - dt.datetime.now(dt.timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float = EODHD_RETRY_BASE_DELAY, cap: float = EODHD_RETRY_MAX_DELAY) -> float:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Per-host breaker: after `failures` consecutive transient failures the host is
+    'open' and calls fail fast for `reset_seconds`; then one probe is let through
+    ('half_open') and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, host: str, failures: int = 5, reset_seconds: float = 30.0) -> None:
+        self.host = host
+        self.threshold = max(1, failures)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive = 0
+        self.opened_at = 0.0
+        self.opened = 0
+        self.rejected = 0
+        self._probe = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probe:
+            self._probe = True
+            return True
+        self.rejected += 1
+        return False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at))
+
+    def record(self, ok: bool) -> None:
+        """Outcome of an allowed call (ok = the host answered, whatever the status)."""
+        self._probe = False
+        if ok:
+            if self.state != "closed":
+                logger.info("Circuit for %s closed", self.host)
+            self.state = "closed"
+            self.consecutive = 0
+            return
+        self.consecutive += 1
+        if self.state == "half_open" or self.consecutive >= self.threshold:
+            if self.state != "open":
+                logger.warning("Circuit for %s opened after %d failures", self.host, self.consecutive)
+                self.opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def cancel_probe(self) -> None:
+        """The allowed call never completed (cancelled); let the next caller probe."""
+        self._probe = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive,
+            "times_opened": self.opened,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(self.retry_in(), 1) if self.state == "open" else 0.0,
+        }
+
+
+class RetryPolicy:
+    """Retry settings, per-host breakers and running counters for make_request."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        breaker_failures: int = 5,
+        breaker_reset_seconds: float = 30.0,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker_failures = breaker_failures
+        self.breaker_reset_seconds = breaker_reset_seconds
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+
+    def breaker(self, url: str) -> Optional[CircuitBreaker]:
+        if self.breaker_failures <= 0:
+            return None
+        host = urlsplit(url).netloc
+        b = self._breakers.get(host)
+        if b is None:
+            b = self._breakers[host] = CircuitBreaker(host, self.breaker_failures, self.breaker_reset_seconds)
+        return b
+
+    def delay(self, attempt: int, retry_after: Optional[float]) -> Optional[float]:
+        """Seconds to sleep before retry number `attempt` (0-based), or None to give up."""
+        if attempt + 1 >= self.max_attempts:
+            return None
+        if retry_after is not None:
+            # Upstream asked for a specific pause; don't retry if it is longer than we allow.
+            return retry_after if retry_after <= self.max_delay else None
+        return backoff_delay(attempt, self.base_delay, self.max_delay)
+
+    def stats(self) -> dict:
+        return {
+            "max_attempts": self.max_attempts,
+            "base_delay": self.base_delay,
+            "max_delay": self.max_delay,
+            "retries": self.retries,
+            "recovered": self.recovered,
+            "exhausted": self.exhausted,
+            "circuit_breakers": {h: b.stats() for h, b in self._breakers.items()},
+        }
+
+
+retry_policy = RetryPolicy(
+    max_attempts=EODHD_RETRY_MAX_ATTEMPTS,
+    base_delay=EODHD_RETRY_BASE_DELAY,
+    max_delay=EODHD_RETRY_MAX_DELAY,
+    breaker_failures=EODHD_BREAKER_FAILURES,
+    breaker_reset_seconds=EODHD_BREAKER_RESET_SECONDS,
+)
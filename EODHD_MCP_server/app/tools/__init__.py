@@ -10,6 +10,8 @@ logger = logging.getLogger("eodhd-mcp.tools")
 
 MAIN_TOOLS: list[str] = [
     "get_historical_stock_prices",
+    "get_historical_stock_prices_batch",
+    "get_bulk_eod_last_day",
     "get_live_price_data",
     "get_intraday_historical_data",
     "get_company_news",
@@ -25,6 +27,7 @@ MAIN_TOOLS: list[str] = [
     "get_historical_market_cap",
     "get_insider_transactions",
     "capture_realtime_ws",
+    "get_realtime_snapshot",
     "get_us_tick_data",
     "get_stock_screener_data",
     "get_economic_events",
@@ -35,14 +38,18 @@ MAIN_TOOLS: list[str] = [
     "get_upcoming_dividends",
     "get_fundamentals_data",
     "get_technical_indicators",
+    "compute_technical_indicators",
     "get_us_live_extended_quotes",
     "get_cboe_indices_list",
-    "get_cboe_index_data"
+    "get_cboe_index_data",
+    "get_cache_stats",
+    "get_rate_limit_stats",
 ]
 
 MARKETPLACE_TOOLS: list[str] = [
     "get_mp_us_options_contracts",
     "get_mp_us_options_eod",
+    "get_mp_us_options_chain",
     "get_mp_us_options_underlyings",
     "get_mp_indices_list",
     "get_mp_index_components",
@@ -119,7 +126,19 @@ def _dedupe(seq: Iterable[str]) -> list[str]:
     return out
 
 
-def register_all(mcp) -> None:
-    """Attempt to register every known tool, skipping any that are missing or erroring."""
+def register_all(mcp, lazy: bool | None = None) -> None:
+    """
+    Attempt to register every known tool, skipping any that are missing or erroring.
+
+    lazy=True (default: $EODHD_LAZY_TOOLS) advertises the tools from the prebuilt
+    schema manifest and imports each module on its first call (see app.tools.lazy).
+    """
+    if lazy is None:
+        from app.config import EODHD_LAZY_TOOLS
+        lazy = EODHD_LAZY_TOOLS
+    if lazy:
+        from .lazy import register_lazy
+        register_lazy(mcp, _dedupe(ALL_TOOLS), _safe_register)
+        return
     for name in _dedupe(ALL_TOOLS):
         _safe_register(mcp, name)
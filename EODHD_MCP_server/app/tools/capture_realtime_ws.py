@@ -1,36 +1,17 @@
 #capture_realtime_ws.py
 
-import asyncio
-import json
 import time
 from typing import List, Optional, Union
 
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
+from app.config import EODHD_WS_CAPTURE_MAX_MESSAGES
+from app.formatting import error_json as _err, to_json
+from app.realtime import BarAggregator, FEED_ENDPOINTS, normalize_symbols, realtime_hub, websockets
 from mcp.types import ToolAnnotations
 
 
-# WebSocket runtime
-try:
-    import websockets
-except Exception as e:  # pragma: no cover
-    websockets = None  # We'll error nicely at runtime if unavailable.
+CAPTURE_MODES = {"raw", "aggregate"}
 
-WS_BASE = "wss://ws.eodhistoricaldata.com/ws"
-
-FEED_ENDPOINTS = {
-    "us_trades": "us",         # trades (price, conditions, etc.)
-    "us_quotes": "us-quote",   # quotes (bid/ask)
-    "forex": "forex",
-    "crypto": "crypto",
-}
-
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
-def _symbols_to_str(symbols: Union[str, List[str]]) -> str:
-    if isinstance(symbols, str):
-        return symbols.replace(" ", "")
-    return ",".join(s.strip() for s in symbols if s and str(s).strip())
 
 def register(mcp: FastMCP):
     @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
@@ -43,10 +24,19 @@ def register(mcp: FastMCP):
         ping_interval: float = 20.0,
         ping_timeout: float = 20.0,
         connect_timeout: float = 15.0,
+        mode: str = "raw",                    # 'raw' (messages) | 'aggregate' (OHLCV/VWAP bars)
+        bar_seconds: int = 1,                 # bar width for mode='aggregate' (1..3600)
+        stream: bool = False,                 # emit batches as MCP progress notifications while capturing
+        batch_seconds: float = 1.0,           # drain / stream interval (0.1..60)
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
+        ctx: Optional[Context] = None,
     ) -> str:
         """
         Capture real-time data via WebSockets for a fixed window, then return it.
 
+        Reads from the server's shared realtime hub: one connection per feed endpoint,
+        reused across calls and reconnected (with resubscribe) if it drops.
+
         Args:
             feed (str): One of {'us_trades','us_quotes','forex','crypto'}.
             symbols (str | list[str]): Single or comma-separated symbols, or a list.
@@ -57,9 +47,18 @@ def register(mcp: FastMCP):
             duration_seconds (int): How long to capture messages (1..600). Default 5.
             api_token (str, optional): WebSocket token; 'demo' supports AAPL, MSFT, TSLA, EURUSD, ETH-USD, BTC-USD.
             max_messages (int, optional): Stop early after N messages.
-            ping_interval (float): websockets.connect ping interval (seconds).
-            ping_timeout (float): websockets.connect ping timeout (seconds).
-            connect_timeout (float): Overall timeout to establish connection (seconds).
+            ping_interval (float): Ping interval (seconds) if this call opens the feed connection.
+            ping_timeout (float): Ping timeout (seconds) if this call opens the feed connection.
+            connect_timeout (float): How long to wait for the feed to be connected (seconds).
+            mode (str): 'raw' returns the messages; 'aggregate' returns per-symbol OHLCV bars of
+                'bar_seconds' (by event time) with VWAP and trade counts, plus per-symbol totals.
+            bar_seconds (int): Bar width for mode='aggregate' (1..3600). Default 1.
+            stream (bool): Send each batch as it arrives as an MCP progress notification whose
+                message is compact JSON ({"batch": k, "messages": [...]} or, in aggregate mode,
+                {"batch": k, "bars": {...}} with bars completed since the previous batch).
+                The final result then carries counts only (aggregate mode still returns the
+                summary). Needs a client that sends a progress token.
+            batch_seconds (float): How often buffered messages are drained / streamed (0.1..60).
 
         Returns:
             str: JSON string with
@@ -71,8 +70,12 @@ def register(mcp: FastMCP):
                   "started_at": <epoch_ms>,
                   "ended_at": <epoch_ms>,
                   "message_count": N,
-                  "messages": [ {parsed message dicts...} ]
+                  "messages": [ {parsed message dicts...} ]       # mode='raw', stream=False
+                  "aggregates": {"BTC-USD": {open, high, low, close, volume, vwap, count,
+                                             "bars": [{"t": <bar start ms>, ...}]}}  # mode='aggregate'
                 }
+            Non-streamed raw captures keep at most EODHD_WS_CAPTURE_MAX_MESSAGES messages
+            ("truncated": true beyond that).
         """
         if websockets is None:
             return _err("The 'websockets' package is required. Install with: pip install websockets")
@@ -86,68 +89,110 @@ def register(mcp: FastMCP):
         if not isinstance(duration_seconds, int) or not (1 <= duration_seconds <= 600):
             return _err("'duration_seconds' must be an integer between 1 and 600.")
 
+        if mode not in CAPTURE_MODES:
+            return _err(f"Invalid 'mode'. Allowed: {sorted(CAPTURE_MODES)}")
+        if not isinstance(bar_seconds, int) or not (1 <= bar_seconds <= 3600):
+            return _err("'bar_seconds' must be an integer between 1 and 3600.")
+        if not isinstance(batch_seconds, (int, float)) or not (0.1 <= batch_seconds <= 60):
+            return _err("'batch_seconds' must be a number between 0.1 and 60.")
+        stream = bool(stream) and ctx is not None
+
         endpoint = FEED_ENDPOINTS[feed]
-        sym_str = _symbols_to_str(symbols)
-        sym_list = [s for s in sym_str.split(",") if s]
+        sym_list = normalize_symbols(symbols)
+        if not sym_list:
+            return _err("Parameter 'symbols' is required (e.g., 'AAPL,MSFT' or ['AAPL','MSFT']).")
 
-        # Build WS URL with token
         token = api_token or "demo"
-        uri = f"{WS_BASE}/{endpoint}?api_token={token}"
-
-        started_at = int(time.time() * 1000)
-        messages: List[dict] = []
-
-        async def _recv_loop(ws, stop_time):
-            nonlocal messages
-            # Subscribe
-            sub = {"action": "subscribe", "symbols": sym_str}
-            await ws.send(json.dumps(sub))
-
-            # Receive until time or count
-            while True:
-                now = time.time()
-                if now >= stop_time:
-                    break
-                if max_messages is not None and len(messages) >= max_messages:
-                    break
-                timeout_left = max(0.05, min(1.0, stop_time - now))
-                try:
-                    msg = await asyncio.wait_for(ws.recv(), timeout=timeout_left)
-                except asyncio.TimeoutError:
-                    continue  # loop to check time again
-                except Exception:
-                    break
-                try:
-                    messages.append(json.loads(msg))
-                except Exception:
-                    messages.append({"raw": msg})
 
+        # Shared, hub-managed connection: symbols are ref-counted across concurrent callers.
         try:
-            # Establish connection with overall timeout
-            conn_task = websockets.connect(
-                uri,
+            hub_feed = await realtime_hub.acquire(
+                endpoint,
+                token,
+                sym_list,
                 ping_interval=ping_interval,
                 ping_timeout=ping_timeout,
-                close_timeout=5,
-                max_queue=None,  # do not artificially limit
+                connect_timeout=connect_timeout,
             )
-            try:
-                ws = await asyncio.wait_for(conn_task, timeout=connect_timeout)
-            except asyncio.TimeoutError:
-                return _err("Timed out while establishing WebSocket connection.")
-        except Exception as e:
-            return _err(f"Failed to connect to WebSocket endpoint: {str(e)}")
-
+        except ValueError as e:
+            return _err(str(e))
         try:
+            if not await hub_feed.wait_connected(connect_timeout):
+                detail = f": {hub_feed.last_error}" if hub_feed.last_error else ""
+                return _err(f"Timed out while establishing WebSocket connection{detail}")
+
+            marks = hub_feed.marks(sym_list)
+            started_at = int(time.time() * 1000)
             stop_time = time.time() + duration_seconds
-            await _recv_loop(ws, stop_time)
+            next_drain = time.time() + batch_seconds
+
+            agg = BarAggregator(bar_seconds) if mode == "aggregate" else None
+            messages: List[dict] = []
+            count = dropped = batches = 0
+            truncated = False
+            emitted_upto: Optional[int] = None
+
+            async def _drain(final: bool = False) -> None:
+                """Move what arrived since `marks` out of the ring buffers (and stream it)."""
+                nonlocal marks, count, dropped, batches, truncated, emitted_upto
+                batch: Optional[dict] = None
+                if agg is not None:
+                    values, lost = hub_feed.read_values_since(marks)
+                    marks = hub_feed.marks(sym_list)
+                    for sym, rows in values.items():
+                        for event_ms, price, size in rows:
+                            agg.add(sym, event_ms, price, size)
+                        count += len(rows)
+                    dropped += lost
+                    if stream:
+                        cutoff = None if final else agg.closed_bucket(int(time.time() * 1000))
+                        bars = {sym: agg.bars(sym, emitted_upto, cutoff) for sym in sym_list}
+                        emitted_upto = cutoff
+                        if any(bars.values()):
+                            batch = {"bars": {sym: b for sym, b in bars.items() if b}}
+                else:
+                    new, lost = hub_feed.read_since(marks)
+                    marks = hub_feed.marks(sym_list)
+                    if max_messages is not None:
+                        new = new[:max(0, max_messages - count)]
+                    count += len(new)
+                    dropped += lost
+                    if stream:
+                        if new:
+                            batch = {"messages": new}
+                    else:
+                        room = EODHD_WS_CAPTURE_MAX_MESSAGES - len(messages)
+                        if len(new) > room:
+                            truncated = True
+                            new = new[:room]
+                        messages.extend(new)
+
+                if batch is not None:
+                    batches += 1
+                    elapsed = min(float(duration_seconds), duration_seconds - max(0.0, stop_time - time.time()))
+                    await ctx.report_progress(
+                        progress=elapsed,
+                        total=float(duration_seconds),
+                        message=to_json({"batch": batches, **batch}, "compact"),
+                    )
+
+            # Drain every batch_seconds until the window ends (or max_messages is reached).
+            while True:
+                now = time.time()
+                if now >= stop_time:
+                    break
+                if max_messages is not None and count + hub_feed.count_since(marks) >= max_messages:
+                    break
+                if now >= next_drain:
+                    await _drain()
+                    next_drain = now + batch_seconds
+                    continue
+                await hub_feed.wait_message(max(0.05, min(1.0, stop_time - now, next_drain - now)))
+
+            await _drain(final=True)
+            ended_at = int(time.time() * 1000)
         finally:
-            try:
-                await ws.close()
-            except Exception:
-                pass
-
-        ended_at = int(time.time() * 1000)
+            await realtime_hub.release(hub_feed, sym_list)
 
         result = {
             "feed": feed,
@@ -156,7 +201,18 @@ def register(mcp: FastMCP):
             "duration_seconds": duration_seconds,
             "started_at": started_at,
             "ended_at": ended_at,
-            "message_count": len(messages),
-            "messages": messages,
+            "message_count": count,
         }
-        return json.dumps(result, indent=2)
+        if agg is not None:
+            result["mode"] = "aggregate"
+            result["bar_seconds"] = bar_seconds
+            result["aggregates"] = agg.summary()
+        elif not stream:
+            result["messages"] = messages
+            if truncated:
+                result["truncated"] = True  # EODHD_WS_CAPTURE_MAX_MESSAGES reached
+        if stream:
+            result["streamed_batches"] = batches
+        if dropped:
+            result["dropped"] = dropped  # overwritten in the per-symbol buffers (EODHD_WS_BUFFER_SIZE)
+        return to_json(result, output)
@@ -0,0 +1,184 @@
+#compute_technical_indicators.py
+
+import asyncio
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from fastmcp import FastMCP
+from app.config import EODHD_API_BASE
+from app.api_client import make_request
+from app.concurrency import gather_bounded
+from app.formatting import LAYOUTS, error_json as _err, to_columnar, to_json
+from app import indicators as ind
+from mcp.types import ToolAnnotations
+
+
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+ALLOWED_ORDER = {"a", "d"}
+MAX_TICKERS = 500
+DEFAULT_CONCURRENCY = 8
+MAX_CONCURRENCY = 32
+
+
+def _valid_date(s: Optional[str]) -> bool:
+    if s is None:
+        return True
+    if not isinstance(s, str) or not DATE_RE.match(s):
+        return False
+    try:
+        datetime.strptime(s, "%Y-%m-%d")
+        return True
+    except ValueError:
+        return False
+
+
+def _normalize_tickers(tickers: Union[str, Sequence[str]]) -> List[str]:
+    if isinstance(tickers, str):
+        items = tickers.split(",")
+    elif isinstance(tickers, (list, tuple)):
+        items = [str(t) for t in tickers]
+    else:
+        return []
+    out: List[str] = []
+    for t in (i.strip() for i in items):
+        if t and t not in out:
+            out.append(t)
+    return out
+
+
+def _warmup_from(start_date: str, bars: int) -> str:
+    """Calendar start that covers `bars` trading days before start_date (5/7 ratio + slack)."""
+    days = bars * 7 // 5 + 10
+    return (datetime.strptime(start_date, "%Y-%m-%d") - timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+async def _fetch_bars(ticker: str, from_date: Optional[str], to_date: Optional[str],
+                      api_token: Optional[str]) -> Any:
+    # Same URL shape as get_historical_stock_prices, so both share response-cache entries.
+    url = f"{EODHD_API_BASE}/eod/{ticker}?period=d&order=a&fmt=json"
+    if from_date:
+        url += f"&from={from_date}"
+    if to_date:
+        url += f"&to={to_date}"
+    if api_token:
+        url += f"&api_token={api_token}"
+    return await make_request(url)
+
+
+def _bars_error(data: Any) -> Optional[str]:
+    if data is None:
+        return "No response from API."
+    if isinstance(data, dict) and data.get("error"):
+        return data["error"]
+    if not isinstance(data, list):
+        return "Unexpected response format from API."
+    return None
+
+
+def register(mcp: FastMCP):
+    @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+    async def compute_technical_indicators(
+        tickers: Union[str, List[str]],          # 'AAPL.US' | 'AAPL.US,MSFT.US' | ['AAPL.US', 'MSFT.US']
+        indicators: Union[str, List[Union[str, Dict[str, Any]]]],  # 'sma:50,ema:20,rsi:14,macd:12:26:9'
+        start_date: Optional[str] = None,        # first output date (YYYY-MM-DD)
+        end_date: Optional[str] = None,          # last output date  (YYYY-MM-DD)
+        order: str = "a",                        # 'a' | 'd'
+        adjusted: bool = True,                   # compute on split+dividend adjusted prices (API default)
+        warmup: bool = True,                     # fetch extra history before start_date so values settle
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        api_token: Optional[str] = None,
+        layout: str = "rows",                   # 'rows' | 'columnar' (struct-of-arrays)
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
+    ) -> str:
+        """
+        Technical indicators computed locally from EOD bars (one EOD fetch per ticker).
+
+        Covers the /technical functions (sma, ema, wma, volatility, rsi, stddev, slope, avgvol,
+        avgvolccy, atr, cci, dmi/dx, adx, bbands, macd, stochastic, stochrsi, sar, beta) without
+        the 5-call cost per indicator, and computes any number of indicators/periods per call.
+        'splitadjusted' and 'format_amibroker' are data formats, not indicators; use
+        get_technical_indicators for those.
+
+        Args:
+            tickers: One or more SYMBOL.EXCHANGE tickers (max 500).
+            indicators: Comma string with positional params ('sma:50,macd:12:26:9,bbands:20')
+                or a list of strings / dicts ({"function": "rsi", "period": 7, "label": "rsi_fast"}).
+                Defaults follow the API (period=50; macd 12/26/9; stochastic 14/3/3; sar 0.02/0.2;
+                beta against GSPC.INDX).
+            start_date / end_date: Output window (YYYY-MM-DD). Without start_date the full
+                history is used.
+            order: 'a' ascending (default) or 'd' descending.
+            adjusted: Use adjusted_close-scaled OHLC (default True), raw prices otherwise.
+            warmup: Fetch enough history before start_date for recursive indicators to settle.
+            max_concurrency: Concurrent EOD fetches (1..32). Default 8.
+            api_token: Per-call token override; env token used if omitted.
+            layout: 'rows' (per-date objects, default) or 'columnar'.
+
+        Returns:
+            JSON object keyed by ticker. Each value is a list of
+            {"date": ..., "<label>": value, ...} rows (multi-output functions use
+            '<label>_<field>', e.g. 'macd_12_26_9_signal', 'bbands_20_uband'), or
+            {"error": "..."} for that ticker only.
+        """
+        if ind.np is None:
+            return _err("compute_technical_indicators requires numpy (pip install numpy).")
+
+        syms = _normalize_tickers(tickers)
+        if not syms:
+            return _err("Parameter 'tickers' must contain at least one ticker (e.g., 'AAPL.US').")
+        if len(syms) > MAX_TICKERS:
+            return _err(f"Too many tickers: {len(syms)} (max {MAX_TICKERS}).")
+
+        try:
+            specs = ind.parse_specs(indicators)
+        except ValueError as e:
+            return _err(str(e))
+
+        if order not in ALLOWED_ORDER:
+            return _err(f"Invalid 'order'. Allowed values: {sorted(ALLOWED_ORDER)}")
+        if layout not in LAYOUTS:
+            return _err(f"Invalid 'layout'. Allowed: {sorted(LAYOUTS)}")
+        if not _valid_date(start_date):
+            return _err("Parameter 'start_date' must be YYYY-MM-DD when provided.")
+        if not _valid_date(end_date):
+            return _err("Parameter 'end_date' must be YYYY-MM-DD when provided.")
+        if start_date and end_date and start_date > end_date:
+            return _err("'start_date' cannot be after 'end_date'.")
+        if not isinstance(max_concurrency, int) or not (1 <= max_concurrency <= MAX_CONCURRENCY):
+            return _err(f"'max_concurrency' must be an integer between 1 and {MAX_CONCURRENCY}.")
+
+        fetch_from = start_date
+        if start_date and warmup:
+            fetch_from = _warmup_from(start_date, max(ind.lookback(s) for s in specs))
+
+        bench = ind.benchmarks(specs)
+        fetched = await gather_bounded(
+            [_fetch_bars(t, fetch_from, end_date, api_token) for t in syms + bench],
+            max_concurrency,
+        )
+        bars_by_ticker = dict(zip(syms + bench, fetched))
+        bench_bars = {b: bars_by_ticker[b] for b in bench if _bars_error(bars_by_ticker[b]) is None}
+
+        def _one(ticker: str) -> Any:
+            data = bars_by_ticker[ticker]
+            err = _bars_error(data)
+            if err:
+                return {"error": err}
+            rows = ind.to_rows(ind.compute(data, specs, bench_bars, adjusted=adjusted), start_date, end_date)
+            if order == "d":
+                rows.reverse()
+            return to_columnar(rows) if layout == "columnar" else rows
+
+        # NumPy work runs off the event loop; recursive indicators still iterate per bar.
+        results = await asyncio.gather(*(asyncio.to_thread(_one, t) for t in syms))
+        out: Dict[str, Any] = dict(zip(syms, results))
+
+        missing = [b for b in bench if b not in bench_bars]
+        if missing:
+            out["_warnings"] = [f"Benchmark '{b}' unavailable; beta is null." for b in missing]
+
+        try:
+            return to_json(out, output)
+        except Exception:
+            return _err("Unexpected response format from API.")
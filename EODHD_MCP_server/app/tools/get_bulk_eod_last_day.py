@@ -0,0 +1,109 @@
+#get_bulk_eod_last_day.py
+
+import re
+from datetime import datetime
+from typing import Optional, Sequence, Union
+
+from fastmcp import FastMCP
+from app.bulk import bulk_eod_index
+from app.formatting import error_json as _err, to_json
+from mcp.types import ToolAnnotations
+
+
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+EXCHANGE_RE = re.compile(r"^[A-Za-z0-9_-]{1,16}$")
+
+
+def _valid_date(s: str) -> bool:
+    if not DATE_RE.match(s):
+        return False
+    try:
+        datetime.strptime(s, "%Y-%m-%d")
+        return True
+    except ValueError:
+        return False
+
+
+def _symbol_list(symbols: Union[str, Sequence[str], None]) -> list[str]:
+    if not symbols:
+        return []
+    if isinstance(symbols, str):
+        symbols = symbols.split(",")
+    seen: dict[str, None] = {}
+    for s in symbols:
+        s = str(s or "").strip().upper()
+        if s:
+            seen[s] = None
+    return list(seen)
+
+
+def register(mcp: FastMCP):
+    @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+    async def get_bulk_eod_last_day(
+        exchange: str = "US",                                # exchange code, e.g. 'US', 'LSE', 'XETRA'
+        symbols: Union[str, Sequence[str], None] = None,     # 'AAPL,MSFT.US' or ['AAPL', ...]; omit for all
+        date: Optional[str] = None,                          # YYYY-MM-DD; default = last trading day
+        refresh: bool = False,                               # ignore the in-memory snapshot
+        api_token: Optional[str] = None,                     # per-call override
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
+    ) -> str:
+        """
+        Bulk last-day EOD for a whole exchange (GET /api/eod-bulk-last-day/{EXCHANGE}),
+        filtered to a symbol set.
+
+        The exchange's CSV is streamed line by line into an in-memory index (per
+        exchange, date and token), so pricing thousands of holdings costs one upstream
+        request; later calls for the same exchange/day are served from memory
+        (closed days are kept until evicted, the current day for 15 minutes; at most
+        EODHD_BULK_MAX_EXCHANGES snapshots).
+
+        Args:
+            exchange (str): Exchange code ('US' covers NYSE/NASDAQ/...).
+            symbols (str | list, optional): Tickers to return, with or without the
+                exchange suffix ('AAPL' or 'AAPL.US'). Omit to return the whole exchange.
+            date (str, optional): Trading day (YYYY-MM-DD); default is the last one.
+            refresh (bool): Re-download even if a fresh snapshot is in memory.
+            api_token (str, optional): Per-call token override.
+
+        Notes:
+            - One request costs 100 API calls.
+
+        Returns:
+            str: JSON object:
+                {
+                  "exchange": "US", "date": "2024-05-10" | null,
+                  "source": "upstream" | "memory",
+                  "rows_indexed": 48213,
+                  "count": 2, "missing": ["XXXX.US"],
+                  "data": {"AAPL.US": {"code", "exchange", "date", "open", "high", "low",
+                                       "close", "adjusted_close", "volume"}, ...}
+                }
+        """
+        if not exchange or not isinstance(exchange, str) or not EXCHANGE_RE.match(exchange.strip()):
+            return _err("Parameter 'exchange' is required (e.g., 'US', 'LSE').")
+        exchange = exchange.strip().upper()
+
+        if date is not None and not _valid_date(date):
+            return _err("Parameter 'date' must be YYYY-MM-DD when provided.")
+
+        wanted = _symbol_list(symbols)
+
+        snap, source, error = await bulk_eod_index.get(exchange, date, api_token, refresh=bool(refresh))
+        if error is not None:
+            return _err(error.get("error", "Bulk request failed."))
+
+        if wanted:
+            data, missing = bulk_eod_index.lookup(snap, wanted)
+        else:
+            data = {code: snap.get(code) for code in snap.rows}
+            missing = []
+
+        return to_json({
+            "exchange": exchange,
+            "date": date,
+            "source": source,
+            "rows_indexed": len(snap.rows),
+            "count": len(data),
+            "missing": missing,
+            "data": data,
+        }, output)
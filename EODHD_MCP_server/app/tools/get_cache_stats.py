@@ -0,0 +1,35 @@
+#get_cache_stats.py
+from typing import Optional
+
+from fastmcp import FastMCP
+from app.api_client import singleflight_stats
+from app.barstore import bar_store
+from app.cache import response_cache
+from app.history_sync import history_sync
+from app.formatting import to_json
+from mcp.types import ToolAnnotations
+
+
+def register(mcp: FastMCP):
+    @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+    async def get_cache_stats(
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
+    ) -> str:
+        """
+        Response cache and request-coalescing statistics for this server process
+        (no upstream call).
+
+        Returns:
+            str: JSON with hits, misses, hit_rate, memory_hits, disk_hits, stores,
+                 evictions, entries, bytes, the configured bounds, and a
+                 "singleflight" block (in_flight, coalesced) and a "bar_store" block
+                 (enabled, path, series, ranges, synced_series, file_bytes, hits/partial/misses,
+                 bars_local, bars_fetched, upstream_requests), plus "history_sync"
+                 (full_fetches, incremental, local, adjustments, held_in, series_in_memory,
+                 max_series_in_memory, evictions) for sync=True calls.
+        """
+        stats = response_cache.stats()
+        stats["singleflight"] = singleflight_stats()
+        stats["bar_store"] = await bar_store.stats()
+        stats["history_sync"] = history_sync.stats()
+        return to_json(stats, output)
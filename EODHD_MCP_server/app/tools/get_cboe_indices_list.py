@@ -1,23 +1,20 @@
 #get_cboe_indices_list.py
 
-import json
 from typing import Optional
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
-
 def register(mcp: FastMCP):
     @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
     async def get_cboe_indices_list(
         fmt: Optional[str] = "json",
         api_token: Optional[str] = None,  # per-call override
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Get list of CBOE indices (Europe & regional families)
@@ -78,10 +75,10 @@ def register(mcp: FastMCP):
             return _err("No response from API.")
         if isinstance(data, dict) and data.get("error"):
             # Propagate API error message
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
 
         try:
             # Expected: dict with 'meta', 'data', 'links'
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
             return _err("Unexpected response format from API.")
@@ -1,6 +1,5 @@
 #get_company_news.py
 
-import json
 import re
 from datetime import datetime
 from typing import Optional
@@ -8,15 +7,13 @@ from typing import Optional
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
 DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 ALLOWED_FMT = {"json", "xml"}
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
 def _valid_date(d: Optional[str]) -> bool:
     if d is None:
         return True
@@ -39,6 +36,7 @@ def register(mcp: FastMCP):
         offset: int = 0,                     # default 0
         fmt: str = "json",                   # 'json' or 'xml' (API default json)
         api_token: Optional[str] = None,     # per-call override
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Financial News API (spec-aligned).
@@ -97,14 +95,14 @@ def register(mcp: FastMCP):
             return _err("No response from API.")
 
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
 
         # Typical 'json' path: API returns a list of articles (or an object).
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
             # If you adapt make_request to return raw text for 'xml', we wrap it.
             if isinstance(data, str):
-                return json.dumps({"xml": data}, indent=2)
+                return to_json({"xml": data}, output)
             return _err("Unexpected response format from API.")
 
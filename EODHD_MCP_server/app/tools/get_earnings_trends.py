@@ -1,19 +1,15 @@
 #get_earnings_trends.py
 
-import json
 from typing import Optional, Union, List
 from urllib.parse import quote_plus
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
-
 def _q(key: str, val: Optional[str]) -> str:
     if val is None or val == "":
         return ""
@@ -38,6 +34,7 @@ def register(mcp: FastMCP):
         symbols: Union[str, List[str]],      # REQUIRED by API: 'AAPL.US' or ['AAPL.US','MSFT.US']
         fmt: str = "json",                   # Trends are JSON-only (kept for consistency)
         api_token: Optional[str] = None,     # per-call override (else uses env EODHD_API_KEY)
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Earnings Trends API (/calendar/trends)
@@ -63,10 +60,10 @@ def register(mcp: FastMCP):
         if data is None:
             return _err("No response from API.")
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
 
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
             # Trends should always be JSON; fallback just in case
             return _err("Unexpected response format from API.")
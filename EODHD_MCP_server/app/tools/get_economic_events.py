@@ -1,20 +1,17 @@
 #get_economic_events.py
 
-import json
 from typing import Optional, Union
 from urllib.parse import quote_plus
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import csv_json, error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
 ALLOWED_COMPARISON = {None, "mom", "qoq", "yoy"}
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
 def _q(key: str, val: Optional[Union[str, int]]) -> str:
     if val is None or val == "":
         return ""
@@ -32,6 +29,7 @@ def register(mcp: FastMCP):
         limit: int = 50,                    # 0..1000 (default 50)
         fmt: Optional[str] = "json",        # json (default) | csv (if supported)
         api_token: Optional[str] = None,    # per-call override
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Economic Events Data API (/economic-events)
@@ -61,23 +59,24 @@ def register(mcp: FastMCP):
         url += _q("type", type)
         url += _q("offset", offset)
         url += _q("limit", limit)
-        url += _q("fmt", fmt or "json")
+        fmt = (fmt or "json").lower()
+        url += _q("fmt", fmt)
         if api_token:
             url += _q("api_token", api_token)  # otherwise appended by make_request
 
         # --- request ---
-        data = await make_request(url)
+        data = await make_request(url, response_type="text" if fmt == "csv" else "json")
 
         # --- return/normalize ---
         if data is None:
             return _err("No response from API.")
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
+
+        if fmt == "csv":
+            return csv_json(data, output)
 
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
-            # If CSV or unexpected text returned, wrap it
-            if isinstance(data, str):
-                return json.dumps({"raw": data}, indent=2)
             return _err("Unexpected response format from API.")
@@ -1,6 +1,5 @@
 #get_exchange_details.py
 
-import json
 import re
 from datetime import datetime
 from typing import Optional
@@ -8,14 +7,12 @@ from typing import Optional
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
 DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
 def _valid_date(d: Optional[str]) -> bool:
     if d is None:
         return True
@@ -35,6 +32,7 @@ def register(mcp: FastMCP):
         end_date: Optional[str] = None,   # maps to 'to'   (YYYY-MM-DD)
         fmt: str = "json",                # API supports json (we gate to json here)
         api_token: Optional[str] = None,  # per-call token override
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Get Exchange Details & Trading Hours (GET /api/exchange-details/{EXCHANGE_CODE})
@@ -87,9 +85,9 @@ def register(mcp: FastMCP):
         if data is None:
             return _err("No response from API.")
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
 
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
             return _err("Unexpected response format from API.")
@@ -1,22 +1,27 @@
 # get_fundamentals_data.py
 
-import json
 import datetime as dt
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
+from app.concurrency import gather_bounded
 from mcp.types import ToolAnnotations
 
+# Max concurrent upstream requests while fanning out Financials leaves
+FINANCIALS_CONCURRENCY = 8
+FINANCIAL_STATEMENTS = ("Balance_Sheet", "Cash_Flow", "Income_Statement")
+# Multi-filter batching: keep each URL under this length (with room for an injected token)
+MAX_FILTER_URL_LEN = 2000
+TOKEN_URL_SLACK = 80
+MAX_LEAVES_PER_BATCH = 48
 
 # --------------------------------
 # Utilities & small helpers
 # --------------------------------
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
 def _to_date(s: Optional[str]) -> Optional[dt.date]:
     if not s:
         return None
@@ -118,6 +123,93 @@ async def _fetch_sections_bulk(
     # If a single section came back as a direct block, wrap it to keep the shape predictable.
     return {sections[0]: data}
 
+def _plan_filter_batches(
+    paths: List[str],
+    base_len: int,
+    max_url_len: int = MAX_FILTER_URL_LEN,
+    max_per_batch: int = MAX_LEAVES_PER_BATCH,
+) -> List[List[str]]:
+    """
+    Greedily pack filter paths into comma-separated groups so that
+    base_len + len(",".join(group)) stays within max_url_len.
+    A single path longer than the budget still gets its own batch.
+    """
+    batches: List[List[str]] = []
+    current: List[str] = []
+    current_len = 0
+    for path in paths:
+        added = len(path) + (1 if current else 0)
+        if current and (base_len + current_len + added > max_url_len or len(current) >= max_per_batch):
+            batches.append(current)
+            current, current_len, added = [], 0, len(path)
+        current.append(path)
+        current_len += added
+    if current:
+        batches.append(current)
+    return batches
+
+_MISSING = object()
+
+def _extract_leaf(data: Any, path: str) -> Any:
+    """
+    Find one filter path inside a multi-filter response. Accepts both the flat
+    shape ({"A::B::C": ...}) and the nested shape ({"A": {"B": {"C": ...}}}).
+    """
+    if not isinstance(data, dict):
+        return _MISSING
+    if path in data:
+        return data[path]
+    node: Any = data
+    for part in path.split("::"):
+        if not isinstance(node, dict) or part not in node:
+            return _MISSING
+        node = node[part]
+    return node
+
+async def _fetch_leaves_batched(
+    ticker: str,
+    api_token: Optional[str],
+    paths: List[str],
+) -> Dict[str, Any]:
+    """
+    Fetch many filter paths using as few multi-filter requests as URL length allows,
+    then split the merged responses back per path. Leaves missing from a batch
+    response are refetched individually; an error response is assigned to every
+    leaf of its batch.
+    """
+    if not paths:
+        return {}
+    base_params: Dict[str, Any] = {"filter": ""}
+    if api_token:
+        base_params["api_token"] = api_token
+    base_len = len(_build_url(ticker, base_params)) + (0 if api_token else TOKEN_URL_SLACK)
+    batches = _plan_filter_batches(paths, base_len)
+
+    responses = await gather_bounded(
+        [_fetch_filtered_block(ticker, api_token, ",".join(batch)) for batch in batches], FINANCIALS_CONCURRENCY
+    )
+
+    out: Dict[str, Any] = {}
+    missing: List[str] = []
+    for batch, data in zip(batches, responses):
+        if len(batch) == 1 or (isinstance(data, dict) and data.get("error")):
+            for path in batch:
+                out[path] = data
+            continue
+        for path in batch:
+            leaf = _extract_leaf(data, path)
+            if leaf is _MISSING:
+                missing.append(path)
+            else:
+                out[path] = leaf
+
+    if missing:
+        refetched = await gather_bounded(
+            [_fetch_filtered_block(ticker, api_token, path) for path in missing], FINANCIALS_CONCURRENCY
+        )
+        out.update(zip(missing, refetched))
+    return out
+
 async def _discover_financial_dates_from_outstanding_shares(
     ticker: str,
     api_token: Optional[str],
@@ -157,6 +249,8 @@ async def _fetch_financials_for_dates(
 ) -> Dict[str, Any]:
     """
     Fetch leaves for Financials statements on the specific dates discovered via outstandingShares.
+    Leaves are packed into comma-separated filter requests (see _plan_filter_batches),
+    and the batches are requested concurrently (bounded by FINANCIALS_CONCURRENCY).
     """
     result: Dict[str, Any] = {
         "Financials": {
@@ -165,21 +259,21 @@ async def _fetch_financials_for_dates(
             "Income_Statement": {"quarterly": {}, "yearly": {}},
         }
     }
-    statements = ("Balance_Sheet", "Cash_Flow", "Income_Statement")
-
-    # Quarterlies
+    # Quarterlies, then annuals; leaves are batched into multi-filter requests
+    leaves: List[Tuple[str, str, str]] = []
     for d in quarter_dates:
-        for stmt in statements:
-            path = f"Financials::{stmt}::quarterly::{d}"
-            payload = await _fetch_filtered_block(ticker, api_token, path)
-            result["Financials"][stmt]["quarterly"][d] = payload
-
-    # Annuals
+        for stmt in FINANCIAL_STATEMENTS:
+            leaves.append((stmt, "quarterly", d))
     for d in annual_dates:
-        for stmt in statements:
-            path = f"Financials::{stmt}::yearly::{d}"
-            payload = await _fetch_filtered_block(ticker, api_token, path)
-            result["Financials"][stmt]["yearly"][d] = payload
+        for stmt in FINANCIAL_STATEMENTS:
+            leaves.append((stmt, "yearly", d))
+
+    paths = [f"Financials::{stmt}::{period}::{d}" for stmt, period, d in leaves]
+    payloads = await _fetch_leaves_batched(ticker, api_token, paths)
+
+    # Assemble in request order so the tree is deterministic
+    for (stmt, period, d), path in zip(leaves, paths):
+        result["Financials"][stmt][period][d] = payloads.get(path)
 
     return result
 
@@ -227,7 +321,7 @@ def _prune_common_stock_by_date(
     # 3) Financials
     fin = assembled.get("Financials")
     if isinstance(fin, dict):
-        for stmt in ("Balance_Sheet", "Cash_Flow", "Income_Statement"):
+        for stmt in FINANCIAL_STATEMENTS:
             stmt_block = fin.get(stmt)
             if isinstance(stmt_block, dict):
                 for period in ("quarterly", "yearly"):
@@ -239,6 +333,15 @@ def _prune_common_stock_by_date(
 
     return assembled
 
+def _non_financial_sections(sections: List[str]) -> List[str]:
+    """Sections for the bulk request: everything except 'General' and 'Financials'."""
+    out: List[str] = []
+    for s in sections:
+        if s == "General" or str(s).strip().lower() == "financials":
+            continue
+        out.append(str(s))
+    return out
+
 def _default_sections_for_type(asset_type: str) -> List[str]:
     t = asset_type.strip().lower()
     if t == "common stock":
@@ -289,6 +392,7 @@ def register(mcp: FastMCP):
         include_financials: bool = True,
         # Keep parity with your other tools
         fmt: str = "json",
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Get Fundamentals for Stocks, ETFs, Mutual Funds, and Indices.
@@ -316,9 +420,21 @@ def register(mcp: FastMCP):
         if to_date and from_date and start and end and end < start:
             return _err("'to_date' must be >= 'from_date'.")
 
-        # --- 1) Detect Type (via General)
+        bulk_params = extra_params if isinstance(extra_params, dict) else None
+
+        # --- 1) Detect Type (via General). When the caller supplied `sections`, the bulk
+        #        fetch does not depend on Type, so General rides on the same request: an
+        #        invalid ticker then costs one fundamentals call, not one per section set.
+        early: Optional[Dict[str, Any]] = None
+        early_sections = _non_financial_sections(sections) if sections else []
         try:
-            general = await _fetch_general(ticker, token)
+            if early_sections:
+                early = await _fetch_sections_bulk(ticker, token, ["General"] + early_sections, extra_params=bulk_params)
+                general = early.pop("General", None)
+                if not isinstance(general, dict) or "Type" not in general:
+                    raise RuntimeError("Unexpected 'General' response: missing 'Type'")
+            else:
+                general = await _fetch_general(ticker, token)
         except Exception as e:
             return _err(f"Failed to get General: {e}")
 
@@ -328,23 +444,21 @@ def register(mcp: FastMCP):
 
         # --- 2) Decide sections to pull (excluding 'General' which we already have)
         chosen_sections = sections if sections else _default_sections_for_type(asset_type)
-        non_general_sections = [s for s in chosen_sections if s != "General"]
 
         assembled: Dict[str, Any] = {"General": general}
 
         # --- 3) Fetch non-Financials in bulk where possible
-        non_financial_sections: List[str] = []
+        # We never ask for 'Financials' in the bulk; we fetch that separately below.
+        non_financial_sections = _non_financial_sections(chosen_sections)
         try:
-            # We never ask for 'Financials' in the bulk; we fetch that separately below.
-            for s in non_general_sections:
-                if str(s).strip().lower() != "financials":
-                    non_financial_sections.append(str(s))
-            if non_financial_sections:
+            if early is not None:
+                _merge_tree(assembled, early)
+            elif non_financial_sections:
                 bulk = await _fetch_sections_bulk(
                     ticker,
                     token,
                     non_financial_sections,
-                    extra_params=extra_params if isinstance(extra_params, dict) else None,
+                    extra_params=bulk_params,
                 )
                 _merge_tree(assembled, bulk)
         except Exception as e:
@@ -366,13 +480,13 @@ def register(mcp: FastMCP):
                     _merge_tree(assembled, fin_tree)
                 else:
                     # No date window -> download full maps (quarterly & yearly) for each statement
+                    pairs = [(stmt, period) for stmt in FINANCIAL_STATEMENTS for period in ("quarterly", "yearly")]
+                    blocks = await _fetch_leaves_batched(
+                        ticker, token, [f"Financials::{stmt}::{period}" for stmt, period in pairs]
+                    )
                     fin_full: Dict[str, Any] = {"Financials": {}}
-                    for stmt in ("Balance_Sheet", "Cash_Flow", "Income_Statement"):
-                        fin_full["Financials"].setdefault(stmt, {})
-                        for period in ("quarterly", "yearly"):
-                            path = f"Financials::{stmt}::{period}"
-                            block = await _fetch_filtered_block(ticker, token, path)
-                            fin_full["Financials"][stmt][period] = block
+                    for stmt, period in pairs:
+                        fin_full["Financials"].setdefault(stmt, {})[period] = blocks.get(f"Financials::{stmt}::{period}")
                     _merge_tree(assembled, fin_full)
             except Exception as e:
                 return _err(f"Failed to fetch Financials: {e}")
@@ -383,6 +497,6 @@ def register(mcp: FastMCP):
 
         # --- 6) Return full JSON (do not reduce)
         try:
-            return json.dumps(assembled, indent=2)
+            return to_json(assembled, output)
         except Exception:
             return _err("Unexpected response format from API.")
\ No newline at end of file
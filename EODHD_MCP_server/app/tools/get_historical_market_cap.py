@@ -1,6 +1,5 @@
 #get_historical_market_cap.py
 
-import json
 import re
 from datetime import datetime
 from typing import Optional
@@ -8,14 +7,12 @@ from typing import Optional
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import LAYOUTS, csv_json, error_json as _err, to_columnar, to_json
 from mcp.types import ToolAnnotations
 
 DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 ALLOWED_FMT = {"json", "csv"}
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
 def _valid_date(d: Optional[str]) -> bool:
     if d is None:
         return True
@@ -35,6 +32,8 @@ def register(mcp: FastMCP):
         end_date: Optional[str] = None,     # maps to 'to'   (YYYY-MM-DD)
         fmt: str = "json",                  # 'json' or 'csv' (API shows json; csv optional)
         api_token: Optional[str] = None,    # per-call override; env token otherwise
+        layout: str = "rows",                   # 'rows' | 'columnar' (struct-of-arrays)
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Historical Market Capitalization API (GET /api/historical-market-cap/{TICKER})
@@ -44,10 +43,11 @@ def register(mcp: FastMCP):
             - 'ticker' can be SYMBOL or SYMBOL.EXCHANGE (e.g., 'AAPL' or 'AAPL.US').
             - Optional 'from'/'to' filter by YYYY-MM-DD.
             - Each symbol request costs 10 API calls (per docs).
+            - layout='columnar' returns {"date": [...], "value": [...]} instead of per-point objects.
 
         Returns:
             str: JSON string with weekly market cap data
-                 (or {"csv": "..."} if you later adapt make_request to return text for csv).
+                 (or {"csv": "..."} when fmt='csv').
         """
         # --- Validate inputs ---
         if not ticker or not isinstance(ticker, str):
@@ -56,6 +56,9 @@ def register(mcp: FastMCP):
         if fmt not in ALLOWED_FMT:
             return _err(f"Invalid 'fmt'. Allowed: {sorted(ALLOWED_FMT)}")
 
+        if layout not in LAYOUTS:
+            return _err(f"Invalid 'layout'. Allowed: {sorted(LAYOUTS)}")
+
         if not _valid_date(start_date):
             return _err("'start_date' must be YYYY-MM-DD when provided.")
         if not _valid_date(end_date):
@@ -75,18 +78,21 @@ def register(mcp: FastMCP):
             url += f"&api_token={api_token}"  # otherwise make_request appends env token
 
         # --- Request ---
-        data = await make_request(url)
+        data = await make_request(url, response_type="text" if fmt == "csv" else "json")
 
         # --- Normalize / return ---
         if data is None:
             return _err("No response from API.")
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
+
+        if fmt == "csv":
+            return csv_json(data, output)
+
+        if layout == "columnar":
+            data = to_columnar(data)
 
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
-            # If you adapt make_request to return text for fmt='csv', we wrap it here.
-            if isinstance(data, str):
-                return json.dumps({"csv": data}, indent=2)
             return _err("Unexpected response format from API.")
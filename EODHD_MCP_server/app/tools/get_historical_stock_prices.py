@@ -1,6 +1,5 @@
 #get_historical_stock_prices.py
 
-import json
 import re
 from datetime import datetime
 from typing import Optional
@@ -8,6 +7,9 @@ from typing import Optional
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.barstore import bar_store, eod_bars
+from app.history_sync import history_sync
+from app.formatting import LAYOUTS, csv_json, error_json as _err, to_columnar, to_json
 from mcp.types import ToolAnnotations
 
 
@@ -16,9 +18,6 @@ ALLOWED_PERIODS = {"d", "w", "m"}          # daily, weekly, monthly (per docs)
 ALLOWED_ORDER = {"a", "d"}                 # ascending, descending (per docs)
 ALLOWED_FMT = {"json", "csv"}              # default is csv in API, but we default to json here
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
 def _valid_date(s: str) -> bool:
     if not DATE_RE.match(s):
         return False
@@ -39,6 +38,9 @@ def register(mcp: FastMCP):
         fmt: str = "json",
         filter: Optional[str] = None,           # e.g., "last_close", "last_volume"
         api_token: Optional[str] = None,        # per-call override
+        layout: str = "rows",                   # 'rows' | 'columnar' (struct-of-arrays)
+        sync: bool = False,                     # incremental "since last sync" refresh
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         End-Of-Day Historical Stock Market Data (EOD) — spec-aligned.
@@ -52,10 +54,22 @@ def register(mcp: FastMCP):
             fmt (str): 'json' or 'csv'. Default 'json'. (API default is csv.)
             filter (str, optional): e.g., 'last_close', 'last_volume' (works with fmt=json; returns a single value).
             api_token (str, optional): Override API token for this call. If not provided, env token is used.
+            layout (str): 'rows' (list of per-bar objects, default) or 'columnar'
+                ({"date": [...], "open": [...], ...}); applies to fmt='json' series.
+            sync (bool): Incremental refresh for repeated calls with the same start_date. The server
+                keeps the last returned daily series per ticker and only asks the API for bars from
+                the last closed date on; a dividend or split since then (or a changed overlap bar)
+                triggers one full refetch. Requires period='d', fmt='json', start_date, no filter.
+                The result is then {"sync": {"mode", "full_refetch", "reason"}, "data": [...]},
+                where mode is 'full', 'incremental' or 'local'.
 
         Returns:
             str: JSON string with data or {"error": "..."}.
-                 If fmt='csv', returns CSV text embedded as a JSON string for consistency.
+                 If fmt='csv', returns the raw CSV body wrapped as {"csv": "..."}.
+
+        Notes:
+            - With EODHD_BAR_STORE_PATH set, daily JSON requests with a start_date are answered
+              from the on-disk bar store; only ranges not stored yet (and the last EODHD_BAR_STORE_GRACE_DAYS) are fetched.
         """
         # --- Validate required/typed params ---
         if not ticker or not isinstance(ticker, str):
@@ -70,6 +84,9 @@ def register(mcp: FastMCP):
         if fmt not in ALLOWED_FMT:
             return _err(f"Invalid 'fmt'. Allowed values: {sorted(ALLOWED_FMT)}")
 
+        if layout not in LAYOUTS:
+            return _err(f"Invalid 'layout'. Allowed: {sorted(LAYOUTS)}")
+
         if start_date is not None and not _valid_date(start_date):
             return _err("Parameter 'start_date' must be YYYY-MM-DD when provided.")
 
@@ -80,6 +97,27 @@ def register(mcp: FastMCP):
             if datetime.strptime(start_date, "%Y-%m-%d") > datetime.strptime(end_date, "%Y-%m-%d"):
                 return _err("'start_date' cannot be after 'end_date'.")
 
+        # --- Incremental "since last sync" mode ---
+        if sync:
+            if period != "d" or fmt != "json" or filter or not start_date:
+                return _err("'sync' requires period='d', fmt='json', a start_date and no filter.")
+            synced = await history_sync.series(ticker, start_date, end_date, api_token)
+            if synced.get("error"):
+                return _err(synced["error"])
+            data = synced["data"]
+            if order == "d":
+                data.reverse()
+            return to_json({"sync": synced["sync"], "data": to_columnar(data) if layout == "columnar" else data}, output)
+
+        # --- Daily series with a start: serve from the bar store, fetching only what's missing ---
+        if bar_store.enabled and period == "d" and fmt == "json" and not filter and start_date:
+            data = await eod_bars(ticker, start_date, end_date, api_token)
+            if isinstance(data, dict):
+                return _err(data.get("error") or "Unexpected response format from API.")
+            if order == "d":
+                data.reverse()
+            return to_json(to_columnar(data) if layout == "columnar" else data, output)
+
         # --- Build URL per docs ---
         # Base: /api/eod/{ticker}
         # Params: period, order, from, to, fmt, (optional) filter, api_token
@@ -97,25 +135,23 @@ def register(mcp: FastMCP):
             url += f"&api_token={api_token}"
 
         # --- Execute request ---
-        data = await make_request(url)
+        # fmt=csv bodies are returned raw (no JSON parse attempt).
+        data = await make_request(url, response_type="text" if fmt == "csv" else "json")
 
         # --- Transport/API errors ---
         if data is None:
             return _err("No response from API.")
 
-        # If fmt=json, API returns JSON. If fmt=csv, httpx/json may return str or dict error.
-        # Normalize:
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
+
+        if fmt == "csv":
+            return csv_json(data, output)
+
+        if layout == "columnar":
+            data = to_columnar(data)
 
-        # For CSV, make_request() will attempt .json() and fail; but our make_request currently returns response.json().
-        # If you need raw CSV support, consider updating make_request to return text for fmt=csv.
-        # Until then, we keep fmt=json by default. However, if the API returned a list (json), just dump it.
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
-            # If fmt=csv and make_request was adapted to return text, 'data' may already be a str.
-            if isinstance(data, str):
-                # Wrap CSV text into a JSON string for consistent MCP return type (string)
-                return json.dumps({"csv": data}, indent=2)
             return _err("Unexpected response format from API.")
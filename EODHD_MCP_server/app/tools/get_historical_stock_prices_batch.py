@@ -0,0 +1,202 @@
+#get_historical_stock_prices_batch.py
+
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from fastmcp import FastMCP
+from app.config import EODHD_API_BASE, EODHD_BATCH_CONCURRENCY
+from app.api_client import make_request
+from app.barstore import bar_store, eod_bars
+from app.concurrency import gather_bounded
+from app.formatting import LAYOUTS, error_json as _err, to_columnar, to_json
+from app.history_sync import history_sync
+from mcp.types import ToolAnnotations
+
+
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+ALLOWED_ORDER = {"a", "d"}
+ALLOWED_ALIGN = {"union", "intersection"}
+ALIGNED_FIELDS = ("open", "high", "low", "close", "adjusted_close", "volume")
+MAX_TICKERS = 500
+MAX_CONCURRENCY = 32
+
+
+def _valid_date(s: Optional[str]) -> bool:
+    if s is None:
+        return True
+    if not isinstance(s, str) or not DATE_RE.match(s):
+        return False
+    try:
+        datetime.strptime(s, "%Y-%m-%d")
+        return True
+    except ValueError:
+        return False
+
+
+def _normalize_list(items: Union[str, Sequence[str], None]) -> List[str]:
+    if isinstance(items, str):
+        items = items.split(",")
+    elif isinstance(items, (list, tuple)):
+        items = [str(i) for i in items]
+    else:
+        return []
+    out: List[str] = []
+    for i in (x.strip() for x in items):
+        if i and i not in out:
+            out.append(i)
+    return out
+
+
+async def _fetch_one(ticker: str, start_date: Optional[str], end_date: Optional[str],
+                     api_token: Optional[str], sync: bool) -> Any:
+    """
+    Ascending daily bars for one ticker, or {"error": ...}; same paths as get_historical_stock_prices.
+    With sync, the history_sync result ({"data", "sync"}) is returned as is.
+    """
+    if sync:
+        return await history_sync.series(ticker, start_date, end_date, api_token)
+    if bar_store.enabled and start_date:
+        return await eod_bars(ticker, start_date, end_date, api_token)
+
+    # Same URL shape as get_historical_stock_prices, so both share response-cache entries.
+    url = f"{EODHD_API_BASE}/eod/{ticker}?period=d&order=a&fmt=json"
+    if start_date:
+        url += f"&from={start_date}"
+    if end_date:
+        url += f"&to={end_date}"
+    if api_token:
+        url += f"&api_token={api_token}"
+    data = await make_request(url)
+    if data is None:
+        return {"error": "No response from API."}
+    if isinstance(data, dict) and data.get("error"):
+        return {"error": data["error"]}
+    if not isinstance(data, list):
+        return {"error": "Unexpected response format from API."}
+    return data
+
+
+def _align(series: Dict[str, List[dict]], how: str, fields: List[str], descending: bool) -> Dict[str, Any]:
+    """Common date index plus per-ticker {field: [value | null per date]} columns."""
+    by_date = {t: {r.get("date"): r for r in rows if isinstance(r, dict)} for t, rows in series.items()}
+    date_sets = [set(d) for d in by_date.values()]
+    if not date_sets:
+        dates: List[str] = []
+    elif how == "intersection":
+        dates = sorted(set.intersection(*date_sets))
+    else:
+        dates = sorted(set.union(*date_sets))
+    if descending:
+        dates.reverse()
+
+    columns: Dict[str, Any] = {}
+    for t, rows in by_date.items():
+        columns[t] = {f: [rows[d].get(f) if d in rows else None for d in dates] for f in fields}
+    return {"dates": dates, "series": columns}
+
+
+def register(mcp: FastMCP):
+    @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+    async def get_historical_stock_prices_batch(
+        tickers: Union[str, List[str]],          # 'AAPL.US,MSFT.US' | ['AAPL.US', 'MSFT.US']
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        order: str = "a",
+        fields: Optional[Union[str, List[str]]] = None,  # e.g. 'close,volume' (default: all)
+        align: Optional[str] = None,            # None | 'union' | 'intersection'
+        sync: bool = False,                     # incremental refresh per ticker (see get_historical_stock_prices)
+        max_concurrency: int = EODHD_BATCH_CONCURRENCY,
+        api_token: Optional[str] = None,
+        layout: str = "rows",                   # 'rows' | 'columnar' (struct-of-arrays)
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
+    ) -> str:
+        """
+        Daily EOD bars for many tickers over one shared window (one EOD fetch per ticker,
+        run concurrently under max_concurrency and the server's rate limiter).
+
+        Args:
+            tickers: SYMBOL.EXCHANGE tickers as a comma string or list (max 500).
+            start_date / end_date (str, optional): Window in YYYY-MM-DD; defaults as in
+                get_historical_stock_prices (full history / up to most recent).
+            order (str): 'a' ascending (default) or 'd' descending.
+            fields: Bar fields to keep besides 'date' (e.g. 'adjusted_close,volume'). Default all
+                (with align: open, high, low, close, adjusted_close, volume).
+            align (str, optional): 'union' or 'intersection' puts every ticker on one common date
+                index; missing bars are null.
+            sync (bool): Per-ticker "since last sync" refresh, as get_historical_stock_prices(sync=True).
+                Requires start_date.
+            max_concurrency (int): Concurrent ticker fetches (1..32). Default 8 (EODHD_BATCH_CONCURRENCY).
+            api_token (str, optional): Per-call token override; env token used if omitted.
+            layout (str): 'rows' (list of per-bar objects, default) or 'columnar' per ticker;
+                ignored with align (always columnar).
+
+        Returns:
+            Without align: JSON object keyed by ticker; each value is that ticker's bars, or
+            {"error": "..."} for that ticker only.
+            With align: {"dates": [...], "series": {ticker: {field: [...]}}, "errors": {ticker: "..."}}.
+            With sync, each ticker's value is {"sync": {"mode", "full_refetch", "reason"}, "data": bars}
+            (with align, the per-ticker sync blocks go under "sync").
+        """
+        syms = _normalize_list(tickers)
+        if not syms:
+            return _err("Parameter 'tickers' must contain at least one ticker (e.g., 'AAPL.US').")
+        if len(syms) > MAX_TICKERS:
+            return _err(f"Too many tickers: {len(syms)} (max {MAX_TICKERS}).")
+        if order not in ALLOWED_ORDER:
+            return _err(f"Invalid 'order'. Allowed values: {sorted(ALLOWED_ORDER)}")
+        if layout not in LAYOUTS:
+            return _err(f"Invalid 'layout'. Allowed: {sorted(LAYOUTS)}")
+        if align is not None and align not in ALLOWED_ALIGN:
+            return _err(f"Invalid 'align'. Allowed values: {sorted(ALLOWED_ALIGN)}")
+        if not _valid_date(start_date):
+            return _err("Parameter 'start_date' must be YYYY-MM-DD when provided.")
+        if not _valid_date(end_date):
+            return _err("Parameter 'end_date' must be YYYY-MM-DD when provided.")
+        if start_date and end_date and start_date > end_date:
+            return _err("'start_date' cannot be after 'end_date'.")
+        if sync and not start_date:
+            return _err("'sync' requires a start_date.")
+        if not isinstance(max_concurrency, int) or not (1 <= max_concurrency <= MAX_CONCURRENCY):
+            return _err(f"'max_concurrency' must be an integer between 1 and {MAX_CONCURRENCY}.")
+        keep = _normalize_list(fields)
+
+        # Each ticker fails on its own: exceptions become that ticker's error.
+        async def _safe(ticker: str) -> Any:
+            try:
+                return await _fetch_one(ticker, start_date, end_date, api_token, sync)
+            except Exception as e:
+                return {"error": f"{type(e).__name__}: {e}"}
+
+        fetched = await gather_bounded([_safe(t) for t in syms], max_concurrency)
+
+        series: Dict[str, List[dict]] = {}
+        errors: Dict[str, str] = {}
+        synced: Dict[str, dict] = {}
+        for t, data in zip(syms, fetched):
+            if isinstance(data, dict) and isinstance(data.get("data"), list) and "sync" in data:
+                synced[t], data = data["sync"], data["data"]
+            if isinstance(data, dict):
+                errors[t] = data.get("error") or "Unexpected response format from API."
+                continue
+            if keep and not align:
+                data = [{"date": r.get("date"), **{f: r.get(f) for f in keep}} for r in data if isinstance(r, dict)]
+            series[t] = data
+
+        if align:
+            out: Dict[str, Any] = _align(series, align, keep or list(ALIGNED_FIELDS), order == "d")
+            out["errors"] = errors
+            if sync:
+                out["sync"] = synced
+            return to_json(out, output)
+
+        result: Dict[str, Any] = {}
+        for t in syms:
+            if t in errors:
+                result[t] = {"error": errors[t]}
+                continue
+            rows = series[t][::-1] if order == "d" else series[t]
+            result[t] = to_columnar(rows) if layout == "columnar" else rows
+            if sync:
+                result[t] = {"sync": synced[t], "data": result[t]}
+        return to_json(result, output)
@@ -1,12 +1,15 @@
 #get_intraday_historical_data.py
 
-import json
+import time
 from datetime import datetime, date, timezone
-from typing import Optional, Union
+from typing import Any, List, Optional, Tuple, Union
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.barstore import bar_store, intraday_bars
+from app.formatting import LAYOUTS, csv_json, error_json as _err, to_columnar, to_json
+from app.concurrency import gather_bounded
 from mcp.types import ToolAnnotations
 
 ALLOWED_INTERVALS = {"1m", "5m", "1h"}   # per docs
@@ -19,9 +22,10 @@ MAX_RANGE_DAYS = {
     "1h": 7200,
 }
 
-
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
+# auto_chunk: upper bound on concurrent chunk requests and on chunks per call
+DEFAULT_CHUNK_CONCURRENCY = 4
+MAX_CHUNK_CONCURRENCY = 16
+MAX_CHUNKS = 200
 
 
 def _to_unix_seconds(dt_obj: datetime) -> int:
@@ -145,6 +149,57 @@ def _coerce_from_to(
     return from_ts, to_ts, None
 
 
+def _plan_chunks(from_ts: int, to_ts: int, max_days: int) -> List[Tuple[int, int]]:
+    """
+    Split [from_ts, to_ts] into consecutive windows no wider than max_days.
+    Adjacent windows share their boundary second; duplicates are removed on merge.
+    """
+    span = max_days * 86400
+    chunks: List[Tuple[int, int]] = []
+    start = from_ts
+    while True:
+        end = min(start + span, to_ts)
+        chunks.append((start, end))
+        if end >= to_ts:
+            break
+        start = end
+    return chunks
+
+
+def _merge_bars(parts: List[Any]) -> List[Any]:
+    """
+    Concatenate chunk results into one ascending series, dropping bars repeated
+    at chunk boundaries (keyed by 'timestamp', falling back to 'datetime').
+    """
+    seen = set()
+    merged: List[Any] = []
+    for part in parts:
+        if not isinstance(part, list):
+            continue
+        for bar in part:
+            key = None
+            if isinstance(bar, dict):
+                key = bar.get("timestamp", bar.get("datetime"))
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            merged.append(bar)
+
+    def _sort_key(bar: Any):
+        if isinstance(bar, dict):
+            ts = bar.get("timestamp")
+            if isinstance(ts, (int, float)):
+                return ts
+            dt_s = bar.get("datetime")
+            if isinstance(dt_s, str):
+                return _parse_date_to_unix(dt_s) or 0
+        return 0
+
+    merged.sort(key=_sort_key)
+    return merged
+
+
 def register(mcp: FastMCP):
     @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
     async def get_intraday_historical_data(
@@ -156,6 +211,10 @@ def register(mcp: FastMCP):
         fmt: str = "json",
         split_dt: Optional[bool] = False,
         api_token: Optional[str] = None,
+        auto_chunk: bool = False,
+        max_concurrency: int = DEFAULT_CHUNK_CONCURRENCY,
+        layout: str = "rows",                   # 'rows' | 'columnar' (struct-of-arrays)
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Intraday Historical Stock Price Data API (spec-aligned).
@@ -170,11 +229,22 @@ def register(mcp: FastMCP):
             fmt (str): 'json' or 'csv'. Default 'json'.
             split_dt (bool, optional): If True, adds 'split-dt=1' to split date/time fields.
             api_token (str, optional): Per-call token override; env token used if omitted.
+            layout (str): 'rows' (list of per-bar objects, default) or 'columnar'
+                ({"datetime": [...], "open": [...], ...}); applies to fmt='json'.
+            auto_chunk (bool): If True, a range wider than the interval's maximum is split into
+                compliant windows that are fetched concurrently and merged into one ascending
+                series (boundary duplicates removed). Requires fmt='json' and 'from_timestamp';
+                'to_timestamp' defaults to now. Default False.
+            max_concurrency (int): Concurrent chunk requests when auto_chunk is used (1..16). Default 4.
 
         Notes:
             - If no 'from'/'to' provided, API returns last 120 days by default (per docs).
             - Max span depends on interval:
                 1m -> 120 days, 5m -> 600 days, 1h -> 7200 days.
+            - With auto_chunk, each window is a separate upstream request (API cost per window).
+            - With EODHD_BAR_STORE_PATH set, JSON requests with 'from_timestamp' (and no split_dt)
+              are answered from the on-disk bar store; only ranges not stored yet (and the last
+              EODHD_BAR_STORE_GRACE_DAYS) are fetched.
         """
 
         # --- Validate required/typed params ---
@@ -187,21 +257,72 @@ def register(mcp: FastMCP):
         if fmt not in ALLOWED_FMT:
             return _err(f"Invalid 'fmt'. Allowed: {sorted(ALLOWED_FMT)}")
 
+        if layout not in LAYOUTS:
+            return _err(f"Invalid 'layout'. Allowed: {sorted(LAYOUTS)}")
+
         # --- Coerce 'from'/'to' into Unix seconds (auto-detect strings, ms, etc.) ---
         from_ts, to_ts, err = _coerce_from_to(from_timestamp, to_timestamp)
         if err:
             return _err(err)
 
+        max_days = MAX_RANGE_DAYS[interval]
+
+        # --- Auto-chunked mode: split wide ranges into compliant windows ---
+        if auto_chunk and from_ts is not None:
+            if fmt != "json":
+                return _err("'auto_chunk' requires fmt='json'.")
+            if not isinstance(max_concurrency, int) or not (1 <= max_concurrency <= MAX_CHUNK_CONCURRENCY):
+                return _err(f"'max_concurrency' must be an integer between 1 and {MAX_CHUNK_CONCURRENCY}.")
+            if to_ts is None:
+                to_ts = int(time.time())
+                if from_ts > to_ts:
+                    return _err("'from_timestamp' cannot be in the future.")
+            if to_ts - from_ts > max_days * 86400:
+                chunks = _plan_chunks(from_ts, to_ts, max_days)
+                if len(chunks) > MAX_CHUNKS:
+                    return _err(f"Requested range needs {len(chunks)} chunks; max is {MAX_CHUNKS}.")
+
+                if bar_store.enabled and not split_dt:
+                    merged = await intraday_bars(ticker, interval, from_ts, to_ts, api_token, max_days, max_concurrency)
+                    if isinstance(merged, dict):
+                        return to_json({"error": merged.get("error"), "chunk": merged.get("range")}, output)
+                    return to_json(to_columnar(merged) if layout == "columnar" else merged, output)
+
+                base = f"{EODHD_API_BASE}/intraday/{ticker}?fmt=json&interval={interval}"
+                if split_dt:
+                    base += "&split-dt=1"
+                if api_token:
+                    base += f"&api_token={api_token}"
+
+                parts = await gather_bounded(
+                    [make_request(f"{base}&from={a}&to={b}") for a, b in chunks],
+                    max_concurrency,
+                )
+                for (a, b), part in zip(chunks, parts):
+                    if part is None:
+                        return _err(f"No response from API for chunk {a}..{b}.")
+                    if isinstance(part, dict) and part.get("error"):
+                        return to_json({"error": part["error"], "chunk": {"from": a, "to": b}}, output)
+
+                merged = _merge_bars(parts)
+                return to_json(to_columnar(merged) if layout == "columnar" else merged, output)
+
         # --- Enforce documented maximum range ---
         if from_ts is not None and to_ts is not None:
             span_seconds = to_ts - from_ts
-            max_days = MAX_RANGE_DAYS[interval]
             if span_seconds > max_days * 86400:
                 return _err(
                     f"Requested range exceeds maximum for interval '{interval}'. "
-                    f"Max is {max_days} days."
+                    f"Max is {max_days} days. Pass auto_chunk=True to split it automatically."
                 )
 
+        # --- Bar store: stored closed ranges are read locally, the rest fetched ---
+        if bar_store.enabled and fmt == "json" and not split_dt and from_ts is not None:
+            data = await intraday_bars(ticker, interval, from_ts, to_ts or int(time.time()), api_token, max_days)
+            if isinstance(data, dict):
+                return _err(data.get("error") or "Unexpected response format from API.")
+            return to_json(to_columnar(data) if layout == "columnar" else data, output)
+
         # --- Build URL ---
         # Base: /api/intraday/{ticker}?fmt=...&interval=...&from=...&to=...&split-dt=1
         url = f"{EODHD_API_BASE}/intraday/{ticker}?fmt={fmt}&interval={interval}"
@@ -218,20 +339,23 @@ def register(mcp: FastMCP):
             url += f"&api_token={api_token}"
 
         # --- Request ---
-        data = await make_request(url)
+        data = await make_request(url, response_type="text" if fmt == "csv" else "json")
 
         # --- Normalize errors / outputs ---
         if data is None:
             return _err("No response from API.")
 
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
+
+        # fmt=csv: raw body, wrapped as {"csv": "..."} so the tool always returns a JSON string.
+        if fmt == "csv":
+            return csv_json(data, output)
+
+        if layout == "columnar":
+            data = to_columnar(data)
 
-        # For csv: if you later adapt make_request to return text for fmt='csv',
-        # we wrap it as {"csv": "..."} so the MCP tool consistently returns a JSON string.
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
-            if isinstance(data, str):
-                return json.dumps({"csv": data}, indent=2)
             return _err("Unexpected response format from API.")
@@ -1,18 +1,20 @@
 #get_live_price_data.py
 
-import json
 from typing import Iterable, Optional, Sequence
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.concurrency import chunked, gather_bounded
+from app.formatting import csv_json, error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 ALLOWED_FMT = {"json", "csv"}
 MAX_EXTRA_TICKERS = 20  # soft limit recommended by docs (15–20)
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
+# batch=True: concurrent shard requests (each 1 path ticker + up to MAX_EXTRA_TICKERS in 's=')
+DEFAULT_BATCH_CONCURRENCY = 8
+MAX_BATCH_CONCURRENCY = 32
 
 def _normalize_symbols(symbols: Optional[Iterable[str]]) -> list[str]:
     if not symbols:
@@ -26,6 +28,69 @@ def _normalize_symbols(symbols: Optional[Iterable[str]]) -> list[str]:
             out.append(s)
     return out
 
+def _requested_symbol(code: Optional[str], pending: dict) -> Optional[str]:
+    """
+    The requested symbol a returned quote belongs to. The API answers bare tickers with
+    their exchange suffix ('VTI' -> 'VTI.US'), so codes match with or without it.
+    """
+    if not code:
+        return None
+    code = str(code).upper()
+    if code in pending:
+        return pending.pop(code)
+    bare = code.rsplit(".", 1)[0]
+    if "." in code and bare in pending:
+        return pending.pop(bare)
+    return None
+
+
+async def _batch_quotes(symbols: list[str], api_token: Optional[str], concurrency: int) -> dict:
+    """Fetch quotes in compliant groups concurrently and merge them by symbol."""
+    symbols = list(dict.fromkeys(symbols))
+    groups = chunked(symbols, MAX_EXTRA_TICKERS + 1)
+
+    async def _fetch(group):
+        url = f"{EODHD_API_BASE}/real-time/{group[0]}?fmt=json"
+        if len(group) > 1:
+            url += f"&s={','.join(group[1:])}"
+        if api_token:
+            url += f"&api_token={api_token}"
+        return await make_request(url)
+
+    results = await gather_bounded([_fetch(g) for g in groups], concurrency)
+
+    data: dict = {}
+    errors: dict = {}
+    for group, res in zip(groups, results):
+        if res is None or (isinstance(res, dict) and res.get("error")):
+            msg = "No response from API." if res is None else res["error"]
+            errors.update({s: msg for s in group})
+            continue
+        rows = res if isinstance(res, list) else [res]
+        pending = {s.upper(): s for s in group}
+        unmatched = []
+        for i, row in enumerate(rows):
+            code = row.get("code") if isinstance(row, dict) else None
+            symbol = _requested_symbol(code, pending)
+            if symbol is None:
+                unmatched.append((i, code, row))
+            else:
+                data[symbol] = row
+        # Codes that match nothing requested fall back to their position in the group
+        for i, code, row in unmatched:
+            symbol = group[i] if i < len(group) and group[i].upper() in pending else None
+            if symbol is not None:
+                del pending[symbol.upper()]
+            data[symbol or code or f"#{i}"] = row
+        for s in pending.values():
+            errors[s] = "No quote returned."
+
+    out = {"count": len(data), "requests": len(groups), "data": data}
+    if errors:
+        out["errors"] = errors
+    return out
+
+
 def register(mcp: FastMCP):
     @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
     async def get_live_price_data(
@@ -33,6 +98,9 @@ def register(mcp: FastMCP):
         additional_symbols: Optional[Sequence[str]] = None,
         fmt: str = "json",
         api_token: Optional[str] = None,
+        batch: bool = False,
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Live (Delayed) Stock Prices API
@@ -45,10 +113,19 @@ def register(mcp: FastMCP):
                           Docs recommend <= 15–20 total.
             fmt (str): 'json' or 'csv'. Defaults to 'json' for easier client handling.
             api_token (str, optional): Per-call token override. If omitted, env token is used.
+            batch (bool): If True, any number of symbols is accepted: they are split into
+                groups of 1 + MAX_EXTRA_TICKERS, fetched concurrently (under the rate limiter)
+                and merged into {"count", "requests", "data": {symbol: quote}, "errors": {symbol: msg}},
+                keyed by the symbols as requested ('VTI' even when the API returns 'VTI.US').
+                Requires fmt='json'. Default False.
+            max_concurrency (int): Concurrent group requests when batch is used (1..32). Default 8.
+
+        Notes:
+            - 1 API call per ticker, also when batched.
 
         Returns:
-            str: JSON string. If fmt='csv' and your `make_request` returns raw text,
-                 this tool wraps CSV into {"csv": "..."}; otherwise returns JSON from API.
+            str: JSON string. If fmt='csv', the raw CSV body is wrapped as {"csv": "..."};
+                 otherwise returns JSON from API (or the merged object when batch=True).
         """
         # --- Validate inputs ---
         if not ticker or not isinstance(ticker, str):
@@ -61,10 +138,18 @@ def register(mcp: FastMCP):
         # Prevent duplicates of the primary ticker in 's='
         extras = [s for s in extras if s != ticker]
 
+        if batch:
+            if fmt != "json":
+                return _err("'batch' requires fmt='json'.")
+            if not isinstance(max_concurrency, int) or not (1 <= max_concurrency <= MAX_BATCH_CONCURRENCY):
+                return _err(f"'max_concurrency' must be an integer between 1 and {MAX_BATCH_CONCURRENCY}.")
+            return to_json(await _batch_quotes([ticker, *extras], api_token, max_concurrency), output)
+
         if len(extras) > MAX_EXTRA_TICKERS:
             return _err(
                 f"Too many symbols in 'additional_symbols'. "
-                f"Got {len(extras)}, max recommended is {MAX_EXTRA_TICKERS}."
+                f"Got {len(extras)}, max recommended is {MAX_EXTRA_TICKERS}. "
+                f"Pass batch=True to split them into several requests."
             )
 
         # --- Build URL per docs ---
@@ -78,20 +163,19 @@ def register(mcp: FastMCP):
             url += f"&api_token={api_token}"
 
         # --- Request ---
-        data = await make_request(url)
+        data = await make_request(url, response_type="text" if fmt == "csv" else "json")
 
         # --- Normalize errors / outputs ---
         if data is None:
             return _err("No response from API.")
 
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
+
+        if fmt == "csv":
+            return csv_json(data, output)
 
-        # If make_request always returns JSON (since it calls response.json()),
-        # this will succeed for fmt=json. For fmt=csv, consider adapting make_request to return text.
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
-            if isinstance(data, str):  # if you adapted make_request to return text for CSV
-                return json.dumps({"csv": data}, indent=2)
             return _err("Unexpected response format from API.")
@@ -1,12 +1,12 @@
 #get_macro_indicator.py
 
-import json
 import re
 from typing import Optional
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import csv_json, error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 ISO3_RE = re.compile(r"^[A-Z]{3}$")
@@ -55,9 +55,6 @@ ALLOWED_INDICATORS = {
     "unemployment_total_percent",
 }
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
 def register(mcp: FastMCP):
     @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
     async def get_macro_indicator(
@@ -65,6 +62,7 @@ def register(mcp: FastMCP):
         indicator: Optional[str] = None,       # default: gdp_current_usd
         fmt: str = "json",                     # 'json' or 'csv' (API default json here)
         api_token: Optional[str] = None,       # per-call override; env otherwise
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Macro Indicators API (GET /api/macro-indicator/{COUNTRY})
@@ -76,7 +74,7 @@ def register(mcp: FastMCP):
             api_token (str, optional): Per-call token override.
 
         Returns:
-            str: JSON with indicator timeseries or {"csv": "..."} wrapper if returning CSV text,
+            str: JSON with indicator timeseries or {"csv": "..."} wrapper when fmt='csv',
                  or {"error": "..."} on validation/transport errors.
         """
         # --- Validate inputs ---
@@ -103,19 +101,18 @@ def register(mcp: FastMCP):
             url += f"&api_token={api_token}"  # otherwise make_request appends env token
 
         # --- Request ---
-        data = await make_request(url)
+        data = await make_request(url, response_type="text" if fmt == "csv" else "json")
 
         # --- Normalize / return ---
         if data is None:
             return _err("No response from API.")
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
+
+        if fmt == "csv":
+            return csv_json(data, output)
 
-        # If fmt=json, API returns JSON -> dump.
-        # If you adapt make_request to return text for fmt='csv', we'll wrap it.
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
-            if isinstance(data, str):
-                return json.dumps({"csv": data}, indent=2)
             return _err("Unexpected response format from API.")
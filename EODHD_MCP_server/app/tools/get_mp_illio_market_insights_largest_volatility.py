@@ -1,19 +1,15 @@
 #get_mp_illio_market_insights_largest_volatility.py
 
-import json
 from typing import Optional
 from urllib.parse import quote_plus
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
-
 def _q(key: str, val: Optional[str | int]) -> str:
     if val is None or val == "":
         return ""
@@ -50,7 +46,7 @@ def _canon_id(v: str) -> Optional[str]:
     return _CANONICAL_MAP.get(k)
 
 
-async def _run_largest_volatility(id: str, fmt: str, api_token: Optional[str]) -> str:
+async def _run_largest_volatility(id: str, fmt: str, api_token: Optional[str], output: Optional[str] = None) -> str:
     """
     Internal runner for Largest Volatility Change chapter.
     """
@@ -85,7 +81,7 @@ async def _run_largest_volatility(id: str, fmt: str, api_token: Optional[str]) -
 
     # Normalize and return
     try:
-        return json.dumps(data, indent=2)
+        return to_json(data, output)
     except Exception:
         return _err("Unexpected JSON response format from API.")
 
@@ -96,6 +92,7 @@ def register(mcp: FastMCP):
         id: str,                          # one of {'SnP500','DJI','NDX'} (common aliases accepted)
         fmt: str = "json",                # JSON only (Marketplace returns JSON)
         api_token: Optional[str] = None,  # per-call override (else env EODHD_API_KEY)
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Marketplace: illio Market Insights – Largest Volatility Change (v1.0.0)
@@ -117,7 +114,7 @@ def register(mcp: FastMCP):
           - 100k calls / 24h, 1k requests / minute
           - Output is JSON
         """
-        return await _run_largest_volatility(id=id, fmt=fmt, api_token=api_token)
+        return await _run_largest_volatility(id=id, fmt=fmt, api_token=api_token, output=output)
 
     # Optional alias for convenience/back-compat
     @mcp.tool()
@@ -125,8 +122,9 @@ def register(mcp: FastMCP):
         id: str,
         fmt: str = "json",
         api_token: Optional[str] = None,
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Alias for get_mp_illio_market_insights_largest_volatility.
         """
-        return await _run_largest_volatility(id=id, fmt=fmt, api_token=api_token)
+        return await _run_largest_volatility(id=id, fmt=fmt, api_token=api_token, output=output)
@@ -1,17 +1,14 @@
 #get_mp_index_components.py
 
-import json
 from typing import Optional
 from urllib.parse import quote_plus
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
 
 def _q(key: str, val: Optional[str]) -> str:
     if val is None or val == "":
@@ -25,6 +22,7 @@ def register(mcp: FastMCP):
         symbol: str,                        # e.g., "GSPC.INDX" from mp_indices_list
         fmt: str = "json",                  # JSON only (per docs)
         api_token: Optional[str] = None,    # per-call override
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Marketplace: Index Components (+ historical changes for major indices)
@@ -56,6 +54,6 @@ def register(mcp: FastMCP):
         if data is None:
             return _err("No response from API.")
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
             return _err("Unexpected JSON response format from API.")
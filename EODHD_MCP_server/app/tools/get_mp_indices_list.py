@@ -1,17 +1,14 @@
 #get_mp_indices_list.py
 
-import json
 from typing import Optional
 from urllib.parse import quote_plus
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
 
 def _q(key: str, val: Optional[str]) -> str:
     if val is None or val == "":
@@ -24,6 +21,7 @@ def register(mcp: FastMCP):
     async def mp_indices_list(
         fmt: str = "json",                 # API returns JSON; expose for symmetry
         api_token: Optional[str] = None,   # per-call override (else env EODHD_API_KEY)
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Marketplace: List of Indices with Details
@@ -52,6 +50,6 @@ def register(mcp: FastMCP):
         if data is None:
             return _err("No response from API.")
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
             return _err("Unexpected JSON response format from API.")
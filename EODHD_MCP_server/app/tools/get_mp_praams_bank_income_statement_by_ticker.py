@@ -1,17 +1,14 @@
 #get_mp_praams_bank_income_statement_by_ticker.py
 
-import json
 from typing import Optional
 from urllib.parse import quote_plus
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
 
 def _q(key: str, val: Optional[str | int]) -> str:
     """
@@ -44,6 +41,7 @@ def _canon_ticker(v: str) -> Optional[str]:
 async def _run_praams_bank_income_statement_by_ticker(
     ticker: str,
     api_token: Optional[str],
+    output: Optional[str] = None,
 ) -> str:
     """
     Core runner for Praams Bank Income Statement by ticker.
@@ -70,7 +68,7 @@ async def _run_praams_bank_income_statement_by_ticker(
     #   {"success": ..., "items": [...], "message": "...", "errors": [...]}
     # We just pretty-print whatever comes back.
     try:
-        return json.dumps(data, indent=2)
+        return to_json(data, output)
     except Exception:
         return _err("Unexpected JSON response format from API.")
 
@@ -80,6 +78,7 @@ def register(mcp: FastMCP):
     async def get_mp_praams_bank_income_statement_by_ticker(
         ticker: str,                      # e.g. 'JPM', 'BAC', 'WFC'
         api_token: Optional[str] = None,  # per-call override (else env EODHD_API_KEY)
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Marketplace: Praams Bank Income Statement by Ticker
@@ -108,6 +107,7 @@ def register(mcp: FastMCP):
         return await _run_praams_bank_income_statement_by_ticker(
             ticker=ticker,
             api_token=api_token,
+            output=output,
         )
 
     # Optional alias for convenience/back-compat (shorter name)
@@ -115,8 +115,10 @@ def register(mcp: FastMCP):
     async def mp_praams_bank_income_statement_by_ticker(
         ticker: str,
         api_token: Optional[str] = None,
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         return await _run_praams_bank_income_statement_by_ticker(
             ticker=ticker,
             api_token=api_token,
+            output=output,
         )
@@ -1,17 +1,14 @@
 #get_mp_praams_risk_scoring_by_ticker.py
 
-import json
 from typing import Optional
 from urllib.parse import quote_plus
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
 
 def _q(key: str, val: Optional[str | int]) -> str:
     """
@@ -41,7 +38,7 @@ def _canon_ticker(v: str) -> Optional[str]:
     return s or None
 
 
-async def _run_praams_equity_by_ticker(ticker: str, api_token: Optional[str]) -> str:
+async def _run_praams_equity_by_ticker(ticker: str, api_token: Optional[str], output: Optional[str] = None) -> str:
     """
     Core runner for Praams Equity Risk & Return Scoring by ticker.
     """
@@ -65,7 +62,7 @@ async def _run_praams_equity_by_ticker(ticker: str, api_token: Optional[str]) ->
     # The Praams API wraps the payload in: {"success": ..., "item": {...}, "errors": [...]}
     # We just pretty-print whatever comes back.
     try:
-        return json.dumps(data, indent=2)
+        return to_json(data, output)
     except Exception:
         return _err("Unexpected JSON response format from API.")
 
@@ -75,6 +72,7 @@ def register(mcp: FastMCP):
     async def get_mp_praams_risk_scoring_by_ticker(
         ticker: str,                      # e.g. 'AAPL' (demo supports AAPL, TSLA, AMZN)
         api_token: Optional[str] = None,  # per-call override (else env EODHD_API_KEY)
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Marketplace: Praams Equity Risk & Return Scoring by Ticker
@@ -96,12 +94,13 @@ def register(mcp: FastMCP):
           - 100k calls / 24h, 1k requests / minute
           - Output is JSON only
         """
-        return await _run_praams_equity_by_ticker(ticker=ticker, api_token=api_token)
+        return await _run_praams_equity_by_ticker(ticker=ticker, api_token=api_token, output=output)
 
     # Optional alias for convenience/back-compat (shorter name)
     @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
     async def mp_praams_risk_scoring_by_ticker(
         ticker: str,
         api_token: Optional[str] = None,
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
-        return await _run_praams_equity_by_ticker(ticker=ticker, api_token=api_token)
+        return await _run_praams_equity_by_ticker(ticker=ticker, api_token=api_token, output=output)
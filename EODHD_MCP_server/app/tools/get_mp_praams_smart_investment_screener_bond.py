@@ -1,18 +1,14 @@
 # get_mp_praams_smart_investment_screener_bond.py
 
-import json
 from typing import Optional, Any, Tuple, Dict
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
-
 def _is_int(v: Any) -> bool:
     return isinstance(v, int) and not isinstance(v, bool)
 
@@ -329,6 +325,7 @@ async def _run_explore_bond(
     take: Optional[int],
     body: Dict[str, Any],
     api_token: Optional[str],
+    output: Optional[str] = None,
 ) -> str:
     url = "{}/mp/praams/explore/bond?1=1".format(EODHD_API_BASE)
     if skip is not None:
@@ -349,7 +346,7 @@ async def _run_explore_bond(
         return _err("No response from API.")
 
     try:
-        return json.dumps(data, indent=2)
+        return to_json(data, output)
     except Exception:
         return _err("Unexpected JSON response format from API.")
 
@@ -411,6 +408,7 @@ def register(mcp: FastMCP):
         orderBy: Optional[str] = None,
         # auth
         api_token: Optional[str] = None,
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         st_err = _validate_skip_take(skip, take)
         if st_err:
@@ -464,7 +462,7 @@ def register(mcp: FastMCP):
         if b_err:
             return _err(b_err)
 
-        return await _run_explore_bond(skip=skip, take=take, body=body, api_token=api_token)
+        return await _run_explore_bond(skip=skip, take=take, body=body, api_token=api_token, output=output)
 
     @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
     async def mp_praams_smart_screener_bond(
@@ -484,6 +482,7 @@ def register(mcp: FastMCP):
         excludeSubordinated: Optional[bool] = None,
         excludePerpetuals: Optional[bool] = None,
         api_token: Optional[str] = None,
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         st_err = _validate_skip_take(skip, take)
         if st_err:
@@ -507,4 +506,4 @@ def register(mcp: FastMCP):
         if b_err:
             return _err(b_err)
 
-        return await _run_explore_bond(skip=skip, take=take, body=body, api_token=api_token)
+        return await _run_explore_bond(skip=skip, take=take, body=body, api_token=api_token, output=output)
@@ -1,18 +1,14 @@
 # get_mp_praams_smart_investment_screener_equity.py
 
-import json
 from typing import Optional, Any, Dict, Tuple
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
-
 def _is_int(v: Any) -> bool:
     return isinstance(v, int) and not isinstance(v, bool)
 
@@ -219,6 +215,7 @@ async def _run_explore_equity(
     take: Optional[int],
     body: Dict[str, Any],
     api_token: Optional[str],
+    output: Optional[str] = None,
 ) -> str:
     url = "{}/mp/praams/explore/equity?1=1".format(EODHD_API_BASE)
     if skip is not None:
@@ -239,7 +236,7 @@ async def _run_explore_equity(
         return _err("No response from API.")
 
     try:
-        return json.dumps(data, indent=2)
+        return to_json(data, output)
     except Exception:
         return _err("Unexpected JSON response format from API.")
 
@@ -289,6 +286,7 @@ def register(mcp: FastMCP):
         orderBy: Optional[str] = None,
         # auth
         api_token: Optional[str] = None,
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Marketplace: Praams Smart Investment Screener (Equity)
@@ -352,7 +350,7 @@ def register(mcp: FastMCP):
         if b_err:
             return _err(b_err)
 
-        return await _run_explore_equity(skip=skip, take=take, body=body, api_token=api_token)
+        return await _run_explore_equity(skip=skip, take=take, body=body, api_token=api_token, output=output)
 
     # Optional alias (compact, mirrors your curl example)
     @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
@@ -366,6 +364,7 @@ def register(mcp: FastMCP):
         solvencyMin: Optional[int] = None,
         solvencyMax: Optional[int] = None,
         api_token: Optional[str] = None,
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Convenience alias for the common equity filters shown in docs/examples.
@@ -385,4 +384,4 @@ def register(mcp: FastMCP):
         if b_err:
             return _err(b_err)
 
-        return await _run_explore_equity(skip=skip, take=take, body=body, api_token=api_token)
+        return await _run_explore_equity(skip=skip, take=take, body=body, api_token=api_token, output=output)
@@ -0,0 +1,166 @@
+#get_mp_us_options_chain.py
+
+import re
+from typing import Optional, Sequence, Union
+
+from fastmcp import FastMCP
+from app.config import EODHD_API_BASE
+from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
+from app.options_chain import OPTION_TYPES, options_chains
+from mcp.types import ToolAnnotations
+
+
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+ALLOWED_TYPE = {None, "put", "call"}
+MAX_NEAREST = 50
+
+
+def _field_list(fields: Optional[Union[str, Sequence[str]]]) -> Optional[list[str]]:
+    if fields is None:
+        return None
+    parts = fields.split(",") if isinstance(fields, str) else [str(f) for f in fields if f is not None]
+    out = [p.strip() for p in parts if p and p.strip()]
+    return out or None
+
+
+async def _spot_price(underlying: str, api_token: Optional[str]) -> Optional[float]:
+    """Last (delayed) price of the underlying, for nearest_to='atm'."""
+    url = f"{EODHD_API_BASE}/real-time/{underlying}.US?fmt=json"
+    if api_token:
+        url += f"&api_token={api_token}"
+    data = await make_request(url)
+    if not isinstance(data, dict) or data.get("error"):
+        return None
+    for key in ("close", "previousClose"):
+        try:
+            return float(data.get(key))
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def register(mcp: FastMCP):
+    @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+    async def get_us_options_chain(
+        underlying_symbol: str,                      # e.g. 'AAPL', 'SPY'
+        type: Optional[str] = None,                  # 'put' | 'call' | omit for both
+        exp_date_from: Optional[str] = None,         # YYYY-MM-DD
+        exp_date_to: Optional[str] = None,           # YYYY-MM-DD
+        expiries_next: Optional[int] = None,         # only the first N matching expiries
+        strike_from: Optional[float] = None,
+        strike_to: Optional[float] = None,
+        nearest_to: Optional[Union[float, str]] = None,  # strike target, or 'atm' (live underlying price)
+        n_strikes: int = 1,                          # strikes returned per expiry/type with nearest_to
+        fields: Optional[Union[str, Sequence[str]]] = None,  # keep only these row fields
+        refresh: bool = False,                       # rebuild the in-memory chain now
+        api_token: Optional[str] = None,
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
+    ) -> str:
+        """
+        Query a cached US options chain (built from mp/unicornbay/options/eod).
+
+        The first call for an underlying fetches every live contract as of the latest
+        session (all pages, calls and puts concurrently) and indexes it in memory as sorted arrays by expiry and strike;
+        later queries that trading day are answered locally with binary search, without
+        upstream calls. The chain is rebuilt once per US trading day (or with refresh=True).
+
+        Args:
+            underlying_symbol (str): Underlying ticker, e.g. 'SPY'.
+            type (str, optional): 'call' or 'put'; both when omitted.
+            exp_date_from / exp_date_to (str, optional): Expiry window (YYYY-MM-DD, inclusive).
+            expiries_next (int, optional): Keep only the first N expiries of that window
+                (e.g. 3 = the next three expiries).
+            strike_from / strike_to (float, optional): Strike range (inclusive).
+            nearest_to (float | 'atm', optional): Return the n_strikes strikes closest to this
+                value per expiry and type; 'atm' uses the underlying's live (delayed) price
+                (one extra request). Cannot be combined with strike_from/strike_to.
+            n_strikes (int): Strikes per expiry/type for nearest_to (1..50). Default 1.
+            fields (str | list, optional): Row fields to keep (e.g. 'contract,strike,bid,ask,delta').
+            refresh (bool): Force a rebuild from the API.
+            api_token (str, optional): Per-call token override.
+
+        Notes:
+            - Building a chain costs 10 API calls per page (1000 contracts) plus one call for the
+              underlying's latest session date; queries are free.
+            - truncated=true means the upstream row cap was hit and some contracts (usually the
+              highest strikes of later expiries) are missing from the chain.
+
+        Returns:
+            str: JSON object:
+                {
+                  "underlying": "SPY", "trading_day": "2024-05-10",
+                  "source": "upstream" | "memory",
+                  "as_of": "2024-05-09",               # trade date of the rows (null if unknown)
+                  "truncated": false,
+                  "spot": 520.8,                       # only with nearest_to='atm'
+                  "count": N,
+                  "results": [{"exp_date": "...", "type": "call",
+                               "contracts": [{contract, strike, bid, ask, ...}]}]
+                }
+        """
+        if not underlying_symbol or not isinstance(underlying_symbol, str):
+            return _err("Parameter 'underlying_symbol' is required (e.g., 'SPY').")
+        underlying = underlying_symbol.strip().upper()
+        if underlying.endswith(".US"):
+            underlying = underlying[:-3]
+
+        if type not in ALLOWED_TYPE:
+            return _err("Invalid 'type'. Allowed: 'put', 'call' or omit.")
+        for name, value in (("exp_date_from", exp_date_from), ("exp_date_to", exp_date_to)):
+            if value is not None and not DATE_RE.match(value):
+                return _err(f"Parameter '{name}' must be YYYY-MM-DD when provided.")
+        if expiries_next is not None and (not isinstance(expiries_next, int) or expiries_next < 1):
+            return _err("'expiries_next' must be a positive integer.")
+        if not isinstance(n_strikes, int) or not (1 <= n_strikes <= MAX_NEAREST):
+            return _err(f"'n_strikes' must be an integer between 1 and {MAX_NEAREST}.")
+        if nearest_to is not None and (strike_from is not None or strike_to is not None):
+            return _err("Use either 'nearest_to' or 'strike_from'/'strike_to', not both.")
+
+        target: Optional[float] = None
+        if isinstance(nearest_to, str) and nearest_to.strip().lower() != "atm":
+            try:
+                target = float(nearest_to)
+            except ValueError:
+                return _err("'nearest_to' must be a number or 'atm'.")
+        elif nearest_to is not None and not isinstance(nearest_to, str):
+            target = float(nearest_to)
+
+        chain, source, error = await options_chains.get(underlying, api_token, refresh=bool(refresh))
+        if error is not None:
+            return _err(error.get("error", "Options chain request failed."))
+
+        result = {
+            "underlying": underlying,
+            "trading_day": chain.trading_day,
+            "source": source,
+            "as_of": chain.as_of,
+            "truncated": chain.truncated,
+        }
+
+        if isinstance(nearest_to, str) and target is None:
+            target = await _spot_price(underlying, api_token)
+            if target is None:
+                return _err(f"Could not get a live price for {underlying} to resolve nearest_to='atm'.")
+            result["spot"] = target
+
+        keep = _field_list(fields)
+        types = [type] if type else list(OPTION_TYPES)
+        results = []
+        count = 0
+        for exp in chain.select_expiries(exp_date_from, exp_date_to, expiries_next):
+            for typ in types:
+                side = chain.side(exp, typ)
+                if side is None:
+                    continue
+                rows = side.nearest(target, n_strikes) if target is not None else side.between(strike_from, strike_to)
+                if not rows:
+                    continue
+                if keep:
+                    rows = [{k: r.get(k) for k in keep} for r in rows]
+                results.append({"exp_date": exp, "type": typ, "contracts": rows})
+                count += len(rows)
+
+        result["count"] = count
+        result["results"] = results
+        return to_json(result, output)
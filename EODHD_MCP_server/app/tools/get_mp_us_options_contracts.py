@@ -1,21 +1,20 @@
 #get_mp_us_options_contracts.py
 
-import json
 from typing import Optional, Union, Sequence
 from urllib.parse import quote_plus
 
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
+from app.pagination import MAX_ALL_PAGES_ROWS, MAX_PAGE_OFFSET, fetch_offset_pages
 from mcp.types import ToolAnnotations
 
 
 ALLOWED_SORT = {"exp_date", "strike", "-exp_date", "-strike"}
 ALLOWED_TYPE = {None, "put", "call"}
 ALLOWED_FMT = {"json"}
-
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
+MAX_PAGE_CONCURRENCY = 16
 
 
 def _q(key: str, val: Optional[Union[str, int, float]]) -> str:
@@ -75,12 +74,23 @@ def register(mcp: FastMCP):
         fields: Optional[Union[str, Sequence[str]]] = None,  # fields[options-contracts]
         api_token: Optional[str] = None,
         fmt: Optional[str] = "json",
+        all_pages: bool = False,                     # fetch every page (from page_offset) and merge data[]
+        max_rows: int = MAX_PAGE_OFFSET,             # all_pages: cap on merged rows (1..11000)
+        max_concurrency: int = 4,                    # all_pages: concurrent page requests (1..16)
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
+        ctx: Optional[Context] = None,
     ) -> str:
         """
         Get options contracts (mp/unicornbay/options/contracts)
 
         Filters, sorting, pagination and field selection per docs.
         Returns JSON: meta, data[], links.next (pagination).
+
+        all_pages=True reads meta.total from the first page, fetches the remaining
+        offsets concurrently (max_concurrency; page_offset stays <= 10000) and returns
+        one envelope with the merged data[] (sort order kept, fields[...] applied to
+        every page). meta gains pages / returned / truncated; links.next is null.
+        Each page is a separate request (10 API calls); progress is reported per page.
         """
         # --- validate ---
         if type not in ALLOWED_TYPE:
@@ -91,6 +101,11 @@ def register(mcp: FastMCP):
             return _err("'page_offset' must be an integer between 0 and 10000.")
         if not isinstance(page_limit, int) or not (1 <= page_limit <= 1000):
             return _err("'page_limit' must be an integer between 1 and 1000.")
+        if all_pages:
+            if not isinstance(max_rows, int) or not (1 <= max_rows <= MAX_ALL_PAGES_ROWS):
+                return _err(f"'max_rows' must be an integer between 1 and {MAX_ALL_PAGES_ROWS}.")
+            if not isinstance(max_concurrency, int) or not (1 <= max_concurrency <= MAX_PAGE_CONCURRENCY):
+                return _err(f"'max_concurrency' must be an integer between 1 and {MAX_PAGE_CONCURRENCY}.")
         if fmt not in ALLOWED_FMT:
             return _err(f"Invalid 'fmt'. Allowed: {sorted(ALLOWED_FMT)}")
 
@@ -110,8 +125,6 @@ def register(mcp: FastMCP):
         base += _q("filter[strike_to]", strike_to)
         # sort & pagination
         base += _q("sort", sort)
-        base += _q("page[offset]", page_offset)
-        base += _q("page[limit]", page_limit)
         # fields
         base += _q_fields_contracts(fields)
         # token
@@ -121,15 +134,22 @@ def register(mcp: FastMCP):
         if fmt:
             base += _q("fmt", fmt)
 
-        data = await make_request(base)
+        if all_pages:
+            async def _progress(done: int, total: int) -> None:
+                if ctx is not None:
+                    await ctx.report_progress(progress=done, total=total)
+
+            data = await fetch_offset_pages(base, page_offset, page_limit, max_rows, max_concurrency, _progress)
+        else:
+            data = await make_request(base + _q("page[offset]", page_offset) + _q("page[limit]", page_limit))
 
         if data is None:
             return _err("No response from API.")
 
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
 
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
             return _err("Unexpected response format from API.")
@@ -1,18 +1,15 @@
 #get_mp_us_options_underlyings.py
 
-import json
 from typing import Optional, Union
 from urllib.parse import quote_plus
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
 def _q(key: str, val: Optional[Union[str, int]]) -> str:
     if val is None or val == "":
         return ""
@@ -25,6 +22,7 @@ def register(mcp: FastMCP):
         page_limit: Optional[int] = None,   # optional pagination (if supported server-side)
         api_token: Optional[str] = None,
         fmt: Optional[str] = "json",
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         List all underlying symbols that have options (mp/unicornbay/options/underlying-symbols)
@@ -45,8 +43,8 @@ def register(mcp: FastMCP):
         if data is None:
             return _err("No response from API.")
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
             return _err("Unexpected response format from API.")
@@ -0,0 +1,39 @@
+#get_rate_limit_stats.py
+from typing import Optional
+
+from fastmcp import FastMCP
+from app.formatting import to_json
+from app.ratelimit import CALL_COSTS, rate_limiter
+from app.retry import retry_policy
+from mcp.types import ToolAnnotations
+
+
+def register(mcp: FastMCP):
+    @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+    async def get_rate_limit_stats(
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
+    ) -> str:
+        """
+        Upstream rate-limit and API-call quota counters for this server process
+        (no upstream call).
+
+        Every upstream request is charged its EODHD call cost (technical/intraday/news/
+        screener = 5, ticks/CBOE/fundamentals/Marketplace = 10, bulk EOD = 100, live
+        quotes = 1 per ticker, others = 1) against a per-token bucket of
+        EODHD_RATE_LIMIT_PER_MINUTE calls; requests over budget queue in order rather
+        than fail. Cache hits and coalesced requests are not charged.
+
+        Returns:
+            str: JSON with the limiter settings, the cost table, and per token
+                 (hashed, never the raw key): requests, calls, calls_today,
+                 daily_remaining (vs EODHD_DAILY_LIMIT), by_endpoint call totals,
+                 queued / wait_seconds / max_wait_seconds, rejected (waited past
+                 EODHD_RATE_LIMIT_MAX_WAIT), throttled_429, bucket_available,
+                 waiting_now, and the last upstream X-RateLimit-Limit / -Remaining;
+                 plus a "retry" block (retries, recovered, exhausted, and per-host
+                 circuit_breakers with state / consecutive_failures / rejected).
+        """
+        stats = rate_limiter.stats()
+        stats["call_costs"] = dict(CALL_COSTS)
+        stats["retry"] = retry_policy.stats()
+        return to_json(stats, output)
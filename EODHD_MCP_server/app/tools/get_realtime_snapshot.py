@@ -0,0 +1,90 @@
+#get_realtime_snapshot.py
+
+import time
+from typing import List, Optional, Union
+
+from fastmcp import FastMCP
+from app.formatting import error_json as _err, to_json
+from app.realtime import FEED_ENDPOINTS, normalize_symbols, realtime_hub, websockets
+from mcp.types import ToolAnnotations
+
+
+def register(mcp: FastMCP):
+    @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+    async def get_realtime_snapshot(
+        feed: str,
+        symbols: Union[str, List[str]],
+        last_n: Optional[int] = None,         # most recent N messages per symbol (default 1)
+        since_ms: Optional[int] = None,       # messages received at/after this epoch ms
+        subscribe: bool = True,               # start (or renew) a background subscription
+        api_token: Optional[str] = None,
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
+    ) -> str:
+        """
+        Instant read of the realtime hub's per-symbol ring buffers (no capture window).
+
+        Args:
+            feed (str): One of {'us_trades','us_quotes','forex','crypto'}.
+            symbols (str | list[str]): 'AAPL,MSFT' or ['BTC-USD', 'ETH-USD'].
+            last_n (int, optional): Most recent N messages per symbol (1..EODHD_WS_BUFFER_SIZE).
+                Default 1 (latest tick) when since_ms is not given.
+            since_ms (int, optional): Only messages received at/after this epoch-millisecond
+                timestamp (server receive time). Combined with last_n, the newest last_n of those.
+            subscribe (bool): If True (default), symbols not yet streaming are subscribed and
+                kept alive for EODHD_WS_LEASE_SECONDS after the last snapshot call, so the
+                first call may return empty buffers and later calls return data immediately.
+            api_token (str, optional): WebSocket token; 'demo' supports AAPL, MSFT, TSLA, EURUSD, ETH-USD, BTC-USD.
+
+        Returns:
+            str: JSON string with
+                {
+                  "feed": ..., "endpoint": ..., "as_of": <epoch_ms>, "connected": bool,
+                  "new_subscriptions": [...],
+                  "symbols": {
+                    "AAPL": {"subscribed": true, "buffered": n, "total": N,
+                             "last_recv_ms": ..., "messages": [ {...}, ... ]}
+                  }
+                }
+        """
+        if websockets is None:
+            return _err("The 'websockets' package is required. Install with: pip install websockets")
+
+        if feed not in FEED_ENDPOINTS:
+            return _err(f"Invalid 'feed'. Allowed: {sorted(FEED_ENDPOINTS.keys())}")
+
+        sym_list = normalize_symbols(symbols)
+        if not sym_list:
+            return _err("Parameter 'symbols' is required (e.g., 'AAPL,MSFT' or ['AAPL','MSFT']).")
+
+        if last_n is not None and (not isinstance(last_n, int) or last_n < 1):
+            return _err("'last_n' must be a positive integer.")
+        if since_ms is not None and (not isinstance(since_ms, int) or since_ms < 0):
+            return _err("'since_ms' must be a non-negative epoch-millisecond integer.")
+
+        endpoint = FEED_ENDPOINTS[feed]
+        token = api_token or "demo"
+
+        new: List[str] = []
+        if subscribe:
+            try:
+                hub_feed, new = await realtime_hub.lease(endpoint, token, sym_list)
+            except ValueError as e:
+                return _err(str(e))
+        else:
+            hub_feed = realtime_hub.get(endpoint, token)
+
+        result = {
+            "feed": feed,
+            "endpoint": endpoint,
+            "as_of": int(time.time() * 1000),
+            "connected": bool(hub_feed and hub_feed.connected),
+            "new_subscriptions": new,
+            "symbols": (
+                hub_feed.snapshot(sym_list, last_n=last_n, since_ms=since_ms)
+                if hub_feed is not None
+                else {s: {"subscribed": False, "messages": []} for s in sym_list}
+            ),
+        }
+        if hub_feed is not None and hub_feed.last_error and not hub_feed.connected:
+            result["last_error"] = hub_feed.last_error
+        return to_json(result, output)
@@ -7,13 +7,10 @@ from urllib.parse import quote_plus
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
-
 def _q(key: str, val: Optional[str]) -> str:
     if val is None or val == "":
         return ""
@@ -64,6 +61,7 @@ def register(mcp: FastMCP):
         offset: int = 0,                         # 0..999
         fmt: Optional[str] = None,               # NEW: accept fmt to avoid validation errors
         api_token: Optional[str] = None,         # per-call override (else env)
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Stock Market Screener API
@@ -119,6 +117,6 @@ def register(mcp: FastMCP):
         if data is None:
             return _err("No response from API.")
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
             return _err("Unexpected JSON response format from API.")
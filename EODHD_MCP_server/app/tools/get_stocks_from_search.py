@@ -1,20 +1,17 @@
 #get_stocks_from_search.py
 
-import json
 from typing import Optional
 from urllib.parse import quote
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
 ALLOWED_TYPES = {"all", "stock", "etf", "fund", "bond", "index", "crypto"}
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
 def register(mcp: FastMCP):
     @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
     async def get_stocks_from_search(
@@ -25,6 +22,7 @@ def register(mcp: FastMCP):
         type: Optional[str] = None,              # one of ALLOWED_TYPES
         fmt: str = "json",                       # API supports json here
         api_token: Optional[str] = None,         # per-call override
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Search API for Stocks, ETFs, Mutual Funds, Bonds, and Indices.
@@ -76,9 +74,9 @@ def register(mcp: FastMCP):
         if data is None:
             return _err("No response from API.")
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
 
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
             return _err("Unexpected response format from API.")
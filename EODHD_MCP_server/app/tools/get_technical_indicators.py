@@ -1,5 +1,4 @@
 #get_technical_indicators.py
-import json
 import re
 from datetime import datetime
 from typing import Optional, Union
@@ -7,6 +6,7 @@ from typing import Optional, Union
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import LAYOUTS, csv_json, error_json as _err, to_columnar, to_json
 from mcp.types import ToolAnnotations
 
 
@@ -50,9 +50,6 @@ SPLITADJ_ONLY_SUPPORTED = {
     "sma", "ema", "wma", "volatility", "rsi", "slope", "macd",
 }
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
 def _valid_date(s: str) -> bool:
     if not isinstance(s, str) or not DATE_RE.match(s):
         return False
@@ -130,6 +127,8 @@ def register(mcp: FastMCP):
 
         # token
         api_token: Optional[str] = None,
+        layout: str = "rows",                   # 'rows' | 'columnar' (struct-of-arrays)
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Technical Indicators API (spec-aligned)
@@ -139,6 +138,7 @@ def register(mcp: FastMCP):
           - Supports all documented functions (sma, ema, wma, macd, rsi, stochastic, stochrsi, dmi/dx, adx, atr, cci, sar, beta, bbands, volatility, avgvol, avgvolccy, splitadjusted, format_amibroker).
 
         Args mirror API docs; only provided params are passed through.
+        layout='columnar' returns {"date": [...], "<value>": [...]} instead of per-row objects.
         """
         # --- Required/typed validation ---
         if not ticker or not isinstance(ticker, str):
@@ -157,6 +157,9 @@ def register(mcp: FastMCP):
         if fmt not in ALLOWED_FMT:
             return _err(f"Invalid 'fmt'. Allowed values: {sorted(ALLOWED_FMT)}")
 
+        if layout not in LAYOUTS:
+            return _err(f"Invalid 'layout'. Allowed: {sorted(LAYOUTS)}")
+
         if start_date is not None and not _valid_date(start_date):
             return _err("Parameter 'start_date' must be YYYY-MM-DD when provided.")
         if end_date is not None and not _valid_date(end_date):
@@ -269,19 +272,22 @@ def register(mcp: FastMCP):
             url += f"&api_token={api_token}"
 
         # --- Execute request ---
-        data = await make_request(url)
+        data = await make_request(url, response_type="text" if fmt == "csv" else "json")
 
         # --- Normalize/return ---
         if data is None:
             return _err("No response from API.")
 
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
+
+        if fmt == "csv":
+            return csv_json(data, output)
+
+        if layout == "columnar":
+            data = to_columnar(data)
 
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
-            if isinstance(data, str):
-                # For CSV (if make_request is updated to return text)
-                return json.dumps({"csv": data}, indent=2)
             return _err("Unexpected response format from API.")
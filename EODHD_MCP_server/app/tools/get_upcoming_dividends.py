@@ -1,19 +1,15 @@
 #get_upcoming_dividends.py
 
-import json
 from typing import Optional
 from urllib.parse import quote_plus
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
-
 def _q(key: str, val: Optional[str | int]) -> str:
     if val is None or val == "":
         return ""
@@ -31,6 +27,7 @@ def register(mcp: FastMCP):
         page_offset: Optional[int] = None,     # maps to page[offset], >=0, default 0
         fmt: str = "json",                     # API supports JSON only
         api_token: Optional[str] = None,       # per-call override; else env EODHD_API_KEY
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Historical & Upcoming Dividends API (/calendar/dividends)
@@ -83,10 +80,10 @@ def register(mcp: FastMCP):
             return _err("No response from API.")
 
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
 
         # --- Return normalized JSON string ---
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
             return _err("Unexpected JSON response format from API.")
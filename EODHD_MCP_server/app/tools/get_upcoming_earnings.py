@@ -1,19 +1,15 @@
 #get_upcoming_earnings.py
 
-import json
 from typing import Optional, Union, List
 from urllib.parse import quote_plus
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import csv_json, error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
-
 def _q(key: str, val: Optional[str]) -> str:
     if val is None or val == "":
         return ""
@@ -40,6 +36,7 @@ def register(mcp: FastMCP):
         symbols: Optional[Union[str, List[str]]] = None,  # 'AAPL.US' or ['AAPL.US','MSFT.US']
         fmt: Optional[str] = "json",              # 'json' or 'csv' (docs default csv)
         api_token: Optional[str] = None,          # per-call override
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Upcoming Earnings API (/calendar/earnings)
@@ -60,23 +57,25 @@ def register(mcp: FastMCP):
             url += _q("from", start_date)
             url += _q("to", end_date)
 
-        url += _q("fmt", (fmt or "json").lower())
+        fmt = (fmt or "json").lower()
+        url += _q("fmt", fmt)
 
         if api_token:
             url += _q("api_token", api_token)  # otherwise appended by make_request via env
 
         # Hit API
-        data = await make_request(url)
+        data = await make_request(url, response_type="text" if fmt == "csv" else "json")
 
         # Normalize output
         if data is None:
             return _err("No response from API.")
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
+
+        if fmt == "csv":
+            return csv_json(data, output)
 
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
-            if isinstance(data, str):  # e.g., CSV
-                return json.dumps({"raw": data}, indent=2)
             return _err("Unexpected response format from API.")
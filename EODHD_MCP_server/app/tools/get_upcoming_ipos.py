@@ -1,19 +1,15 @@
 #get_upcoming_ipos.py
 
-import json
 from typing import Optional
 from urllib.parse import quote_plus
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import csv_json, error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
-
 def _q(key: str, val: Optional[str]) -> str:
     if val is None or val == "":
         return ""
@@ -27,6 +23,7 @@ def register(mcp: FastMCP):
         to_date: Optional[str] = None,       # format YYYY-MM-DD (mapped to 'to')
         fmt: str = "json",                   # 'json' or 'csv' (default per API is csv; we default to json for dev-friendliness)
         api_token: Optional[str] = None,     # per-call override; otherwise env EODHD_API_KEY is used
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Upcoming IPOs API (/calendar/ipos)
@@ -39,7 +36,7 @@ def register(mcp: FastMCP):
 
         Returns:
           - JSON (stringified) when fmt='json'
-          - CSV (raw text wrapped as JSON string if the upstream returns text)
+          - {"csv": "..."} (raw CSV body) when fmt='csv'
         """
         # Normalize/validate fmt
         fmt = (fmt or "json").lower()
@@ -58,23 +55,21 @@ def register(mcp: FastMCP):
             url += _q("api_token", api_token)  # otherwise appended by make_request via env
 
         # Call
-        data = await make_request(url)
+        data = await make_request(url, response_type="text" if fmt == "csv" else "json")
 
         # Handle response
         if data is None:
             return _err("No response from API.")
+        if isinstance(data, dict) and data.get("error"):
+            return _err(data["error"])
 
-        # If fmt=csv, many clients of make_request return raw text (str)
+        # fmt=csv: raw body, no JSON parse
         if fmt == "csv":
-            if isinstance(data, str):
-                # Wrap CSV in a small envelope for consistency
-                return json.dumps({"fmt": "csv", "data": data}, indent=2)
-            # Unexpected structure
-            return _err("Unexpected CSV response format from API.")
+            return csv_json(data, output)
 
         # fmt == json
         try:
             # data should be a dict/list already; ensure string output
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
             return _err("Unexpected JSON response format from API.")
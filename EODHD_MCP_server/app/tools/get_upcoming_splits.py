@@ -1,19 +1,15 @@
 #get_upcoming_splits.py
 
-import json
 from typing import Optional
 from urllib.parse import quote_plus
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import csv_json, error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
-
 def _q(key: str, val: Optional[str]) -> str:
     if val is None or val == "":
         return ""
@@ -27,6 +23,7 @@ def register(mcp: FastMCP):
         to_date: Optional[str] = None,    # YYYY-MM-DD → maps to 'to'
         fmt: str = "json",                # 'json' or 'csv' (API default is csv)
         api_token: Optional[str] = None,  # per-call override; else env EODHD_API_KEY
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Upcoming Splits API (/calendar/splits)
@@ -39,7 +36,7 @@ def register(mcp: FastMCP):
 
         Returns:
           - JSON string when fmt='json'
-          - CSV wrapped as {"fmt":"csv","data": "..."} when fmt='csv'
+          - CSV wrapped as {"csv": "..."} when fmt='csv'
         """
         fmt = (fmt or "json").lower()
         if fmt not in ("json", "csv"):
@@ -57,18 +54,18 @@ def register(mcp: FastMCP):
             url += _q("api_token", api_token)  # otherwise appended by make_request via env
 
         # Call upstream
-        data = await make_request(url)
+        data = await make_request(url, response_type="text" if fmt == "csv" else "json")
         if data is None:
             return _err("No response from API.")
+        if isinstance(data, dict) and data.get("error"):
+            return _err(data["error"])
 
         # Format handling
         if fmt == "csv":
-            if isinstance(data, str):
-                return json.dumps({"fmt": "csv", "data": data}, indent=2)
-            return _err("Unexpected CSV response format from API.")
+            return csv_json(data, output)
 
         # fmt == json
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
             return _err("Unexpected JSON response format from API.")
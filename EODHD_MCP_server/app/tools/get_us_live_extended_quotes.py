@@ -1,11 +1,12 @@
 #get_us_live_extended_quotes.py
 
-import json
 from typing import Iterable, Optional, Sequence, Union
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.concurrency import chunked, gather_bounded
+from app.formatting import csv_json, error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
@@ -13,9 +14,10 @@ ALLOWED_FMT = {"json", "csv"}
 MAX_PAGE_LIMIT = 100  # per spec
 DEFAULT_FMT = "json"
 
-
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
+# batch=True: symbols per shard request (one full page each) and concurrent shards
+BATCH_GROUP_SIZE = MAX_PAGE_LIMIT
+DEFAULT_BATCH_CONCURRENCY = 8
+MAX_BATCH_CONCURRENCY = 32
 
 
 def _normalize_symbols(symbols: Optional[Union[str, Iterable[str]]]) -> list[str]:
@@ -48,6 +50,43 @@ def _normalize_symbols(symbols: Optional[Union[str, Iterable[str]]]) -> list[str
     return out
 
 
+async def _batch_quotes(symbols: list[str], api_token: Optional[str], concurrency: int) -> dict:
+    """Fetch extended quotes in one-page groups concurrently and merge them by symbol."""
+    groups = chunked(symbols, BATCH_GROUP_SIZE)
+
+    async def _fetch(group):
+        url = (f"{EODHD_API_BASE}/us-quote-delayed?s={','.join(group)}&fmt=json"
+               f"&page[limit]={len(group)}")
+        if api_token:
+            url += f"&api_token={api_token}"
+        return await make_request(url)
+
+    results = await gather_bounded([_fetch(g) for g in groups], concurrency)
+
+    data: dict = {}
+    errors: dict = {}
+    for group, res in zip(groups, results):
+        if not isinstance(res, dict) or res.get("error"):
+            msg = res["error"] if isinstance(res, dict) else "Unexpected response from API."
+            errors.update({s: msg for s in group})
+            continue
+        quotes = res.get("data", res)
+        if isinstance(quotes, list):
+            quotes = {(q.get("symbol") or q.get("code") or str(i)): q for i, q in enumerate(quotes) if isinstance(q, dict)}
+        if isinstance(quotes, dict):
+            data.update(quotes)
+
+    returned = {k.upper() for k in data}
+    for s in symbols:
+        if s.upper() not in returned and s not in errors:
+            errors[s] = "No quote returned."
+
+    out = {"count": len(data), "requests": len(groups), "data": data}
+    if errors:
+        out["errors"] = errors
+    return out
+
+
 def register(mcp: FastMCP):
     @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
     async def get_us_live_extended_quotes(
@@ -56,6 +95,9 @@ def register(mcp: FastMCP):
         page_limit: Optional[int] = None,     # page[limit] (max 100)
         page_offset: Optional[int] = None,    # page[offset] (>= 0)
         api_token: Optional[str] = None,      # per-call override
+        batch: bool = False,                  # shard long symbol lists into concurrent requests
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         Live v2 for US Stocks: Extended Quotes (Delayed, exchange-compliant)
@@ -71,10 +113,15 @@ def register(mcp: FastMCP):
           page_limit: Optional page size; max 100.
           page_offset: Optional offset for pagination; must be >= 0.
           api_token: Optional token; if omitted, env is used via make_request().
+          batch: If True, the symbols are split into groups of 100 (one full page each),
+                 fetched concurrently under the rate limiter and merged into
+                 {"count", "requests", "data": {symbol: quote}, "errors": {symbol: msg}}.
+                 Requires fmt='json'; page_limit/page_offset are not used. Default False.
+          max_concurrency: Concurrent group requests when batch is used (1..32). Default 8.
 
         Returns:
           Pretty-printed JSON string on success, or {"error": "..."} on failure.
-          If fmt='csv' and your make_request() returns raw text, it's wrapped as {"csv": "..."}.
+          If fmt='csv', the raw CSV body is wrapped as {"csv": "..."}.
         """
         # --- Validate inputs ---
         syms = _normalize_symbols(symbols)
@@ -93,6 +140,15 @@ def register(mcp: FastMCP):
             if not isinstance(page_offset, int) or page_offset < 0:
                 return _err("'page_offset' must be an integer >= 0.")
 
+        if batch:
+            if fmt != "json":
+                return _err("'batch' requires fmt='json'.")
+            if page_limit is not None or page_offset is not None:
+                return _err("'page_limit'/'page_offset' cannot be combined with batch=True.")
+            if not isinstance(max_concurrency, int) or not (1 <= max_concurrency <= MAX_BATCH_CONCURRENCY):
+                return _err(f"'max_concurrency' must be an integer between 1 and {MAX_BATCH_CONCURRENCY}.")
+            return to_json(await _batch_quotes(syms, api_token, max_concurrency), output)
+
         # --- Build URL ---
         # Example:
         #   /api/us-quote-delayed?s=AAPL.US,TSLA.US&fmt=json&page[limit]=100&page[offset]=0
@@ -109,19 +165,19 @@ def register(mcp: FastMCP):
         url = f"{base}{query}"
 
         # --- Request ---
-        data = await make_request(url)
+        data = await make_request(url, response_type="text" if fmt == "csv" else "json")
 
         # --- Normalize / return ---
         if data is None:
             return _err("No response from API.")
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
+
+        if fmt == "csv":
+            return csv_json(data, output)
 
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
-            # If make_request() was adapted to return raw text for CSV:
-            if isinstance(data, str):
-                return json.dumps({"csv": data}, indent=2)
             return _err("Unexpected response format from API.")
 
@@ -1,18 +1,15 @@
 #get_us_tick_data.py
-import json
 from typing import Optional, Union
 
 from fastmcp import FastMCP
 from app.config import EODHD_API_BASE
 from app.api_client import make_request
+from app.formatting import csv_json, error_json as _err, to_json
 from mcp.types import ToolAnnotations
 
 
 ALLOWED_FMT = {"json", "csv"}
 
-def _err(msg: str) -> str:
-    return json.dumps({"error": msg}, indent=2)
-
 def _to_int(name: str, v: Union[int, str, None]) -> Optional[int]:
     if v is None:
         return None
@@ -31,6 +28,7 @@ def register(mcp: FastMCP):
         limit: int = 1000,                   # max number of ticks returned
         fmt: str = "json",                   # 'json' | 'csv'
         api_token: Optional[str] = None,     # per-call override
+        output: Optional[str] = None,  # 'pretty' | 'compact' (default: server output mode)
     ) -> str:
         """
         US Stock Market Tick Data API (GET /api/ticks)
@@ -88,18 +86,18 @@ def register(mcp: FastMCP):
             url += f"&api_token={api_token}"  # otherwise make_request appends env token
 
         # --- Request ---
-        data = await make_request(url)
+        data = await make_request(url, response_type="text" if fmt == "csv" else "json")
 
         # --- Normalize / return ---
         if data is None:
             return _err("No response from API.")
         if isinstance(data, dict) and data.get("error"):
-            return json.dumps({"error": data["error"]}, indent=2)
+            return _err(data["error"])
+
+        if fmt == "csv":
+            return csv_json(data, output)
 
-        # For CSV, make_request may return text; wrap if needed. JSON is passed through.
         try:
-            return json.dumps(data, indent=2)
+            return to_json(data, output)
         except Exception:
-            if isinstance(data, str):
-                return json.dumps({"csv": data}, indent=2)
             return _err("Unexpected response format from API.")
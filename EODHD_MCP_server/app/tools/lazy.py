@@ -0,0 +1,151 @@
+# app/tools/lazy.py
+#
+# Lazy tool registration: tool schemas come from a prebuilt manifest
+# (tool_manifest.json) and the implementing module is imported on first call.
+#
+#   Rebuild the manifest after changing any tool signature or docstring:
+#       python -m app.tools.lazy --build
+#
+# Modules whose source no longer matches the manifest hash are registered eagerly.
+
+import argparse
+import hashlib
+import importlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastmcp.tools import FunctionTool, Tool, ToolResult
+from mcp.types import ToolAnnotations
+
+logger = logging.getLogger("eodhd-mcp.tools")
+
+TOOLS_DIR = Path(__file__).resolve().parent
+MANIFEST_PATH = TOOLS_DIR / "tool_manifest.json"
+MANIFEST_VERSION = 1
+
+# Tool fields stored in the manifest (everything needed for tools/list)
+_TOOL_FIELDS = ("name", "title", "description", "parameters", "output_schema", "annotations")
+
+
+class _Capture:
+    """Stand-in for FastMCP passed to a module's register(): collects its tools."""
+
+    def __init__(self) -> None:
+        self.tools: List[FunctionTool] = []
+
+    def tool(self, *args: Any, **kwargs: Any):
+        def deco(fn):
+            self.tools.append(FunctionTool.from_function(fn, **kwargs))
+            return fn
+
+        if args and callable(args[0]):
+            return deco(args[0])
+        return deco
+
+
+def _module_tools(module_name: str) -> List[FunctionTool]:
+    mod = importlib.import_module(f"{__package__}.{module_name}")
+    capture = _Capture()
+    mod.register(capture)
+    return capture.tools
+
+
+def _source_hash(module_name: str) -> Optional[str]:
+    try:
+        return hashlib.sha256((TOOLS_DIR / f"{module_name}.py").read_bytes()).hexdigest()[:16]
+    except OSError:
+        return None
+
+
+_resolved: Dict[str, FunctionTool] = {}
+
+
+class LazyTool(Tool):
+    """Tool advertised from the manifest; imports its module on the first call."""
+
+    module: str
+
+    async def run(self, arguments: Dict[str, Any]) -> ToolResult:
+        real = _resolved.get(self.name)
+        if real is None:
+            for t in _module_tools(self.module):
+                _resolved[t.name] = t
+            real = _resolved.get(self.name)
+            if real is None:
+                raise RuntimeError(f"Module '{self.module}' no longer provides tool '{self.name}'")
+            logger.debug("Lazily imported tool module %s", self.module)
+        return await real.run(arguments)
+
+
+def build_manifest(module_names: Iterable[str], path: Path = MANIFEST_PATH) -> dict:
+    """Import every tool module once and write the schemas the lazy mode advertises."""
+    modules: Dict[str, Any] = {}
+    for name in module_names:
+        try:
+            tools = _module_tools(name)
+        except Exception as e:
+            logger.error("Manifest: skipping '%s': %s: %s", name, type(e).__name__, e)
+            continue
+        modules[name] = {
+            "sha256": _source_hash(name),
+            "tools": [t.model_dump(mode="json", include=set(_TOOL_FIELDS), exclude_none=True) for t in tools],
+        }
+    manifest = {"version": MANIFEST_VERSION, "modules": modules}
+    path.write_text(json.dumps(manifest, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+    return manifest
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> Optional[dict]:
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+def register_lazy(mcp, module_names: Iterable[str], eager) -> None:
+    """
+    Register tools from the manifest without importing their modules; modules that
+    are missing from it or changed since it was built go through `eager(mcp, name)`.
+    """
+    manifest = load_manifest()
+    modules = (manifest or {}).get("modules", {})
+    if manifest is None:
+        logger.warning("No usable tool manifest at %s; registering eagerly "
+                       "(build it with: python -m app.tools.lazy --build)", MANIFEST_PATH)
+
+    lazy = 0
+    for name in module_names:
+        entry = modules.get(name)
+        if entry is None or entry.get("sha256") != _source_hash(name):
+            if manifest is not None:
+                logger.info("Tool manifest is stale for '%s'; importing it now", name)
+            eager(mcp, name)
+            continue
+        for spec in entry["tools"]:
+            fields = dict(spec)
+            if fields.get("annotations") is not None:
+                fields["annotations"] = ToolAnnotations(**fields["annotations"])
+            mcp.add_tool(LazyTool(module=name, **fields))
+            lazy += 1
+    logger.info("Registered %d tools lazily from %s", lazy, MANIFEST_PATH.name)
+
+
+def main() -> None:
+    from app.tools import ALL_TOOLS, _dedupe
+
+    parser = argparse.ArgumentParser(description="Build the lazy tool-registration manifest")
+    parser.add_argument("--build", action="store_true", help=f"Write {MANIFEST_PATH.name}")
+    args = parser.parse_args()
+    if not args.build:
+        parser.print_help()
+        return
+    manifest = build_manifest(_dedupe(ALL_TOOLS))
+    count = sum(len(m["tools"]) for m in manifest["modules"].values())
+    print(f"Wrote {count} tools from {len(manifest['modules'])} modules to {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
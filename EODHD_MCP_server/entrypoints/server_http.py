@@ -11,12 +11,17 @@ if str(ROOT) not in sys.path:
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 from app.tools import register_all
+from app.api_client import http_client_lifespan
+from app.config import EODHD_METRICS_PATH
+from app.metrics import install as install_metrics
 
 load_dotenv()
 
 def main() -> None:
-    mcp = FastMCP("eodhd-datasets")
+    mcp = FastMCP("eodhd-datasets", lifespan=http_client_lifespan)
     register_all(mcp)
+    if EODHD_METRICS_PATH:
+        install_metrics(mcp, EODHD_METRICS_PATH)
 
     logging.basicConfig(
         level=logging.INFO,
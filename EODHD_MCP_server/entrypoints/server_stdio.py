@@ -18,13 +18,23 @@ load_dotenv()  # Load .env first; CLI can override via env below.
 def main() -> None:
     parser = argparse.ArgumentParser(description="EODHD MCP stdio server")
     parser.add_argument("--apikey", "--api-key", dest="api_key", help="EODHD API key")
+    parser.add_argument("--output-mode", choices=["pretty", "compact"], help="Tool output JSON layout")
+    parser.add_argument("--lazy-tools", action="store_true",
+                        help="Register tools from the prebuilt manifest; import modules on first call")
     args = parser.parse_args()
 
     # If provided, override env so make_request() picks it up
     if args.api_key:
         os.environ["EODHD_API_KEY"] = args.api_key
+    if args.output_mode:
+        os.environ["EODHD_OUTPUT_MODE"] = args.output_mode
+    if args.lazy_tools:
+        os.environ["EODHD_LAZY_TOOLS"] = "1"
 
-    mcp = FastMCP("eodhd-datasets")
+    # Imported after env overrides so app.config sees them
+    from app.api_client import http_client_lifespan
+
+    mcp = FastMCP("eodhd-datasets", lifespan=http_client_lifespan)
     register_all(mcp)
 
     logging.basicConfig(
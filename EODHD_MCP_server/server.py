@@ -59,6 +59,42 @@ def build_parser() -> argparse.ArgumentParser:
         help="EODHD API key",
     )
 
+    # Upstream connection pool (shared httpx client, opened/closed with the server lifespan)
+    p.add_argument(
+        "--max-connections",
+        type=int,
+        default=None,
+        help="Max pooled upstream connections (default: 100 or $EODHD_HTTP_MAX_CONNECTIONS).",
+    )
+    p.add_argument(
+        "--max-keepalive",
+        type=int,
+        default=None,
+        help="Max idle keep-alive connections (default: 20 or $EODHD_HTTP_MAX_KEEPALIVE).",
+    )
+    p.add_argument(
+        "--http2",
+        action="store_true",
+        help="Enable HTTP/2 to upstream (requires 'h2'; or set $EODHD_HTTP2=1).",
+    )
+
+    p.add_argument(
+        "--output-mode",
+        choices=["pretty", "compact"],
+        default=None,
+        help="Tool output JSON layout (default: pretty or $EODHD_OUTPUT_MODE). Tools accept a per-call 'output' override.",
+    )
+    p.add_argument(
+        "--metrics-path",
+        default=None,
+        help="Prometheus metrics route for HTTP/SSE (default: /metrics or $EODHD_METRICS_PATH; '' disables).",
+    )
+    p.add_argument(
+        "--lazy-tools",
+        action="store_true",
+        help="Register tools from app/tools/tool_manifest.json and import each module on first call (or set $EODHD_LAZY_TOOLS=1).",
+    )
+
     return p
 
 
@@ -71,6 +107,18 @@ def main(argv: list[str] | None = None) -> int:
     # If provided, override env so make_request() picks it up
     if args.api_key:
         os.environ["EODHD_API_KEY"] = args.api_key
+    if args.max_connections is not None:
+        os.environ["EODHD_HTTP_MAX_CONNECTIONS"] = str(args.max_connections)
+    if args.max_keepalive is not None:
+        os.environ["EODHD_HTTP_MAX_KEEPALIVE"] = str(args.max_keepalive)
+    if args.http2:
+        os.environ["EODHD_HTTP2"] = "1"
+    if args.output_mode:
+        os.environ["EODHD_OUTPUT_MODE"] = args.output_mode
+    if args.lazy_tools:
+        os.environ["EODHD_LAZY_TOOLS"] = "1"
+    if args.metrics_path is not None:
+        os.environ["EODHD_METRICS_PATH"] = args.metrics_path
 
     if unknown:
         # Don’t print secrets; just show shapes
@@ -83,7 +131,10 @@ def main(argv: list[str] | None = None) -> int:
     )
     logger = logging.getLogger("eodhd-mcp")
 
-    mcp = FastMCP("eodhd-datasets")
+    # Imported after env overrides so app.config sees CLI values
+    from app.api_client import http_client_lifespan
+
+    mcp = FastMCP("eodhd-datasets", lifespan=http_client_lifespan)
     register_all(mcp)
 
     # Determine transport:
@@ -94,6 +145,15 @@ def main(argv: list[str] | None = None) -> int:
     run_sse = args.sse
     run_http = args.http or not (args.stdio or args.sse)
 
+    if not run_stdio:
+        from app.config import EODHD_METRICS_PATH
+
+        if EODHD_METRICS_PATH:
+            from app.metrics import install as install_metrics
+
+            install_metrics(mcp, EODHD_METRICS_PATH)
+            logger.info("Metrics at http://%s:%s%s", args.host, args.port, EODHD_METRICS_PATH)
+
     try:
         if run_stdio:
             logger.info("Starting EODHD MCP (STDIO)...")
@@ -114,9 +114,245 @@ def register(add_test, COMMON):
         },
     })
 
+    # --- Response cache: second identical call should be a hit ---
+    add_test({
+        "name": "Exchanges list (warms cache)",
+        "tool": "get_exchanges_list",
+        "use_common": ["api_token"],
+        "params": {},
+    })
+    add_test({
+        "name": "Exchanges list (served from cache)",
+        "tool": "get_exchanges_list",
+        "use_common": ["api_token"],
+        "params": {},
+    })
+    add_test({
+        "name": "Cache stats",
+        "tool": "get_cache_stats",
+        "params": {},
+    })
+
+    # --- Intraday: auto-chunked multi-year 5m range (> 600-day max) ---
+    add_test({
+        "name": "Intraday: 5m 3-year range (auto_chunk)",
+        "tool": "get_intraday_historical_data",
+        "use_common": ["fmt", "api_token", "ticker"],
+        "params": {
+            "interval": "5m",
+            "from_timestamp": "2020-01-01",
+            "to_timestamp": "2022-12-31",
+            "auto_chunk": True,
+            "max_concurrency": 3,
+        },
+    })
+
+    # --- Compact output (per-call override) ---
+    add_test({
+        "name": "EOD: compact output",
+        "tool": "get_historical_stock_prices",
+        "use_common": ["api_token", "ticker", "start_date", "end_date"],
+        "params": {"output": "compact"},
+    })
+
+    # --- Columnar layout for time-series tools ---
+    add_test({
+        "name": "EOD: columnar layout",
+        "tool": "get_historical_stock_prices",
+        "use_common": ["api_token", "ticker", "start_date", "end_date"],
+        "params": {"layout": "columnar"},
+    })
+    add_test({
+        "name": "Technical: SMA columnar layout",
+        "tool": "get_technical_indicators",
+        "use_common": ["api_token", "ticker", "start_date", "end_date"],
+        "params": {"function": "sma", "period": 20, "layout": "columnar"},
+    })
+
+    # --- Raw CSV passthrough (fmt=csv, wrapped as {"csv": "..."}) ---
+    add_test({
+        "name": "EOD: fmt=csv passthrough",
+        "tool": "get_historical_stock_prices",
+        "use_common": ["api_token", "ticker", "start_date", "end_date"],
+        "params": {"fmt": "csv"},
+    })
+    add_test({
+        "name": "Upcoming splits: fmt=csv passthrough",
+        "tool": "get_upcoming_splits",
+        "use_common": ["api_token"],
+        "params": {"fmt": "csv"},
+    })
+
+    # --- Local indicator engine (one EOD fetch, many indicators) ---
+    add_test({
+        "name": "Local indicators: multi-ticker, multi-indicator",
+        "tool": "compute_technical_indicators",
+        "use_common": ["api_token", "start_date", "end_date"],
+        "params": {
+            "tickers": ["AAPL.US", "MSFT.US"],
+            "indicators": "sma:50,ema:20,rsi:14,macd:12:26:9,bbands:20,atr:14",
+        },
+    })
+
+    # --- Realtime snapshot from the shared hub (first call subscribes, second reads) ---
+    add_test({
+        "name": "WS snapshot: Crypto subscribe",
+        "tool": "get_realtime_snapshot",
+        "use_common": ["api_token"],
+        "params": {"feed": "crypto", "symbols": ["ETH-USD", "BTC-USD"]},
+    })
+    add_test({
+        "name": "WS snapshot: Crypto last 5",
+        "tool": "get_realtime_snapshot",
+        "use_common": ["api_token"],
+        "params": {"feed": "crypto", "symbols": ["ETH-USD", "BTC-USD"], "last_n": 5},
+    })
+
+    # --- Realtime capture: streamed batches and tick aggregation ---
+    add_test({
+        "name": "WS capture: Crypto 1s OHLCV bars",
+        "tool": "capture_realtime_ws",
+        "use_common": ["api_token"],
+        "params": {"feed": "crypto", "symbols": ["ETH-USD", "BTC-USD"], "duration_seconds": 5,
+                   "mode": "aggregate", "bar_seconds": 1},
+    })
+    add_test({
+        "name": "WS capture: Crypto streamed batches",
+        "tool": "capture_realtime_ws",
+        "use_common": ["api_token"],
+        "params": {"feed": "crypto", "symbols": ["BTC-USD"], "duration_seconds": 5,
+                   "stream": True, "batch_seconds": 1.0},
+    })
+
+    # --- Rate limiter / quota counters (local, no upstream call) ---
+    add_test({
+        "name": "Rate limit stats",
+        "tool": "get_rate_limit_stats",
+        "params": {},
+    })
+
+    # --- Bulk last-day EOD (one request per exchange, then served from memory) ---
+    add_test({
+        "name": "Bulk EOD last day: US filtered",
+        "tool": "get_bulk_eod_last_day",
+        "use_common": ["api_token"],
+        "params": {"exchange": "US", "symbols": ["AAPL", "MSFT.US", "TSLA"]},
+    })
+    add_test({
+        "name": "Bulk EOD last day: US from memory",
+        "tool": "get_bulk_eod_last_day",
+        "use_common": ["api_token"],
+        "params": {"exchange": "US", "symbols": "NVDA,AMZN"},
+    })
 
+    # --- Live quotes: batch mode beyond the 20-symbol s= limit ---
+    add_test({
+        "name": "Live price: batch of 45 symbols",
+        "tool": "get_live_price_data",
+        "use_common": ["api_token"],
+        "params": {
+            "ticker": "AAPL.US",
+            "additional_symbols": [
+                "MSFT.US", "GOOGL.US", "AMZN.US", "META.US", "NVDA.US", "TSLA.US", "JPM.US", "V.US",
+                "MA.US", "UNH.US", "HD.US", "PG.US", "JNJ.US", "XOM.US", "CVX.US", "KO.US", "PEP.US",
+                "WMT.US", "COST.US", "DIS.US", "NFLX.US", "ADBE.US", "CRM.US", "ORCL.US", "INTC.US",
+                "AMD.US", "QCOM.US", "TXN.US", "AVGO.US", "CSCO.US", "IBM.US", "BA.US", "CAT.US",
+                "GE.US", "MMM.US", "NKE.US", "MCD.US", "SBUX.US", "T.US", "VZ.US", "PFE.US",
+                "MRK.US", "ABBV.US", "LLY.US",
+            ],
+            "batch": True,
+        },
+    })
+    add_test({
+        "name": "US extended quotes: batch",
+        "tool": "get_us_live_extended_quotes",
+        "use_common": ["api_token"],
+        "params": {"symbols": "AAPL.US,MSFT.US,TSLA.US,NVDA.US", "batch": True},
+    })
 
+    # --- Options: all_pages (concurrent offset pages merged into one data[]) ---
+    add_test({
+        "name": "Options contracts: all pages, capped",
+        "tool": "get_us_options_contracts",
+        "use_common": ["api_token"],
+        "params": {"underlying_symbol": "AAPL", "all_pages": True, "max_rows": 3000,
+                   "fields": "contract,exp_date,strike,type"},
+    })
+    add_test({
+        "name": "Options EOD: all pages, compact",
+        "tool": "get_us_options_eod",
+        "use_common": ["api_token"],
+        "params": {"underlying_symbol": "AAPL", "all_pages": True, "compact": True, "max_rows": 2000},
+    })
 
+    # --- Options chain cache (first call builds, second is answered locally) ---
+    add_test({
+        "name": "Options chain: ATM calls, next 3 expiries",
+        "tool": "get_us_options_chain",
+        "use_common": ["api_token"],
+        "params": {"underlying_symbol": "AAPL", "type": "call", "nearest_to": "atm", "expiries_next": 3,
+                   "fields": "contract,exp_date,strike,bid,ask,delta"},
+    })
+    add_test({
+        "name": "Options chain: puts in strike range",
+        "tool": "get_us_options_chain",
+        "use_common": ["api_token"],
+        "params": {"underlying_symbol": "AAPL", "type": "put", "strike_from": 150, "strike_to": 170,
+                   "expiries_next": 2},
+    })
 
+    # --- Bar store (with EODHD_BAR_STORE_PATH set the second call of each pair is read from disk) ---
+    add_test({
+        "name": "Bar store: EOD 2023 (fills store)",
+        "tool": "get_historical_stock_prices",
+        "use_common": ["api_token"],
+        "params": {"ticker": "MSFT.US", "start_date": "2023-01-01", "end_date": "2023-12-31"},
+    })
+    add_test({
+        "name": "Bar store: EOD Q2 2023 descending (stored range)",
+        "tool": "get_historical_stock_prices",
+        "use_common": ["api_token"],
+        "params": {"ticker": "MSFT.US", "start_date": "2023-04-01", "end_date": "2023-06-30", "order": "d"},
+    })
+    add_test({
+        "name": "Bar store: intraday 1h week (fills store)",
+        "tool": "get_intraday_historical_data",
+        "use_common": ["api_token"],
+        "params": {"ticker": "MSFT.US", "interval": "1h", "from_timestamp": "2024-03-04", "to_timestamp": "2024-03-09"},
+    })
+    add_test({
+        "name": "Bar store: intraday 1h same week again",
+        "tool": "get_intraday_historical_data",
+        "use_common": ["api_token"],
+        "params": {"ticker": "MSFT.US", "interval": "1h", "from_timestamp": "2024-03-04", "to_timestamp": "2024-03-09"},
+    })
 
+    # --- Incremental sync (second call fetches only from the last closed bar) ---
+    add_test({
+        "name": "EOD sync: initial full fetch",
+        "tool": "get_historical_stock_prices",
+        "use_common": ["api_token"],
+        "params": {"ticker": "AAPL.US", "start_date": "2022-01-01", "sync": True},
+    })
+    add_test({
+        "name": "EOD sync: incremental refresh",
+        "tool": "get_historical_stock_prices",
+        "use_common": ["api_token"],
+        "params": {"ticker": "AAPL.US", "start_date": "2022-01-01", "sync": True, "order": "d"},
+    })
 
+    # --- Batch EOD (concurrent per-ticker fetches, per-ticker errors) ---
+    add_test({
+        "name": "EOD batch: 5 tickers, close only",
+        "tool": "get_historical_stock_prices_batch",
+        "use_common": ["api_token"],
+        "params": {"tickers": "AAPL.US,MSFT.US,NVDA.US,INVALID.US,BMW.XETRA", "start_date": "2024-01-01",
+                   "end_date": "2024-03-31", "fields": "close", "max_concurrency": 4},
+    })
+    add_test({
+        "name": "EOD batch: aligned (union) across exchanges",
+        "tool": "get_historical_stock_prices_batch",
+        "use_common": ["api_token"],
+        "params": {"tickers": ["AAPL.US", "BMW.XETRA", "VOD.LSE"], "start_date": "2024-12-16",
+                   "end_date": "2024-12-31", "fields": "adjusted_close", "align": "union"},
+    })
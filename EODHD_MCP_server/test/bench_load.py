@@ -0,0 +1,267 @@
+# bench_load.py
+#
+# Load / latency benchmark against the offline mock upstream (test/mock_upstream.py).
+#
+#   python test/bench_load.py                                   # http, 1/8/32 clients
+#   python test/bench_load.py --transports stdio,sse,http --clients 1,16 --calls 50
+#   python test/bench_load.py --latency-ms 40 --jitter-ms 20 --error-rate 0.02 --json out.json
+#   python test/bench_load.py --baseline out.json --tolerance 0.25   # exit 1 on regression
+#
+# Starts the mock upstream and (for sse/http) one MCP server with EODHD_API_BASE pointed at
+# it, then runs N concurrent MCP clients, each making --calls tool calls round-robin over
+# SCENARIO. stdio clients each spawn their own server process, as desktop clients do.
+# Clients connect and make one untimed warm-up pass first; timing starts once all are ready.
+# The response cache is off (--cache turns it on) so every call reaches the upstream path.
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastmcp import Client
+from fastmcp.client.transports import PythonStdioTransport
+
+TICKERS = ["AAPL.US", "MSFT.US", "NVDA.US", "AMZN.US", "GOOGL.US", "META.US", "TSLA.US", "JPM.US"]
+
+# (tool, args); "{t}" is replaced by a ticker that rotates per client and call, so
+# concurrent clients don't all coalesce onto one upstream request.
+SCENARIO: List[Tuple[str, Dict[str, Any]]] = [
+    ("get_historical_stock_prices", {"ticker": "{t}", "start_date": "2020-01-01", "end_date": "2024-12-31"}),
+    ("get_intraday_historical_data", {"ticker": "{t}", "interval": "5m",
+                                      "from_timestamp": 1704067200, "to_timestamp": 1704672000}),
+    ("get_live_price_data", {"ticker": "{t}"}),
+    ("get_company_news", {"ticker": "{t}", "limit": 20}),
+    ("get_technical_indicators", {"ticker": "{t}", "function": "sma", "period": 50,
+                                  "start_date": "2023-01-01", "end_date": "2023-12-31"}),
+    ("get_stocks_from_search", {"query": "apple"}),
+    ("get_us_options_eod", {"underlying_symbol": "AAPL", "page_limit": 200}),
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_port(port: int, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"process exited with {proc.returncode} before listening on {port}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"nothing listening on port {port} after {timeout:.0f}s")
+
+
+def _server_env(api_base: str, cache: bool) -> Dict[str, str]:
+    return {
+        **os.environ,
+        "EODHD_API_BASE": api_base,
+        "EODHD_API_KEY": "bench",
+        "EODHD_CACHE_ENABLED": "1" if cache else "0",
+        "EODHD_RATE_LIMIT_ENABLED": "0",
+        "EODHD_CACHE_DIR": "",
+        "LOG_LEVEL": "WARNING",
+    }
+
+
+def percentile(sorted_ms: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_ms:
+        return float("nan")
+    k = max(0, min(len(sorted_ms) - 1, math.ceil(p / 100.0 * len(sorted_ms)) - 1))
+    return sorted_ms[k]
+
+
+def _call_args(args: Dict[str, Any], ticker: str) -> Dict[str, Any]:
+    return {k: (ticker if v == "{t}" else v) for k, v in args.items()}
+
+
+def _is_error(result) -> bool:
+    if result.is_error:
+        return True
+    try:
+        body = json.loads(result.content[0].text)
+    except (IndexError, AttributeError, ValueError):
+        return False
+    return isinstance(body, dict) and "error" in body
+
+
+async def _client_loop(client_id: int, transport, calls: int, warmup: bool, ready: "asyncio.Barrier",
+                       samples: Dict[str, List[float]], errors: Dict[str, int]) -> None:
+    async with Client(transport, timeout=120) as client:
+        if warmup:
+            for tool, args in SCENARIO:
+                await client.call_tool(tool, _call_args(args, TICKERS[0]), raise_on_error=False)
+        await ready.wait()
+        for i in range(calls):
+            tool, args = SCENARIO[(client_id + i) % len(SCENARIO)]
+            ticker = TICKERS[(client_id * 7 + i) % len(TICKERS)]
+            started = time.perf_counter()
+            try:
+                result = await client.call_tool(tool, _call_args(args, ticker), raise_on_error=False)
+                failed = _is_error(result)
+            except Exception:
+                failed = True
+            samples.setdefault(tool, []).append((time.perf_counter() - started) * 1000)
+            if failed:
+                errors[tool] = errors.get(tool, 0) + 1
+
+
+async def run_level(transport_name: str, n_clients: int, calls: int, url: str, env: Dict[str, str],
+                    warmup: bool = True) -> dict:
+    samples: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    if transport_name == "stdio":
+        transports = [
+            PythonStdioTransport(str(ROOT / "entrypoints" / "server_stdio.py"), env=env, cwd=str(ROOT),
+                                 python_cmd=sys.executable, keep_alive=False, log_file=Path(os.devnull))
+            for _ in range(n_clients)
+        ]
+    else:
+        transports = [url] * n_clients
+
+    ready = asyncio.Barrier(n_clients + 1)
+    loops = asyncio.gather(*(_client_loop(i, t, calls, warmup, ready, samples, errors)
+                             for i, t in enumerate(transports)))
+    start_line = asyncio.ensure_future(ready.wait())
+    await asyncio.wait([loops, start_line], return_when=asyncio.FIRST_COMPLETED)
+    if not start_line.done():  # a client failed before the start line
+        start_line.cancel()
+        await loops
+    started = time.perf_counter()
+    await loops
+    wall = time.perf_counter() - started
+
+    tools = {}
+    for tool, ms in samples.items():
+        ms.sort()
+        tools[tool] = {
+            "calls": len(ms), "errors": errors.get(tool, 0),
+            "p50_ms": round(percentile(ms, 50), 2), "p95_ms": round(percentile(ms, 95), 2),
+            "p99_ms": round(percentile(ms, 99), 2), "mean_ms": round(statistics.fmean(ms), 2),
+        }
+    total = sum(len(ms) for ms in samples.values())
+    return {
+        "transport": transport_name, "clients": n_clients, "calls": total,
+        "errors": sum(errors.values()), "wall_seconds": round(wall, 3),
+        "throughput_per_s": round(total / wall, 2) if wall else None, "tools": tools,
+    }
+
+
+def _print_level(level: dict) -> None:
+    print(f"\n[{level['transport']} x{level['clients']}] {level['calls']} calls in {level['wall_seconds']:.2f}s "
+          f"-> {level['throughput_per_s']:.1f} calls/s, {level['errors']} errors")
+    print(f"  {'tool':<32} {'calls':>6} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for tool, s in sorted(level["tools"].items()):
+        print(f"  {tool:<32} {s['calls']:>6} {s['errors']:>4} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f}")
+
+
+def compare(results: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """Regressions vs a previous --json run: lower throughput or higher p95 beyond tolerance."""
+    base = {(b["transport"], b["clients"]): b for b in baseline}
+    problems = []
+    for r in results:
+        b = base.get((r["transport"], r["clients"]))
+        if b is None:
+            continue
+        label = f"{r['transport']} x{r['clients']}"
+        if r["throughput_per_s"] < b["throughput_per_s"] * (1 - tolerance):
+            problems.append(f"{label}: throughput {r['throughput_per_s']:.1f}/s vs baseline {b['throughput_per_s']:.1f}/s")
+        for tool, s in r["tools"].items():
+            bs = b["tools"].get(tool)
+            if bs and s["p95_ms"] > bs["p95_ms"] * (1 + tolerance):
+                problems.append(f"{label} {tool}: p95 {s['p95_ms']:.1f} ms vs baseline {bs['p95_ms']:.1f} ms")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="MCP load/latency benchmark against the mock EODHD upstream")
+    parser.add_argument("--transports", default="http", help="Comma list of stdio, sse, http")
+    parser.add_argument("--clients", default="1,8,32", help="Comma list of concurrent client counts")
+    parser.add_argument("--calls", type=int, default=30, help="Tool calls per client")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Mock upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock upstream error injection rate")
+    parser.add_argument("--error-statuses", default="500,503")
+    parser.add_argument("--cache", action="store_true", help="Leave the server's response cache on")
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false", help="Time the first calls too")
+    parser.add_argument("--json", dest="json_out", help="Write results to this file")
+    parser.add_argument("--baseline", help="Previous --json output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression fraction")
+    args = parser.parse_args()
+
+    transports = [t.strip() for t in args.transports.split(",") if t.strip()]
+    bad = set(transports) - {"stdio", "sse", "http"}
+    if bad:
+        parser.error(f"unknown transports: {sorted(bad)}")
+    levels = [int(c) for c in args.clients.split(",") if c.strip()]
+
+    procs: List[subprocess.Popen] = []
+    results: List[dict] = []
+    try:
+        mock_port = _free_port()
+        mock = subprocess.Popen(
+            [sys.executable, str(ROOT / "test" / "mock_upstream.py"), "--port", str(mock_port),
+             "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+             "--error-rate", str(args.error_rate), "--error-statuses", args.error_statuses, "--seed", "1"],
+            cwd=ROOT,
+        )
+        procs.append(mock)
+        _wait_port(mock_port, mock)
+        env = _server_env(f"http://127.0.0.1:{mock_port}/api", args.cache)
+
+        for name in transports:
+            url = ""
+            if name != "stdio":
+                port = _free_port()
+                server = subprocess.Popen(
+                    [sys.executable, str(ROOT / "server.py"), f"--{name}", "--port", str(port),
+                     "--log-level", "WARNING"],
+                    cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+                procs.append(server)
+                _wait_port(port, server)
+                url = f"http://127.0.0.1:{port}/{'sse' if name == 'sse' else 'mcp'}"
+            for n in levels:
+                level = asyncio.run(run_level(name, n, args.calls, url, env, args.warmup))
+                results.append(level)
+                _print_level(level)
+            if name != "stdio":
+                server.terminate()
+                server.wait(10)
+    finally:
+        for p in procs:
+            if p.poll() is None:
+                p.terminate()
+                p.wait(10)
+
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=1), encoding="utf-8")
+        print(f"\nWrote {args.json_out}")
+    if args.baseline:
+        problems = compare(results, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.tolerance)
+        print(f"\nBaseline comparison (tolerance {args.tolerance:.0%}): {len(problems)} regression(s)")
+        for line in problems:
+            print(f"  {line}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
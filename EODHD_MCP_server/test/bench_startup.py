@@ -0,0 +1,106 @@
+# bench_startup.py
+#
+# Startup benchmark: eager vs lazy tool registration (EODHD_LAZY_TOOLS).
+#
+#   python test/bench_startup.py                # in-process phases, 10 fresh interpreters per mode
+#   python test/bench_startup.py --runs 20 --stdio
+#
+# "register" runs in a fresh interpreter each time (imports are cached per process).
+# --stdio also times a real stdio spawn of entrypoints/server_stdio.py up to the first
+# tools/list response, which is what a desktop client pays on every launch.
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Runs inside the child interpreter; prints one JSON line of phase timings (seconds).
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from fastmcp import FastMCP
+t1 = time.perf_counter()
+from app.tools import register_all
+mcp = FastMCP("bench")
+register_all(mcp, lazy={lazy})
+t2 = time.perf_counter()
+import asyncio
+tools = asyncio.run(mcp.list_tools())
+t3 = time.perf_counter()
+print(json.dumps({{"import_fastmcp": t1 - t0, "register": t2 - t1, "list_tools": t3 - t2,
+                  "total": t3 - t0, "tools": len(tools), "modules": len(sys.modules)}}))
+"""
+
+
+def _run_child(lazy: bool) -> Dict[str, float]:
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(lazy=lazy)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    res = json.loads(out.stdout.strip().splitlines()[-1])
+    res["process"] = time.perf_counter() - started
+    return res
+
+
+async def _stdio_once(lazy: bool) -> float:
+    from fastmcp import Client
+    from fastmcp.client.transports import PythonStdioTransport
+
+    env = {**os.environ, "EODHD_LAZY_TOOLS": "1" if lazy else "0",
+           "EODHD_API_KEY": os.environ.get("EODHD_API_KEY", "demo")}
+    with open(os.devnull, "w") as server_log:
+        transport = PythonStdioTransport(
+            str(ROOT / "entrypoints" / "server_stdio.py"), env=env, cwd=str(ROOT),
+            python_cmd=sys.executable, keep_alive=False, log_file=server_log,
+        )
+        started = time.perf_counter()
+        async with Client(transport) as client:
+            await client.list_tools()
+            return time.perf_counter() - started
+
+
+def _summary(samples: List[float]) -> str:
+    ms = sorted(s * 1000 for s in samples)
+    return f"median {statistics.median(ms):7.1f} ms  min {ms[0]:7.1f}  max {ms[-1]:7.1f}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Eager vs lazy tool registration startup benchmark")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per mode")
+    parser.add_argument("--stdio", action="store_true", help="Also time stdio spawn -> tools/list")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, List[float]]] = {}
+    for mode in ("eager", "lazy"):
+        runs = [_run_child(mode == "lazy") for _ in range(args.runs)]
+        results[mode] = {k: [r[k] for r in runs] for k in runs[0]}
+        print(f"\n[{mode}] {int(runs[0]['tools'])} tools, {int(runs[0]['modules'])} modules loaded")
+        for phase in ("import_fastmcp", "register", "list_tools", "total", "process"):
+            print(f"  {phase:<15} {_summary(results[mode][phase])}")
+
+    if args.stdio:
+        for mode in ("eager", "lazy"):
+            samples = [asyncio.run(_stdio_once(mode == "lazy")) for _ in range(args.runs)]
+            results[mode]["stdio"] = samples
+            print(f"\n[{mode}] stdio spawn -> tools/list  {_summary(samples)}")
+
+    print()
+    for phase in ("register", "process") + (("stdio",) if args.stdio else ()):
+        eager = statistics.median(results["eager"][phase])
+        lazy = statistics.median(results["lazy"][phase])
+        print(f"{phase:<10} eager {eager * 1000:7.1f} ms -> lazy {lazy * 1000:7.1f} ms  "
+              f"({eager / lazy:4.1f}x, saves {(eager - lazy) * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# breaker_check.py
+#
+# Offline regression check for the per-host circuit breaker in app/api_client.py
+# (no network, no API token):
+#
+#   python test/breaker_check.py
+#
+# A call let through as the half-open probe that is cancelled while still queued for
+# a rate-limit token must hand the probe slot back; otherwise the host stays
+# "circuit open" for every later request.
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("EODHD_API_KEY", "breaker-check")
+os.environ["EODHD_RETRY_MAX_ATTEMPTS"] = "1"
+os.environ["EODHD_BREAKER_FAILURES"] = "1"
+os.environ["EODHD_BREAKER_RESET_SECONDS"] = "0.05"
+os.environ["EODHD_RATE_LIMIT_ENABLED"] = "1"
+os.environ["EODHD_RATE_LIMIT_PER_MINUTE"] = "1"   # one token, refilled once a minute
+os.environ["EODHD_RATE_LIMIT_BURST"] = "1"
+os.environ["EODHD_CACHE_ENABLED"] = "0"
+os.environ["EODHD_SINGLEFLIGHT"] = "0"
+
+import httpx
+
+from app import api_client
+from app.config import EODHD_API_BASE
+from app.retry import retry_policy
+
+
+async def main() -> int:
+    api_client._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(503, json={"error": "unavailable"}))
+    )
+    failures = []
+    url = f"{EODHD_API_BASE}/eod/AAPL.US?fmt=json"
+
+    # One failure opens the circuit (and spends the only rate-limit token)
+    await api_client.make_request(url)
+    breaker = retry_policy.breaker(url)
+    if breaker is None or breaker.state != "open":
+        failures.append(f"circuit should be open after a 503, got {breaker and breaker.state}")
+    await asyncio.sleep(0.1)
+
+    # The next call becomes the half-open probe and queues for a token; cancel it there
+    probe = asyncio.ensure_future(api_client.make_request(url))
+    await asyncio.sleep(0.05)
+    if probe.done():
+        failures.append(f"probe should be queued on the rate limiter, got {probe.result()!r}")
+    probe.cancel()
+    await asyncio.gather(probe, return_exceptions=True)
+
+    if breaker is not None and not breaker.allow():
+        failures.append("probe slot not released after cancellation: host stuck at 'circuit open'")
+
+    for f in failures:
+        print(f"FAIL {f}")
+    print("breaker_check: " + ("ok" if not failures else f"{len(failures)} failure(s)"))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
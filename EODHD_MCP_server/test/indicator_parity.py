@@ -0,0 +1,459 @@
+# indicator_parity.py
+#
+# Parity check: local indicator engine (app/indicators.py) vs the /technical API.
+#
+#   Record fixtures once (live API; costs ~5 calls per case + EOD). The default "demo"
+#   token covers the API_TICKERS below:
+#       python test/indicator_parity.py --record
+#   Replay offline (no network) and compare:
+#       python test/indicator_parity.py
+#   Fail unless the core set (SMA/EMA/RSI/MACD/BBANDS on every API ticker) is recorded:
+#       python test/indicator_parity.py --require-api
+#
+#   Without network access, generate reference fixtures instead:
+#       python test/indicator_parity.py --reference
+#
+# Each fixture stores the EOD bars the engine needs and the expected indicator rows,
+# so the comparison itself is deterministic. "source" says where the expected rows came
+# from: "api" (recorded /technical responses) or "reference" (deterministic synthetic
+# bars run through the plain-Python implementations below, written from the indicator
+# definitions independently of the vectorized engine). Only "api" fixtures show parity
+# with the endpoint; --record overwrites reference fixtures of the same name.
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "technical"
+
+# ---------- Cases ----------
+TICKER = "AAPL.US"
+START, END = "2023-01-01", "2023-06-30"
+CASES: List[Dict[str, Any]] = [
+    {"function": "sma", "period": 50},
+    {"function": "ema", "period": 50},
+    {"function": "wma", "period": 50},
+    {"function": "rsi", "period": 14},
+    {"function": "stddev", "period": 20},
+    {"function": "slope", "period": 20},
+    {"function": "volatility", "period": 20},
+    {"function": "avgvol", "period": 20},
+    {"function": "avgvolccy", "period": 20},
+    {"function": "atr", "period": 14},
+    {"function": "cci", "period": 20},
+    {"function": "dmi", "period": 14},
+    {"function": "adx", "period": 14},
+    {"function": "bbands", "period": 20},
+    {"function": "macd", "fast_period": 12, "slow_period": 26, "signal_period": 9},
+    {"function": "stochastic", "fast_kperiod": 14, "slow_kperiod": 3, "slow_dperiod": 3},
+    {"function": "stochrsi", "period": 14, "fast_kperiod": 14, "fast_dperiod": 14},
+    {"function": "sar", "acceleration": 0.02, "maximum": 0.2},
+]
+
+# Core set that must be checked against recorded /technical output on several tickers
+# (all covered by the public "demo" token)
+API_TICKERS = ["AAPL.US", "TSLA.US", "AMZN.US"]
+API_CASES: List[Dict[str, Any]] = [
+    {"function": "sma", "period": 50},
+    {"function": "ema", "period": 50},
+    {"function": "rsi", "period": 14},
+    {"function": "macd", "fast_period": 12, "slow_period": 26, "signal_period": 9},
+    {"function": "bbands", "period": 20},
+]
+
+# Stated tolerance: values match when within RTOL relative or ATOL absolute. /technical
+# rounds its output to a few decimals, and MACD / oscillators cross zero, hence the
+# per-function absolute floors.
+RTOL = 1e-3
+ATOL = 1e-6
+ATOL_BY_FUNCTION = {"macd": 1e-3, "rsi": 1e-2, "bbands": 1e-3}
+
+
+def _case_name(case: Dict[str, Any], ticker: str = TICKER) -> str:
+    name = "_".join(str(v) for v in case.values())
+    return name if ticker == TICKER else f"{ticker.replace('.', '_')}_{name}"
+
+
+def _recording_plan() -> List[tuple]:
+    """(ticker, case) pairs recorded by --record: every case on TICKER, the core set elsewhere."""
+    plan = [(TICKER, case) for case in CASES]
+    plan += [(t, case) for t in API_TICKERS if t != TICKER for case in API_CASES]
+    return plan
+
+
+async def _record(api_token: str) -> None:
+    from app.api_client import close_http_client, make_request
+    from app.config import EODHD_API_BASE
+    from app import indicators as ind
+    from app.tools.compute_technical_indicators import _warmup_from
+
+    FIXTURES.mkdir(parents=True, exist_ok=True)
+    try:
+        for ticker, case in _recording_plan():
+            spec = ind.parse_specs([dict(case)])[0]
+            qs = "&".join(f"{k}={v}" for k, v in case.items())
+            api = await make_request(
+                f"{EODHD_API_BASE}/technical/{ticker}?{qs}&from={START}&to={END}&order=a&fmt=json"
+                f"&api_token={api_token}"
+            )
+            bars = await make_request(
+                f"{EODHD_API_BASE}/eod/{ticker}?period=d&order=a&fmt=json"
+                f"&from={_warmup_from(START, ind.lookback(spec))}&to={END}&api_token={api_token}"
+            )
+            if not isinstance(api, list) or not isinstance(bars, list):
+                print(f"[SKIP] {_case_name(case, ticker)}: {api if not isinstance(api, list) else bars}")
+                continue
+            path = FIXTURES / f"{_case_name(case, ticker)}.json"
+            path.write_text(json.dumps({"case": case, "ticker": ticker, "source": "api", "bars": bars, "api": api}))
+            print(f"[REC ] {path.name}: {len(api)} API rows, {len(bars)} bars")
+    finally:
+        await close_http_client()
+
+
+# ---------- Reference implementations (plain Python, one loop per definition) ----------
+
+def _mean(xs: List[float]) -> float:
+    return sum(xs) / len(xs)
+
+
+def _ref_sma(x: List[float], n: int) -> List[Any]:
+    return [None if i < n - 1 else _mean(x[i - n + 1:i + 1]) for i in range(len(x))]
+
+
+def _ref_smooth(x: List[Any], n: int, alpha: float) -> List[Any]:
+    """Recursive smoothing over the defined (non-None) tail, seeded with the mean of its first n values."""
+    out: List[Any] = [None] * len(x)
+    first = next((i for i, v in enumerate(x) if v is not None), len(x))
+    if len(x) - first < n:
+        return out
+    prev = _mean(x[first:first + n])
+    out[first + n - 1] = prev
+    for i in range(first + n, len(x)):
+        prev = prev + alpha * (x[i] - prev)
+        out[i] = prev
+    return out
+
+
+def _ref_ema(x: List[Any], n: int) -> List[Any]:
+    return _ref_smooth(x, n, 2.0 / (n + 1))
+
+
+def _ref_wilder(x: List[Any], n: int) -> List[Any]:
+    return _ref_smooth(x, n, 1.0 / n)
+
+
+def _ref_pstdev(xs: List[float]) -> float:
+    m = _mean(xs)
+    return math.sqrt(sum((v - m) ** 2 for v in xs) / len(xs))
+
+
+def _ref_true_range(h, l, c) -> List[Any]:
+    return [None] + [max(h[i] - l[i], abs(h[i] - c[i - 1]), abs(l[i] - c[i - 1])) for i in range(1, len(c))]
+
+
+def _ref_stoch_k(x: List[Any], hi: List[Any], lo: List[Any], n: int) -> List[Any]:
+    out: List[Any] = [None] * len(x)
+    for i in range(len(x)):
+        win = range(i - n + 1, i + 1)
+        if i - n + 1 < 0 or any(x[j] is None for j in win):
+            continue
+        hh, ll = max(hi[j] for j in win), min(lo[j] for j in win)
+        out[i] = 0.0 if hh == ll else 100.0 * (x[i] - ll) / (hh - ll)
+    return out
+
+
+def _ref_sma_defined(x: List[Any], n: int) -> List[Any]:
+    out: List[Any] = [None] * len(x)
+    for i in range(n - 1, len(x)):
+        win = x[i - n + 1:i + 1]
+        if all(v is not None for v in win):
+            out[i] = _mean(win)
+    return out
+
+
+def _ref_rsi(c: List[float], n: int) -> List[Any]:
+    gains = [None] + [max(c[i] - c[i - 1], 0.0) for i in range(1, len(c))]
+    losses = [None] + [max(c[i - 1] - c[i], 0.0) for i in range(1, len(c))]
+    g, lo = _ref_wilder(gains, n), _ref_wilder(losses, n)
+    return [None if gi is None else (100.0 if li == 0 else 100.0 - 100.0 / (1.0 + gi / li)) for gi, li in zip(g, lo)]
+
+
+def _ref_dmi(h, l, c, n: int):
+    plus_dm: List[Any] = [None]
+    minus_dm: List[Any] = [None]
+    for i in range(1, len(c)):
+        up, down = h[i] - h[i - 1], l[i - 1] - l[i]
+        plus_dm.append(up if up > down and up > 0 else 0.0)
+        minus_dm.append(down if down > up and down > 0 else 0.0)
+    tr = _ref_wilder(_ref_true_range(h, l, c), n)
+    sp, sm = _ref_wilder(plus_dm, n), _ref_wilder(minus_dm, n)
+    pdi, mdi, dx = [], [], []
+    for t, p, m in zip(tr, sp, sm):
+        if t is None:
+            pdi.append(None), mdi.append(None), dx.append(None)
+            continue
+        a, b = 100.0 * p / t, 100.0 * m / t
+        pdi.append(a), mdi.append(b), dx.append(0.0 if a + b == 0 else 100.0 * abs(a - b) / (a + b))
+    return pdi, mdi, dx
+
+
+def _ref_sar(h, l, acc: float, mx: float) -> List[Any]:
+    out: List[Any] = [None] * len(h)
+    if len(h) < 2:
+        return out
+    rising = h[1] >= h[0]
+    extreme = h[1] if rising else l[1]
+    value = l[0] if rising else h[0]
+    step = acc
+    out[1] = value
+    for i in range(2, len(h)):
+        value += step * (extreme - value)
+        if rising:
+            value = min(value, l[i - 1], l[i - 2])
+            if l[i] < value:
+                rising, value, extreme, step = False, extreme, l[i], acc
+            elif h[i] > extreme:
+                extreme, step = h[i], min(step + acc, mx)
+        else:
+            value = max(value, h[i - 1], h[i - 2])
+            if h[i] > value:
+                rising, value, extreme, step = True, extreme, h[i], acc
+            elif l[i] < extreme:
+                extreme, step = l[i], min(step + acc, mx)
+        out[i] = value
+    return out
+
+
+def reference(bars: List[Dict[str, Any]], case: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """Indicator fields (API names) for split/dividend-adjusted bars, one list per field."""
+    f = [b["adjusted_close"] / b["close"] for b in bars]
+    h = [b["high"] * k for b, k in zip(bars, f)]
+    l = [b["low"] * k for b, k in zip(bars, f)]
+    c = [b["adjusted_close"] for b in bars]
+    v = [float(b["volume"]) for b in bars]
+    fn, n = case["function"], case.get("period")
+    size = len(c)
+
+    if fn == "sma":
+        return {"sma": _ref_sma(c, n)}
+    if fn == "ema":
+        return {"ema": _ref_ema(c, n)}
+    if fn == "wma":
+        w = list(range(1, n + 1))
+        return {"wma": [None if i < n - 1 else sum(wj * xj for wj, xj in zip(w, c[i - n + 1:i + 1])) / sum(w)
+                        for i in range(size)]}
+    if fn == "stddev":
+        return {"stddev": [None if i < n - 1 else _ref_pstdev(c[i - n + 1:i + 1]) for i in range(size)]}
+    if fn == "slope":
+        t = list(range(n))
+        tm = _mean(t)
+        out = []
+        for i in range(size):
+            if i < n - 1:
+                out.append(None)
+                continue
+            y = c[i - n + 1:i + 1]
+            ym = _mean(y)
+            out.append(sum((a - tm) * (b - ym) for a, b in zip(t, y)) / sum((a - tm) ** 2 for a in t))
+        return {"slope": out}
+    if fn == "volatility":
+        r = [None] + [math.log(c[i] / c[i - 1]) for i in range(1, size)]
+        out = []
+        for i in range(size):
+            if i < n:
+                out.append(None)
+                continue
+            win = r[i - n + 1:i + 1]
+            m = _mean(win)
+            out.append(math.sqrt(sum((x - m) ** 2 for x in win) / (n - 1)) * math.sqrt(252) * 100.0)
+        return {"volatility": out}
+    if fn == "rsi":
+        return {"rsi": _ref_rsi(c, n)}
+    if fn == "avgvol":
+        return {"avgvol": _ref_sma(v, n)}
+    if fn == "avgvolccy":
+        return {"avgvolccy": _ref_sma([a * b for a, b in zip(c, v)], n)}
+    if fn == "atr":
+        return {"atr": _ref_wilder(_ref_true_range(h, l, c), n)}
+    if fn == "cci":
+        tp = [(a + b + d) / 3.0 for a, b, d in zip(h, l, c)]
+        out = []
+        for i in range(size):
+            if i < n - 1:
+                out.append(None)
+                continue
+            win = tp[i - n + 1:i + 1]
+            m = _mean(win)
+            md = _mean([abs(x - m) for x in win])
+            out.append(0.0 if md == 0 else (tp[i] - m) / (0.015 * md))
+        return {"cci": out}
+    if fn == "dmi":
+        pdi, mdi, dx = _ref_dmi(h, l, c, n)
+        return {"plus_di": pdi, "minus_di": mdi, "dx": dx}
+    if fn == "adx":
+        return {"adx": _ref_wilder(_ref_dmi(h, l, c, n)[2], n)}
+    if fn == "bbands":
+        mid = _ref_sma(c, n)
+        dev = [None if i < n - 1 else 2.0 * _ref_pstdev(c[i - n + 1:i + 1]) for i in range(size)]
+        return {"uband": [None if m is None else m + d for m, d in zip(mid, dev)], "mband": mid,
+                "lband": [None if m is None else m - d for m, d in zip(mid, dev)]}
+    if fn == "macd":
+        fast, slow = _ref_ema(c, case["fast_period"]), _ref_ema(c, case["slow_period"])
+        line = [None if a is None or b is None else a - b for a, b in zip(fast, slow)]
+        signal = _ref_ema(line, case["signal_period"])
+        return {"macd": line, "signal": signal,
+                "divergence": [None if s is None else m - s for m, s in zip(line, signal)]}
+    if fn == "stochastic":
+        k = _ref_sma_defined(_ref_stoch_k(c, h, l, case["fast_kperiod"]), case["slow_kperiod"])
+        return {"k_values": k, "d_values": _ref_sma_defined(k, case["slow_dperiod"])}
+    if fn == "stochrsi":
+        r = _ref_rsi(c, n)
+        k = _ref_stoch_k(r, r, r, case["fast_kperiod"])
+        return {"fast_k_values": k, "fast_d_values": _ref_sma_defined(k, case["fast_dperiod"])}
+    if fn == "sar":
+        return {"sar": _ref_sar(h, l, case["acceleration"], case["maximum"])}
+    raise ValueError(f"no reference for {fn}")
+
+
+def synthetic_bars(start: str, end: str, seed: int = 7) -> List[Dict[str, Any]]:
+    """Deterministic business-day OHLCV random walk; adjusted_close differs from close
+    (one 2:1 split and quarterly dividends) so the adjustment path is exercised too."""
+    rng = random.Random(seed)
+    day, last = date.fromisoformat(start), date.fromisoformat(end)
+    split_day = date.fromisoformat(START) - timedelta(days=40)
+    price, bars = 150.0, []
+    while day <= last:
+        if day.weekday() < 5:
+            prev = price
+            price = max(5.0, price * math.exp(rng.gauss(0.0004, 0.018)))
+            high = max(prev, price) * (1 + abs(rng.gauss(0, 0.006)))
+            low = min(prev, price) * (1 - abs(rng.gauss(0, 0.006)))
+            raw = price * (2.0 if day < split_day else 1.0)
+            factor = (0.5 if day < split_day else 1.0) * (0.995 ** ((date.fromisoformat(END) - day).days // 91))
+            bars.append({
+                "date": day.isoformat(),
+                "open": round(prev * raw / price, 4), "high": round(high * raw / price, 4),
+                "low": round(low * raw / price, 4), "close": round(raw, 4),
+                "adjusted_close": round(raw * factor, 4), "volume": rng.randint(20_000_000, 90_000_000),
+            })
+        day += timedelta(days=1)
+    return bars
+
+
+def _write_reference() -> None:
+    from app import indicators as ind
+    from app.tools.compute_technical_indicators import _warmup_from
+
+    FIXTURES.mkdir(parents=True, exist_ok=True)
+    for case in CASES:
+        spec = ind.parse_specs([dict(case)])[0]
+        bars = synthetic_bars(_warmup_from(START, ind.lookback(spec)), END)
+        fields = reference(bars, case)
+        rows = []
+        for i, b in enumerate(bars):
+            if START <= b["date"] <= END and all(fields[f][i] is not None for f in fields):
+                rows.append({"date": b["date"], **{f: round(fields[f][i], 6) for f in fields}})
+        path = FIXTURES / f"{_case_name(case)}.json"
+        if path.exists() and json.loads(path.read_text()).get("source") == "api":
+            print(f"[KEEP] {path.name}: recorded API fixture")
+            continue
+        path.write_text(json.dumps({"case": case, "source": "reference", "bars": bars, "api": rows}))
+        print(f"[REF ] {path.name}: {len(rows)} rows, {len(bars)} bars")
+
+
+def _close(a: Any, b: Any, atol: float = ATOL) -> bool:
+    if a is None or b is None:
+        return a is None and b is None
+    return math.isclose(float(a), float(b), rel_tol=RTOL, abs_tol=atol)
+
+
+def _missing_api() -> List[str]:
+    """Core (ticker, case) fixtures that are not recorded from the API yet."""
+    missing = []
+    for ticker in API_TICKERS:
+        for case in API_CASES:
+            path = FIXTURES / f"{_case_name(case, ticker)}.json"
+            if not path.exists() or json.loads(path.read_text()).get("source") != "api":
+                missing.append(path.stem)
+    return missing
+
+
+def _replay(require_api: bool = False) -> int:
+    from app import indicators as ind
+
+    files = sorted(FIXTURES.glob("*.json"))
+    if not files:
+        print(f"No fixtures in {FIXTURES}; run with --record first.")
+        return 1
+
+    failed = 0
+    sources: Dict[str, int] = {}
+    for path in files:
+        fx = json.loads(path.read_text())
+        source = fx.get("source", "api")
+        sources[source] = sources.get(source, 0) + 1
+        spec = ind.parse_specs([dict(fx["case"])])[0]
+        atol = ATOL_BY_FUNCTION.get(fx["case"]["function"], ATOL)
+        rows = ind.to_rows(ind.compute(fx["bars"], [spec]), START, END)
+        local = {r["date"]: r for r in rows}
+
+        compared = mismatched = 0
+        first_bad = None
+        for api_row in fx["api"]:
+            mine = local.get(api_row.get("date"))
+            if mine is None:
+                continue
+            for col, field in zip(spec.columns(), spec.fields):
+                if field not in api_row:
+                    continue
+                compared += 1
+                if not _close(mine.get(col), api_row[field], atol):
+                    mismatched += 1
+                    first_bad = first_bad or (api_row["date"], field, api_row[field], mine.get(col))
+
+        ok = compared > 0 and mismatched == 0
+        failed += not ok
+        status = "PASS" if ok else "FAIL"
+        detail = f" first mismatch {first_bad}" if first_bad else ""
+        print(f"[{status}] {path.stem} ({source}): {compared - mismatched}/{compared} values match{detail}")
+
+    print(f"\n{len(files) - failed}/{len(files)} cases at parity (rtol={RTOL}, atol={ATOL} or "
+          f"{ATOL_BY_FUNCTION} per function); fixtures by source: {sources}.")
+    missing = _missing_api()
+    if missing:
+        print(f"{len(missing)} core case(s) not recorded from /technical, so parity with the API is unverified "
+              f"for them (run --record): {', '.join(missing)}")
+        if require_api:
+            return 1
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local indicator engine vs /technical API parity check")
+    parser.add_argument("--record", action="store_true", help="Fetch fixtures from the live API")
+    parser.add_argument("--reference", action="store_true",
+                        help="Write offline reference fixtures (keeps recorded API fixtures)")
+    parser.add_argument("--require-api", action="store_true",
+                        help="Fail unless the core cases are recorded from the API on every API ticker")
+    parser.add_argument("--api-token", default=os.getenv("EODHD_API_KEY", "demo"))
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(_record(args.api_token))
+    elif args.reference:
+        _write_reference()
+    sys.exit(_replay(args.require_api))
+
+
+if __name__ == "__main__":
+    main()
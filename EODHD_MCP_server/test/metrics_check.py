@@ -0,0 +1,76 @@
+# metrics_check.py
+#
+# Offline regression checks for app/metrics.py (no network, no API token):
+#
+#   python test/metrics_check.py
+#
+# Failed upstream requests (buffered and streamed) must be counted with their HTTP status
+# and leave /metrics renderable; a bad label once broke every later scrape.
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("EODHD_API_KEY", "metrics-check")
+os.environ["EODHD_RETRY_MAX_ATTEMPTS"] = "1"
+os.environ["EODHD_RATE_LIMIT_ENABLED"] = "0"
+os.environ["EODHD_CACHE_ENABLED"] = "0"
+
+import httpx
+from fastmcp import FastMCP
+
+from app import api_client, metrics
+from app.config import EODHD_API_BASE
+
+
+def _upstream(request: httpx.Request) -> httpx.Response:
+    if "/eod-bulk-last-day/" in request.url.path:
+        return httpx.Response(404, text="Ticker Not Found")
+    if "/eod/" in request.url.path:
+        return httpx.Response(503, json={"error": "unavailable"})
+    return httpx.Response(200, json=[])
+
+
+async def main() -> int:
+    api_client._client = httpx.AsyncClient(transport=httpx.MockTransport(_upstream))
+    failures = []
+
+    streamed = await api_client.make_request(
+        f"{EODHD_API_BASE}/eod-bulk-last-day/NOPE?fmt=csv",
+        response_type="lines", on_line=lambda line: None,
+    )
+    buffered = await api_client.make_request(f"{EODHD_API_BASE}/eod/AAPL.US?fmt=json")
+    if not (isinstance(streamed, dict) and streamed.get("error")):
+        failures.append(f"streamed 404 should return an error, got {streamed!r}")
+    if not (isinstance(buffered, dict) and buffered.get("error")):
+        failures.append(f"buffered 503 should return an error, got {buffered!r}")
+
+    try:
+        text = metrics.render()
+    except Exception as e:
+        text = ""
+        failures.append(f"render() raised {type(e).__name__}: {e}")
+    for needle in ('endpoint="/eod-bulk-last-day",status="404"', 'status="503"'):
+        if needle not in text:
+            failures.append(f"missing {needle} in render()")
+
+    # The HTTP route serves the same text
+    mcp = FastMCP("metrics-check")
+    metrics.install(mcp, "/metrics")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=mcp.http_app()), base_url="http://t") as c:
+        resp = await c.get("/metrics")
+    if resp.status_code != 200 or 'status="404"' not in resp.text:
+        failures.append(f"GET /metrics -> {resp.status_code}")
+
+    for f in failures:
+        print(f"FAIL {f}")
+    print("metrics_check: " + ("ok" if not failures else f"{len(failures)} failure(s)"))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,63 @@
+# quotes_check.py
+#
+# Offline check of get_live_price_data(batch=True) against test/mock_upstream.py
+# (no network, no API token):
+#
+#   python test/quotes_check.py
+#
+# The API answers bare tickers with their exchange suffix ('VTI' -> 'VTI.US'); every
+# requested symbol must still come back under its own name and not as "No quote returned."
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+for p in (ROOT, ROOT / "test"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+os.environ.setdefault("EODHD_API_KEY", "quotes-check")
+os.environ["EODHD_API_BASE"] = "http://mock/api"
+os.environ["EODHD_RATE_LIMIT_ENABLED"] = "0"
+os.environ["EODHD_CACHE_ENABLED"] = "0"
+
+import httpx
+from fastmcp import Client, FastMCP
+
+from app import api_client
+from app.tools import register_all
+from mock_upstream import MockUpstream
+
+
+async def main() -> int:
+    api_client._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=MockUpstream().app()))
+    mcp = FastMCP("quotes-check")
+    register_all(mcp)
+    failures = []
+
+    # 25 symbols: two groups, bare and suffixed tickers mixed
+    extra = ["VTI", "MSFT.US", "EUR.FOREX"] + [f"T{i}" for i in range(21)]
+    requested = ["AAPL"] + extra
+    async with Client(mcp) as client:
+        res = await client.call_tool("get_live_price_data", {"ticker": "AAPL", "additional_symbols": extra, "batch": True})
+    out = json.loads(res.content[0].text)
+
+    if out.get("errors"):
+        failures.append(f"unexpected errors: {out['errors']}")
+    missing = [s for s in requested if s not in out.get("data", {})]
+    if missing:
+        failures.append(f"symbols not keyed as requested: {missing}")
+    vti = out.get("data", {}).get("VTI") or {}
+    if vti.get("code") != "VTI.US":
+        failures.append(f"VTI should carry the upstream code VTI.US, got {vti.get('code')!r}")
+
+    for f in failures:
+        print(f"FAIL {f}")
+    print("quotes_check: " + ("ok" if not failures else f"{len(failures)} failure(s)"))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))